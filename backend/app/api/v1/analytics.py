@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.dependencies import get_current_instructor
+from app.core.principal import InstructorPrincipal
+from app.crud import analytics as analytics_crud
+from app.schemas.analytics import ProductSales, SalesGranularity, SalesSeriesResponse
+
+router = APIRouter()
+
+# Longest range one request may cover (about ten years of daily rows)
+MAX_RANGE_DAYS = 3660
+DEFAULT_RANGE_DAYS = 30
+
+
+def sales_range(
+    start: Optional[date] = Query(None, description="First day (default: 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last day, inclusive (default: today)"),
+):
+    """Validated [start, end] day range in ANALYTICS_TIMEZONE"""
+    end = end or datetime.now(analytics_crud.ZONE).date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must not exceed {MAX_RANGE_DAYS} days"
+        )
+    return start, end
+
+
+def with_net(values: dict) -> dict:
+    return {**values, "net_revenue": values["paid_revenue"] - values["refunded_revenue"]}
+
+
+@router.get("/analytics/sales", response_model=SalesSeriesResponse)
+async def get_sales_series(
+    granularity: SalesGranularity = Query(SalesGranularity.DAY),
+    product_id: Optional[str] = Query(None, description="Only this product"),
+    day_range=Depends(sales_range),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Sales chart for the current instructor
+
+    Orders, payments and refunds per day, week or month, from the daily
+    rollups (one row per day of the range)
+    """
+    start, end = day_range
+    series = await analytics_crud.get_sales_series(
+        db,
+        instructor_id=current_instructor.id,
+        start=start,
+        end=end,
+        granularity=granularity.value,
+        product_id=product_id
+    )
+    totals = {name: sum(bucket[name] for bucket in series) for name in analytics_crud.ROLLUP_COLUMNS}
+
+    return {
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "timezone": settings.ANALYTICS_TIMEZONE,
+        "product_id": product_id,
+        "totals": with_net(totals),
+        "series": [with_net(bucket) for bucket in series],
+    }
+
+
+@router.get("/analytics/sales/products", response_model=List[ProductSales])
+async def get_product_sales(
+    limit: int = Query(10, ge=1, le=100),
+    day_range=Depends(sales_range),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Best selling products of the current instructor (by net revenue) in a range"""
+    start, end = day_range
+    return await analytics_crud.get_product_sales(
+        db, instructor_id=current_instructor.id, start=start, end=end, limit=limit
+    )
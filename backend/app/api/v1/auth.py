@@ -3,8 +3,8 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_password_hash
-from app.core.dependencies import get_current_instructor
+from app.core.security import verify_and_update_password, create_access_token, get_password_hash_async
+from app.core.dependencies import get_current_instructor_record
 from app.schemas.auth import Token, LoginRequest
 from app.schemas.user import UserCreate, UserResponse
 from app.schemas.instructor import InstructorCreate, InstructorResponse, InstructorUpdate
@@ -83,11 +83,16 @@ async def login_user(
         )
 
     # Verify password
-    if not verify_password(login_data.password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password(login_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="이메일 또는 비밀번호가 올바르지 않습니다."
         )
+    if new_hash:
+        # Upgrade the hash to the current bcrypt cost
+        user.hashed_password = new_hash
+        await db.commit()
 
     # Create access token
     access_token = create_access_token(subject=user.email)
@@ -111,11 +116,16 @@ async def login_instructor(
         )
 
     # Verify password
-    if not verify_password(login_data.password, instructor.hashed_password):
+    valid, new_hash = await verify_and_update_password(login_data.password, instructor.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="이메일 또는 비밀번호가 올바르지 않습니다."
         )
+    if new_hash:
+        # Upgrade the hash to the current bcrypt cost
+        instructor.hashed_password = new_hash
+        await db.commit()
 
     # Create access token
     access_token = create_access_token(subject=instructor.email)
@@ -124,7 +134,7 @@ async def login_instructor(
 
 @router.get("/auth/me/instructor", response_model=InstructorResponse)
 async def get_current_instructor_profile(
-    current_instructor: Instructor = Depends(get_current_instructor)
+    current_instructor: Instructor = Depends(get_current_instructor_record)
 ):
     """
     Get current instructor profile (requires authentication)
@@ -135,7 +145,7 @@ async def get_current_instructor_profile(
 @router.put("/auth/me/instructor", response_model=InstructorResponse)
 async def update_current_instructor_profile(
     instructor_update: InstructorUpdate,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: Instructor = Depends(get_current_instructor_record),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -213,7 +223,7 @@ async def reset_password(
         )
 
     # Update password
-    instructor.hashed_password = get_password_hash(request.new_password)
+    instructor.hashed_password = await get_password_hash_async(request.new_password)
     db.add(instructor)
     await db.commit()
 
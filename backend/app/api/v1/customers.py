@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.crud import customer as customer_crud
-from app.crud import instructor as instructor_crud
+from app.crud import customer as customer_crud, counters as counters_crud
+from app.core.tenant import tenant_resolver
 from app.schemas.customer import (
     CustomerCreate,
     CustomerUpdate,
@@ -11,9 +11,10 @@ from app.schemas.customer import (
     CustomerLoginRequest,
 )
 from app.schemas.auth import Token
-from app.core.security import verify_password, create_access_token
-from app.core.dependencies import get_current_instructor, get_current_customer
-from app.models.instructor import Instructor
+from app.core.security import verify_and_update_password, create_access_token
+from app.core.dependencies import get_current_instructor, get_current_customer_record
+from app.core.principal import InstructorPrincipal
+from app.core.pagination import TOTAL_COUNT_HEADER, decode_cursor, set_next_cursor
 from app.models.customer import Customer
 from typing import List
 
@@ -37,7 +38,7 @@ async def customer_signup(
     Creates a new customer account for the specific instructor
     """
     # Get instructor by subdomain
-    instructor = await instructor_crud.get_instructor_by_subdomain(db, subdomain=subdomain)
+    instructor = await tenant_resolver.resolve(db, subdomain)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Store not found"
@@ -71,7 +72,7 @@ async def customer_login(
     Returns JWT token for accessing customer-specific resources
     """
     # Get instructor by subdomain
-    instructor = await instructor_crud.get_instructor_by_subdomain(db, subdomain=subdomain)
+    instructor = await tenant_resolver.resolve(db, subdomain)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Store not found"
@@ -83,9 +84,11 @@ async def customer_login(
     )
 
     # Verify credentials
-    if not customer or not verify_password(
-        login_data.password, customer.hashed_password
-    ):
+    valid, new_hash = (
+        await verify_and_update_password(login_data.password, customer.hashed_password)
+        if customer else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -98,6 +101,10 @@ async def customer_login(
             detail="Account is deactivated. Please contact the instructor.",
         )
 
+    # Upgrade the hash to the current bcrypt cost (committed with last_login)
+    if new_hash:
+        customer.hashed_password = new_hash
+
     # Update last login
     await customer_crud.update_last_login(db, customer_id=customer.id)
 
@@ -117,8 +124,7 @@ async def customer_login(
 @router.get("/public/store/{subdomain}/me", response_model=CustomerResponse)
 async def get_current_customer_profile(
     subdomain: str,
-    current_customer: Customer = Depends(get_current_customer),
-    db: AsyncSession = Depends(get_db),
+    current_customer: Customer = Depends(get_current_customer_record),
 ):
     """Get current customer's profile"""
     return current_customer
@@ -132,19 +138,23 @@ async def get_current_customer_profile(
 
 @router.get("/customers", response_model=List[CustomerListItem])
 async def list_customers(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    search: str = None,
+    cursor: str = None,
+    search: str = Query(None, max_length=100),
     is_active: bool = None,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db),
 ):
     """
     List all customers for the current instructor
-    Supports search and filtering
+    Pass X-Next-Cursor back as cursor for the next page. With search, results
+    are ranked by relevance and paged with skip; X-Total-Count has the number
+    of matches.
     """
     if search:
-        customers = await customer_crud.search_customers(
+        customers, total = await customer_crud.search_customers(
             db,
             instructor_id=current_instructor.id,
             search_query=search,
@@ -152,17 +162,20 @@ async def list_customers(
             skip=skip,
             limit=limit,
         )
-    else:
-        customers = await customer_crud.list_customers_by_instructor(
-            db, instructor_id=current_instructor.id, skip=skip, limit=limit
-        )
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+        return customers
+
+    customers = await customer_crud.list_customers_by_instructor(
+        db, instructor_id=current_instructor.id, skip=skip, limit=limit, cursor=decode_cursor(cursor)
+    )
+    set_next_cursor(response, customers, limit)
     return customers
 
 
 @router.get("/customers/{customer_id}", response_model=CustomerResponse)
 async def get_customer(
     customer_id: str,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific customer's details"""
@@ -186,7 +199,7 @@ async def get_customer(
 async def update_customer(
     customer_id: str,
     customer_update: CustomerUpdate,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db),
 ):
     """Update customer information"""
@@ -212,7 +225,7 @@ async def update_customer(
 @router.delete("/customers/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_customer(
     customer_id: str,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a customer"""
@@ -235,15 +248,13 @@ async def delete_customer(
 
 @router.get("/customers/stats/summary")
 async def get_customer_stats(
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get customer statistics for the instructor"""
-    total_customers = await customer_crud.count_customers_by_instructor(
-        db, instructor_id=current_instructor.id
-    )
+    """Get customer statistics for the instructor (from the counters row)"""
+    counters = await counters_crud.get_counters(db, instructor_id=current_instructor.id)
 
     return {
-        "total_customers": total_customers,
+        "total_customers": counters.customers,
         "instructor_id": current_instructor.id,
     }
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
 from typing import List
-from app.core.database import get_db
-from app.core.security import get_current_instructor, get_current_customer
-from app.models.instructor import Instructor
-from app.models.customer import Customer
+from app.core.database import get_db, get_read_db, dialect_insert
+from app.core.dependencies import get_current_instructor, get_current_customer
+from app.core.principal import InstructorPrincipal, CustomerPrincipal
+from app.core.compression import choose_encoding
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_position, encode_position
+from app.core.store_cache import etag_matches
+from app.core.tiptap import render_section
+from app.crud import ebook as ebook_crud, product as product_crud
 from app.models.ebook import EbookChapter, EbookSection, UserEbookProgress, UserEbookBookmark
 from app.models.product import Product
-from app.models.order import Order, OrderStatus
 from app.schemas.ebook import (
     EbookChapterCreate,
     EbookChapterUpdate,
@@ -22,14 +25,24 @@ from app.schemas.ebook import (
     UserEbookProgressCreate,
     UserEbookProgressUpdate,
     UserEbookProgressResponse,
+    UserEbookProgressBatch,
+    UserEbookProgressBatchResponse,
     UserEbookBookmarkCreate,
     UserEbookBookmarkUpdate,
     UserEbookBookmarkResponse,
+    EbookCompletionResponse,
+    EbookCompletionReport,
+    EbookSearchResponse,
 )
+from datetime import datetime, timezone
+import gzip
 import uuid
 
 router = APIRouter()
 
+# Entitlement can change, so browsers must revalidate (cheap: 304 by ETag)
+SECTION_CACHE_CONTROL = "private, no-cache"
+
 
 # ========== 강사용 API (챕터/섹션 관리) ==========
 
@@ -37,7 +50,7 @@ router = APIRouter()
 async def create_chapter(
     chapter: EbookChapterCreate,
     db: AsyncSession = Depends(get_db),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
 ):
     """챕터 생성"""
     # 상품이 현재 강사의 것인지 확인
@@ -63,7 +76,8 @@ async def create_chapter(
     )
     db.add(db_chapter)
     await db.commit()
-    await db.refresh(db_chapter)
+
+    await ebook_crud.invalidate_toc(db_chapter.product_id)
     return db_chapter
 
 
@@ -71,7 +85,7 @@ async def create_chapter(
 async def get_product_chapters(
     product_id: str,
     db: AsyncSession = Depends(get_db),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
 ):
     """상품의 모든 챕터 및 섹션 조회 (강사용)"""
     # 상품이 현재 강사의 것인지 확인
@@ -106,7 +120,7 @@ async def update_chapter(
     chapter_id: str,
     chapter_update: EbookChapterUpdate,
     db: AsyncSession = Depends(get_db),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
 ):
     """챕터 수정"""
     # 챕터 조회 및 권한 확인
@@ -128,11 +142,17 @@ async def update_chapter(
         )
 
     # 업데이트
+    was_published = db_chapter.is_published
     for key, value in chapter_update.model_dump(exclude_unset=True).items():
         setattr(db_chapter, key, value)
+    if db_chapter.is_published != was_published:
+        # 완료율에 포함되는 섹션이 바뀜
+        await db.flush()
+        await ebook_crud.rebuild_completions(db, db_chapter.product_id)
 
     await db.commit()
-    await db.refresh(db_chapter)
+
+    await ebook_crud.invalidate_toc(db_chapter.product_id)
     return db_chapter
 
 
@@ -140,7 +160,7 @@ async def update_chapter(
 async def delete_chapter(
     chapter_id: str,
     db: AsyncSession = Depends(get_db),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
 ):
     """챕터 삭제"""
     result = await db.execute(
@@ -160,15 +180,20 @@ async def delete_chapter(
             detail="Chapter not found"
         )
 
+    product_id = db_chapter.product_id
     await db.delete(db_chapter)
+    await db.flush()
+    await ebook_crud.rebuild_completions(db, product_id)
     await db.commit()
 
+    await ebook_crud.invalidate_toc(product_id)
+
 
 @router.post("/instructor/sections", response_model=EbookSectionResponse)
 async def create_section(
     section: EbookSectionCreate,
     db: AsyncSession = Depends(get_db),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
 ):
     """섹션 생성"""
     # 챕터가 현재 강사의 것인지 확인
@@ -189,14 +214,17 @@ async def create_section(
             detail="Chapter not found"
         )
 
-    # 섹션 생성
+    # 섹션 생성 (HTML/읽기 시간은 content로부터 서버에서 생성)
     db_section = EbookSection(
         id=str(uuid.uuid4()),
         **section.model_dump()
     )
+    await ebook_crud.render_content(db_section, keep_reading_time="reading_time" in section.model_fields_set)
+    await ebook_crud.store_variants(db_section)
     db.add(db_section)
     await db.commit()
-    await db.refresh(db_section)
+
+    await ebook_crud.invalidate_toc(chapter.product_id)
     return db_section
 
 
@@ -205,12 +233,12 @@ async def update_section(
     section_id: str,
     section_update: EbookSectionUpdate,
     db: AsyncSession = Depends(get_db),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
 ):
     """섹션 수정"""
     # 섹션 조회 및 권한 확인
     result = await db.execute(
-        select(EbookSection)
+        select(EbookSection, EbookChapter.product_id)
         .join(EbookChapter)
         .join(Product)
         .where(
@@ -220,19 +248,29 @@ async def update_section(
             )
         )
     )
-    db_section = result.scalar_one_or_none()
+    db_section, product_id = result.one_or_none() or (None, None)
     if not db_section:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Section not found"
         )
 
-    # 업데이트
-    for key, value in section_update.model_dump(exclude_unset=True).items():
+    # 업데이트 (content가 바뀐 경우에만 다시 렌더링)
+    update_data = section_update.model_dump(exclude_unset=True)
+    was_published = db_section.is_published
+    for key, value in update_data.items():
         setattr(db_section, key, value)
+    if "content" in update_data:
+        await ebook_crud.render_content(db_section, keep_reading_time="reading_time" in update_data)
+    await ebook_crud.store_variants(db_section)
+    if db_section.is_published != was_published:
+        # 완료율에 포함되는 섹션이 바뀜
+        await db.flush()
+        await ebook_crud.rebuild_completions(db, product_id)
 
     await db.commit()
-    await db.refresh(db_section)
+
+    await ebook_crud.invalidate_toc(product_id)
     return db_section
 
 
@@ -240,11 +278,11 @@ async def update_section(
 async def delete_section(
     section_id: str,
     db: AsyncSession = Depends(get_db),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
 ):
     """섹션 삭제"""
     result = await db.execute(
-        select(EbookSection)
+        select(EbookSection, EbookChapter.product_id)
         .join(EbookChapter)
         .join(Product)
         .where(
@@ -254,7 +292,7 @@ async def delete_section(
             )
         )
     )
-    db_section = result.scalar_one_or_none()
+    db_section, product_id = result.one_or_none() or (None, None)
     if not db_section:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -262,147 +300,284 @@ async def delete_section(
         )
 
     await db.delete(db_section)
+    await db.flush()
+    await ebook_crud.rebuild_completions(db, product_id)
     await db.commit()
 
+    await ebook_crud.invalidate_toc(product_id)
+
+
+@router.get("/instructor/products/{product_id}/completions", response_model=EbookCompletionReport)
+async def get_completion_report(
+    product_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
+):
+    """
+    학습자별 완료율 리포트 (강사용)
+
+    학습을 시작한 고객을 완료 섹션 수가 많은 순으로 조회 (집계 테이블 기준).
+    다음 페이지는 X-Next-Cursor 값을 cursor로 전달
+    """
+    result = await db.execute(
+        select(Product.id).where(
+            and_(
+                Product.id == product_id,
+                Product.instructor_id == current_instructor.id
+            )
+        )
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found or not owned by instructor"
+        )
+
+    report = await ebook_crud.get_completion_report(
+        db, product_id, limit=limit, after=decode_position(cursor, (int, str))
+    )
+    items = report["items"]
+    if len(items) == limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_position(last["completed_sections"], last["customer_id"])
+    return report
+
 
 # ========== 학습자용 API (전자책 뷰어) ==========
 
 @router.get("/customer/products/{product_id}/structure", response_model=EbookStructureResponse)
 async def get_ebook_structure(
     product_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_customer: Customer = Depends(get_current_customer),
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
 ):
     """전자책 구조 조회 (학습자용 - 구매 확인 포함)"""
     # 상품 조회
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
-    if not product:
+    result = await db.execute(select(Product.title).where(Product.id == product_id))
+    product_title = result.scalar_one_or_none()
+    if product_title is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
     # 구매 확인
-    result = await db.execute(
-        select(Order).where(
-            and_(
-                Order.customer_id == current_customer.id,
-                Order.product_id == product_id,
-                Order.status == OrderStatus.COMPLETED
-            )
-        )
-    )
-    order = result.scalar_one_or_none()
-    if not order:
+    if not await ebook_crud.has_purchased(db, current_customer.id, product_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You need to purchase this product first"
         )
 
-    # 챕터 및 섹션 조회 (공개된 것만)
-    result = await db.execute(
-        select(EbookChapter)
-        .where(
-            and_(
-                EbookChapter.product_id == product_id,
-                EbookChapter.is_published == True
-            )
+    # 목차 (공개된 챕터/섹션만, 본문 제외; 상품별 캐시)
+    return {
+        "product_id": product_id,
+        "product_title": product_title,
+        "chapters": await ebook_crud.get_toc(db, product_id),
+    }
+
+
+@router.get("/customer/products/{product_id}/search", response_model=EbookSearchResponse)
+async def search_ebook(
+    product_id: str,
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
+):
+    """
+    전자책 본문 검색 (학습자용)
+
+    공개된 섹션의 제목/본문에서 검색해 관련도 순으로 강조된 발췌와 함께 반환.
+    구매하지 않은 경우 무료 미리보기 섹션만 검색
+    """
+    terms = product_crud.search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query has no searchable words"
         )
-        .options(selectinload(EbookChapter.sections))
-        .order_by(EbookChapter.order_index)
-    )
-    chapters = result.scalars().all()
 
-    # 공개된 섹션만 필터링
-    for chapter in chapters:
-        chapter.sections = [s for s in chapter.sections if s.is_published]
+    result = await db.execute(select(Product.id).where(Product.id == product_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
-    return {
-        "product_id": product.id,
-        "product_title": product.title,
-        "chapters": chapters,
-    }
+    purchased = await ebook_crud.has_purchased(db, current_customer.id, product_id)
+    hits, total = await ebook_crud.search_sections(
+        db, product_id, terms, free_only=not purchased, skip=skip, limit=limit
+    )
+    return {"query": " ".join(terms), "total": total, "items": hits}
 
 
 @router.get("/customer/sections/{section_id}", response_model=EbookSectionResponse)
 async def get_section_content(
     section_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_customer: Customer = Depends(get_current_customer),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
 ):
-    """섹션 콘텐츠 조회 (학습자용 - 구매 확인 포함)"""
-    # 섹션 조회
+    """
+    섹션 콘텐츠 조회 (학습자용 - 구매 확인 포함)
+
+    저장 시 미리 만든 응답을 그대로 전송: ETag(revision)가 같으면 304,
+    Accept-Encoding에 따라 brotli/gzip 압축본 선택 (요청 시 압축하지 않음)
+    """
+    # 섹션 조회 (본문/압축본 제외)
     result = await db.execute(
-        select(EbookSection)
+        select(
+            EbookSection.is_free,
+            EbookSection.revision,
+            EbookSection.body_br.is_not(None),
+            EbookChapter.product_id,
+        )
         .join(EbookChapter)
-        .join(Product)
         .where(EbookSection.id == section_id)
     )
-    section = result.scalar_one_or_none()
-    if not section:
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Section not found")
+    is_free, revision, has_br, product_id = row
 
     # 무료 미리보기가 아닌 경우 구매 확인
-    if not section.is_free:
-        result = await db.execute(
-            select(Order).where(
-                and_(
-                    Order.customer_id == current_customer.id,
-                    Order.product_id == section.chapter.product_id,
-                    Order.status == OrderStatus.COMPLETED
-                )
-            )
-        )
-        order = result.scalar_one_or_none()
-        if not order:
+    if not is_free:
+        if not await ebook_crud.has_purchased(db, current_customer.id, product_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You need to purchase this product first"
             )
 
-    return section
+    if revision is None:
+        # 압축본이 아직 없는 기존 섹션 (일괄 렌더링 전): 그 자리에서 만들어 비압축 전송
+        section = await db.get(EbookSection, section_id)
+        response = EbookSectionResponse.model_validate(section)
+        if section.content is not None and section.content_hash is None:
+            response = response.model_copy(update={"content_html": render_section(section.content).content_html})
+        revision, body = ebook_crud.section_body(response)
+        encoding = None
+    else:
+        encoding = choose_encoding(request.headers.get("accept-encoding"), ["br", "gzip"] if has_br else ["gzip"])
+        body = None
+
+    headers = {
+        "ETag": f'"{revision}"',
+        "Cache-Control": SECTION_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if body is None:
+        column = EbookSection.body_br if encoding == "br" else EbookSection.body_gzip
+        result = await db.execute(select(column).where(EbookSection.id == section_id))
+        body = result.scalar_one()
+        if encoding is None:
+            body = gzip.decompress(body)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/customer/progress", response_model=UserEbookProgressResponse)
 async def update_progress(
     progress: UserEbookProgressCreate,
     db: AsyncSession = Depends(get_db),
-    current_customer: Customer = Depends(get_current_customer),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
 ):
-    """학습 진행률 업데이트"""
-    # 기존 진행률 조회
-    result = await db.execute(
-        select(UserEbookProgress).where(
-            and_(
-                UserEbookProgress.customer_id == current_customer.id,
-                UserEbookProgress.section_id == progress.section_id
-            )
+    """학습 진행률 업데이트 (무료 미리보기 섹션 또는 구매한 상품만)"""
+    access = (await ebook_crud.section_access(db, current_customer.id, [progress.section_id])).get(progress.section_id)
+    if access is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Section not found"
         )
-    )
-    db_progress = result.scalar_one_or_none()
-
-    if db_progress:
-        # 업데이트
-        db_progress.is_completed = progress.is_completed
-        db_progress.reading_progress = progress.reading_progress
-        db_progress.last_read_at = func.now()
-    else:
-        # 새로 생성
-        db_progress = UserEbookProgress(
-            id=str(uuid.uuid4()),
-            customer_id=current_customer.id,
-            **progress.model_dump()
+    if not access.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You need to purchase this product first"
         )
-        db.add(db_progress)
+    product_id = access.product_id
 
+    # 기존 진행률이 있으면 갱신, 없으면 생성 (INSERT ... ON CONFLICT 한 번으로 처리)
+    stmt = dialect_insert(db, UserEbookProgress).values(
+        id=str(uuid.uuid4()),
+        customer_id=current_customer.id,
+        section_id=progress.section_id,
+        is_completed=progress.is_completed,
+        reading_progress=progress.reading_progress,
+        last_read_at=func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserEbookProgress.customer_id, UserEbookProgress.section_id],
+        set_={
+            "is_completed": stmt.excluded.is_completed,
+            "reading_progress": stmt.excluded.reading_progress,
+            "last_read_at": func.now(),
+            "updated_at": func.now(),
+        },
+    ).returning(UserEbookProgress)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    db_progress = result.scalar_one()
+    await ebook_crud.refresh_completions(
+        db,
+        UserEbookProgress.customer_id == current_customer.id,
+        EbookChapter.product_id == product_id,
+    )
     await db.commit()
-    await db.refresh(db_progress)
+
+    # 직접 설정한 값이 버퍼에 남은 스크롤 진행률로 덮이지 않도록
+    ebook_crud.progress_buffer.discard((current_customer.id, progress.section_id))
     return db_progress
 
 
+@router.post(
+    "/customer/progress/batch",
+    response_model=UserEbookProgressBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def update_progress_batch(
+    batch: UserEbookProgressBatch,
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
+):
+    """
+    스크롤 진행률 일괄 전송 (뷰어용)
+
+    섹션별로 가장 많이 읽은 값만 남겨 병합하고(완료 상태는 유지), 버퍼에 모았다가
+    PROGRESS_FLUSH_INTERVAL마다 INSERT ... ON CONFLICT로 한꺼번에 저장.
+    없는 섹션은 무시, 구매하지 않은 상품의 (무료가 아닌) 섹션이 있으면 403
+    """
+    access = await ebook_crud.section_access(db, current_customer.id, [e.section_id for e in batch.events])
+    if not all(section.allowed for section in access.values()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You need to purchase this product first"
+        )
+
+    read_at = datetime.now(timezone.utc)
+    sections = set()
+    for event in batch.events:
+        if event.section_id not in access:
+            continue
+        sections.add(event.section_id)
+        await ebook_crud.progress_buffer.add(
+            (current_customer.id, event.section_id),
+            ebook_crud.ProgressEvent(
+                customer_id=current_customer.id,
+                section_id=event.section_id,
+                reading_progress=event.reading_progress,
+                is_completed=event.is_completed,
+                read_at=read_at,
+            ),
+        )
+    return {"accepted": len(sections)}
+
+
 @router.get("/customer/products/{product_id}/progress", response_model=List[UserEbookProgressResponse])
 async def get_product_progress(
     product_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_customer: Customer = Depends(get_current_customer),
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
 ):
     """상품의 전체 진행률 조회"""
     result = await db.execute(
@@ -420,11 +595,43 @@ async def get_product_progress(
     return progress_list
 
 
+@router.get("/customer/completions", response_model=List[EbookCompletionResponse])
+async def get_completions(
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
+):
+    """구매한 전자책별 완료율 (최근 읽은 순)"""
+    return await ebook_crud.get_customer_completions(db, current_customer.id)
+
+
+@router.get("/customer/products/{product_id}/completion", response_model=EbookCompletionResponse)
+async def get_product_completion(
+    product_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
+):
+    """상품의 완료율 (완료한 공개 섹션 / 공개 섹션, 구매한 상품만)"""
+    result = await db.execute(select(Product.id).where(Product.id == product_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+    if not await ebook_crud.has_purchased(db, current_customer.id, product_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You need to purchase this product first"
+        )
+
+    completions = await ebook_crud.get_customer_completions(db, current_customer.id, [product_id])
+    if completions:
+        return completions[0]
+    return {"product_id": product_id, "completed_sections": 0, "total_sections": 0, "completion_rate": 0}
+
+
 @router.post("/customer/bookmarks", response_model=UserEbookBookmarkResponse)
 async def create_bookmark(
     bookmark: UserEbookBookmarkCreate,
     db: AsyncSession = Depends(get_db),
-    current_customer: Customer = Depends(get_current_customer),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
 ):
     """북마크 생성"""
     db_bookmark = UserEbookBookmark(
@@ -434,15 +641,14 @@ async def create_bookmark(
     )
     db.add(db_bookmark)
     await db.commit()
-    await db.refresh(db_bookmark)
     return db_bookmark
 
 
 @router.get("/customer/products/{product_id}/bookmarks", response_model=List[UserEbookBookmarkResponse])
 async def get_product_bookmarks(
     product_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_customer: Customer = Depends(get_current_customer),
+    db: AsyncSession = Depends(get_read_db),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
 ):
     """상품의 모든 북마크 조회"""
     result = await db.execute(
@@ -464,7 +670,7 @@ async def get_product_bookmarks(
 async def delete_bookmark(
     bookmark_id: str,
     db: AsyncSession = Depends(get_db),
-    current_customer: Customer = Depends(get_current_customer),
+    current_customer: CustomerPrincipal = Depends(get_current_customer),
 ):
     """북마크 삭제"""
     result = await db.execute(
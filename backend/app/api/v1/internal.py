@@ -0,0 +1,47 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from app.core.database import engine, pool_metrics, replica_engine, replica_metrics, replica_lag
+from app.core.dependencies import require_internal_access
+from app.core.security import password_hasher
+from app.jobs.reconcile_counters import reconcile_counters
+
+router = APIRouter(dependencies=[Depends(require_internal_access)])
+
+
+@router.get("/db/pool")
+async def get_pool_stats():
+    """
+    Connection pool telemetry for this worker process
+
+    Checkout wait histogram, connections in use and overflow count
+    """
+    stats = {
+        "primary": pool_metrics.snapshot(engine.sync_engine.pool),
+    }
+    if replica_engine is not None:
+        stats["replica"] = replica_metrics.snapshot(replica_engine.sync_engine.pool)
+        stats["replica"]["lag_seconds"] = replica_lag.lag
+    return stats
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats():
+    """
+    bcrypt executor telemetry for this worker process
+
+    Jobs queued for a slot, jobs running, queue wait and run time histograms
+    """
+    return password_hasher.snapshot()
+
+
+@router.post("/counters/reconcile")
+async def run_counters_reconciliation(
+    instructor_id: Optional[List[str]] = Query(None)
+):
+    """
+    Recompute dashboard counters and repair drift
+
+    All instructors unless instructor_id is given; returns the drift repaired
+    """
+    repaired = await reconcile_counters(instructor_id)
+    return {"repaired": repaired}
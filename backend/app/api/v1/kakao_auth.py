@@ -5,6 +5,8 @@ from app.core.database import get_db
 from app.models.instructor import Instructor
 from app.models.customer import Customer
 from app.core.security import create_access_token
+from app.core.tenant import tenant_resolver
+from app.crud import counters as counters_crud
 import httpx
 import urllib.parse
 from typing import Optional
@@ -24,10 +26,7 @@ async def kakao_login(
     Returns the Kakao OAuth authorization URL
     """
     # Get instructor's Kakao settings
-    result = await db.execute(
-        select(Instructor).where(Instructor.subdomain == subdomain)
-    )
-    instructor = result.scalar_one_or_none()
+    instructor = await tenant_resolver.resolve(db, subdomain)
 
     if not instructor:
         raise HTTPException(status_code=404, detail="스토어를 찾을 수 없습니다")
@@ -72,15 +71,20 @@ async def kakao_callback(
     Exchange authorization code for access token and create/login customer
     """
     # Get instructor's Kakao settings
-    result = await db.execute(
-        select(Instructor).where(Instructor.subdomain == subdomain)
-    )
-    instructor = result.scalar_one_or_none()
+    instructor = await tenant_resolver.resolve(db, subdomain)
 
     if not instructor:
         raise HTTPException(status_code=404, detail="스토어를 찾을 수 없습니다")
 
-    if not instructor.kakao_enabled or not instructor.kakao_client_id or not instructor.kakao_client_secret:
+    # The client secret is not cached; load it only when the exchange happens
+    kakao_client_secret = None
+    if instructor.kakao_enabled and instructor.kakao_client_id:
+        result = await db.execute(
+            select(Instructor.kakao_client_secret).where(Instructor.id == instructor.id)
+        )
+        kakao_client_secret = result.scalar_one_or_none()
+
+    if not instructor.kakao_enabled or not instructor.kakao_client_id or not kakao_client_secret:
         raise HTTPException(status_code=400, detail="카카오 로그인이 설정되지 않았습니다")
 
     # Use dynamic redirect_uri from frontend, fallback to DB value
@@ -91,7 +95,7 @@ async def kakao_callback(
     token_data = {
         "grant_type": "authorization_code",
         "client_id": instructor.kakao_client_id,
-        "client_secret": instructor.kakao_client_secret,
+        "client_secret": kakao_client_secret,
         "redirect_uri": actual_redirect_uri,
         "code": code,
     }
@@ -152,8 +156,8 @@ async def kakao_callback(
             is_active=True
         )
         db.add(customer)
+        await counters_crud.adjust(db, instructor.id, customers=1)
         await db.commit()
-        await db.refresh(customer)
     else:
         # Update existing customer info
         if email:
@@ -163,7 +167,6 @@ async def kakao_callback(
         if phone:
             customer.phone = phone
         await db.commit()
-        await db.refresh(customer)
 
     # Create JWT token for the customer
     jwt_token = create_access_token(subject=customer.id)
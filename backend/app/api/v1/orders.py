@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_instructor, get_current_user
-from app.models.instructor import Instructor
+from app.core.principal import InstructorPrincipal
+from app.core.pagination import decode_cursor, set_next_cursor
 from app.models.user import User
 from app.models.order import OrderStatus
 from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse
-from app.crud import order as order_crud, product as product_crud
+from app.crud import order as order_crud, product as product_crud, counters as counters_crud
 
 router = APIRouter()
 
@@ -66,10 +67,12 @@ async def list_my_orders(
 
 @router.get("/orders/instructor", response_model=List[OrderResponse])
 async def list_instructor_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (skip is ignored)"),
     status_filter: Optional[OrderStatus] = Query(None, alias="status"),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -82,8 +85,10 @@ async def list_instructor_orders(
         instructor_id=current_instructor.id,
         skip=skip,
         limit=limit,
-        status=status_filter
+        status=status_filter,
+        cursor=decode_cursor(cursor)
     )
+    set_next_cursor(response, orders, limit)
     return orders
 
 
@@ -118,7 +123,7 @@ async def get_order(
 @router.get("/orders/instructor/{order_id}", response_model=OrderResponse)
 async def get_instructor_order(
     order_id: str,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -147,7 +152,7 @@ async def get_instructor_order(
 async def update_order(
     order_id: str,
     order_update: OrderUpdate,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -176,7 +181,7 @@ async def update_order(
 @router.delete("/orders/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_order(
     order_id: str,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -204,39 +209,26 @@ async def delete_order(
 
 @router.get("/orders/stats/summary")
 async def get_order_stats(
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get order statistics for current instructor
 
     Returns total orders, total revenue, and orders by status
-    """
-    total_orders = await order_crud.count_orders_by_instructor(db, instructor_id=current_instructor.id)
-    total_revenue = await order_crud.get_total_revenue_by_instructor(db, instructor_id=current_instructor.id)
-
-    # Count by status
-    pending_count = await order_crud.count_orders_by_instructor(
-        db, instructor_id=current_instructor.id, status=OrderStatus.PENDING
-    )
-    paid_count = await order_crud.count_orders_by_instructor(
-        db, instructor_id=current_instructor.id, status=OrderStatus.PAID
-    )
-    cancelled_count = await order_crud.count_orders_by_instructor(
-        db, instructor_id=current_instructor.id, status=OrderStatus.CANCELLED
-    )
-    refunded_count = await order_crud.count_orders_by_instructor(
-        db, instructor_id=current_instructor.id, status=OrderStatus.REFUNDED
-    )
+    (from the instructor's counters row, a single primary key lookup)
+    """
+    counters = await counters_crud.get_counters(db, instructor_id=current_instructor.id)
+    orders_by_status = {
+        "PENDING": counters.orders_pending,
+        "PAID": counters.orders_paid,
+        "CANCELLED": counters.orders_cancelled,
+        "REFUNDED": counters.orders_refunded,
+    }
 
     return {
         "instructor_id": current_instructor.id,
-        "total_orders": total_orders,
-        "total_revenue": total_revenue,
-        "orders_by_status": {
-            "PENDING": pending_count,
-            "PAID": paid_count,
-            "CANCELLED": cancelled_count,
-            "REFUNDED": refunded_count,
-        }
+        "total_orders": sum(orders_by_status.values()),
+        "total_revenue": counters.revenue,
+        "orders_by_status": orders_by_status,
     }
@@ -1,20 +1,113 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from pydantic import ConfigDict, TypeAdapter, create_model
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.core.database import get_db
+from typing import List, Optional, Tuple
+from app.core.database import get_db, get_read_db
 from app.core.dependencies import get_current_instructor
-from app.crud import product as product_crud
-from app.crud import instructor as instructor_crud
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
-from app.models.instructor import Instructor
+from app.crud import product as product_crud, counters as counters_crud
+from app.core.tenant import Tenant, tenant_resolver
+from app.core.store_cache import store_cache
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from app.schemas.product import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductCard, ProductSearchResponse,
+    ProductBulkOperation, ProductBulkRequest, ProductBulkResponse, ProductBulkResult, ProductBulkStatus,
+)
+from app.core.principal import InstructorPrincipal
 
 router = APIRouter()
 
+product_list_adapter = TypeAdapter(List[ProductResponse])
+
+FIELDS_DESCRIPTION = (
+    "'card' for the list card (no detail page content), or comma-separated "
+    "ProductResponse field names; all fields by default"
+)
+
+
+@dataclass(frozen=True)
+class ProductProjection:
+    """Which product columns a list loads and how it is serialized"""
+    name: str
+    columns: Optional[Tuple[str, ...]]
+    adapter: TypeAdapter
+
+    def dump(self, products) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(products, from_attributes=True))
+
+
+FULL_PROJECTION = ProductProjection("full", None, product_list_adapter)
+CARD_PROJECTION = ProductProjection("card", tuple(ProductCard.model_fields), TypeAdapter(List[ProductCard]))
+
+
+@lru_cache(maxsize=256)
+def field_projection(names: Tuple[str, ...]) -> ProductProjection:
+    """Projection onto a subset of ProductResponse fields (id always included)"""
+    model = create_model(
+        "ProductFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (ProductResponse.model_fields[name].annotation, ProductResponse.model_fields[name]) for name in names},
+    )
+    return ProductProjection(",".join(names), names, TypeAdapter(List[model]))
+
+
+def product_projection(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> ProductProjection:
+    """fields= query parameter of the product list endpoints"""
+    if not fields:
+        return FULL_PROJECTION
+    if fields == "card":
+        return CARD_PROJECTION
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - ProductResponse.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown product fields: {', '.join(sorted(unknown))}"
+        )
+    # Canonical order, so equivalent selections share a cache entry
+    names = tuple(name for name in ProductResponse.model_fields if name in requested or name == "id")
+    return field_projection(names)
+
+
+def store_info_json(instructor: Tenant) -> bytes:
+    """Public store information (store page header, footer, banners)"""
+    return json.dumps({
+        "store_name": instructor.store_name,
+        "full_name": instructor.full_name,
+        "bio": instructor.bio,
+        "profile_image": instructor.profile_image,
+        "subdomain": instructor.subdomain,
+        # Footer information
+        "footer_company_name": instructor.footer_company_name,
+        "footer_ceo_name": instructor.footer_ceo_name,
+        "footer_privacy_officer": instructor.footer_privacy_officer,
+        "footer_business_number": instructor.footer_business_number,
+        "footer_sales_number": instructor.footer_sales_number,
+        "footer_contact": instructor.footer_contact,
+        "footer_business_hours": instructor.footer_business_hours,
+        "footer_address": instructor.footer_address,
+        # Banner slides
+        "banner_slides": instructor.banner_slides or [],
+        # Kakao Channel Chat
+        "kakao_channel_id": instructor.kakao_channel_id,
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def page_headers(products: list, limit: int) -> dict:
+    """X-Next-Cursor header for a product page"""
+    cursor = next_cursor(products, limit)
+    return {NEXT_CURSOR_HEADER: cursor} if cursor else {}
+
 
 @router.post("/products", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product_in: ProductCreate,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new product (instructor only)"""
@@ -30,23 +123,31 @@ async def create_product(
 async def list_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    current_instructor: Instructor = Depends(get_current_instructor),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (skip is ignored)"),
+    projection: ProductProjection = Depends(product_projection),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all products for current instructor"""
+    """List all products for current instructor (fields= selects a lighter payload)"""
     products = await product_crud.get_products_by_instructor(
         db,
         instructor_id=current_instructor.id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=decode_cursor(cursor),
+        columns=projection.columns
+    )
+    return Response(
+        content=projection.dump(products),
+        media_type="application/json",
+        headers=page_headers(products, limit)
     )
-    return products
 
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: str,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific product"""
@@ -72,7 +173,7 @@ async def get_product(
 async def update_product(
     product_id: str,
     product_in: ProductUpdate,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a product"""
@@ -103,7 +204,7 @@ async def update_product(
 @router.delete("/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
     product_id: str,
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a product"""
@@ -126,19 +227,59 @@ async def delete_product(
     return None
 
 
+@router.post("/products/bulk", response_model=ProductBulkResponse)
+async def bulk_products(
+    bulk_in: ProductBulkRequest,
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Publish, unpublish, patch or delete up to MAX_BULK_PRODUCTS products at once
+
+    Applied atomically with one statement; each id is reported as updated,
+    deleted or not_found (missing or another instructor's product).
+    """
+    ids = list(dict.fromkeys(bulk_in.ids))
+    operation = bulk_in.operation
+
+    if operation == ProductBulkOperation.DELETE:
+        done = await product_crud.bulk_delete_products(db, current_instructor.id, ids)
+        done_status = ProductBulkStatus.DELETED
+    else:
+        if operation == ProductBulkOperation.UPDATE:
+            values = bulk_in.patch.model_dump(exclude_unset=True) if bulk_in.patch else {}
+            if not values:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="patch is required for the update operation"
+                )
+        else:
+            values = {"is_published": operation == ProductBulkOperation.PUBLISH}
+        done = await product_crud.bulk_update_products(db, current_instructor.id, ids, values)
+        done_status = ProductBulkStatus.UPDATED
+
+    done = set(done)
+    return ProductBulkResponse(
+        operation=operation,
+        affected=len(done),
+        results=[
+            ProductBulkResult(id=product_id, status=done_status if product_id in done else ProductBulkStatus.NOT_FOUND)
+            for product_id in ids
+        ],
+    )
+
+
 @router.get("/products/stats/summary")
 async def get_products_stats(
-    current_instructor: Instructor = Depends(get_current_instructor),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get products statistics for current instructor"""
-    total_count = await product_crud.count_products_by_instructor(
-        db,
-        instructor_id=current_instructor.id
-    )
+    """Get products statistics for current instructor (from the counters row)"""
+    counters = await counters_crud.get_counters(db, instructor_id=current_instructor.id)
 
     return {
-        "total_products": total_count,
+        "total_products": counters.products,
+        "published_products": counters.published_products,
         "instructor_id": current_instructor.id,
     }
 
@@ -146,18 +287,18 @@ async def get_products_stats(
 # Public endpoints (no authentication required)
 @router.get("/public/store/{subdomain}/products", response_model=List[ProductResponse])
 async def get_public_store_products(
+    request: Request,
     subdomain: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-    response: Response = None
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (skip is ignored)"),
+    projection: ProductProjection = Depends(product_projection),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get published products for a store (public access)"""
-    # Add caching headers
-    if response:
-        response.headers["Cache-Control"] = "public, max-age=60"  # Cache for 60 seconds
+    """Get published products for a store (public access, cached; fields= selects a lighter payload)"""
+    page_cursor = decode_cursor(cursor)
     # Find instructor by subdomain
-    instructor = await instructor_crud.get_instructor_by_subdomain(db, subdomain=subdomain)
+    instructor = await tenant_resolver.resolve(db, subdomain)
 
     if not instructor:
         raise HTTPException(
@@ -165,67 +306,77 @@ async def get_public_store_products(
             detail="Store not found"
         )
 
-    # Get only published products
-    products = await product_crud.get_published_products_by_instructor(
-        db,
-        instructor_id=instructor.id,
-        skip=skip,
-        limit=limit
-    )
+    async def render():
+        # Get only published products
+        products = await product_crud.get_published_products_by_instructor(
+            db,
+            instructor_id=instructor.id,
+            skip=skip,
+            limit=limit,
+            cursor=page_cursor,
+            columns=projection.columns
+        )
+        return projection.dump(products), page_headers(products, limit)
 
-    return products
+    page = cursor if page_cursor else skip
+    name = f"products:{projection.name}:{page}:{limit}"
+    return await store_cache.respond(request, instructor.id, name, render)
 
 
-@router.get("/public/store/{subdomain}/info")
-async def get_public_store_info(
+@router.get("/public/store/{subdomain}/search", response_model=ProductSearchResponse)
+async def search_public_store_products(
+    request: Request,
     subdomain: str,
-    db: AsyncSession = Depends(get_db),
-    response: Response = None
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = Query(None, description="Only this category (facets still cover all)"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get store information (public access)"""
-    # Add caching headers
-    if response:
-        response.headers["Cache-Control"] = "public, max-age=60"  # Cache for 60 seconds
-
-    instructor = await instructor_crud.get_instructor_by_subdomain(db, subdomain=subdomain)
+    """Search a store's published products (public access, cached)"""
+    terms = product_crud.search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query has no searchable words"
+        )
 
+    instructor = await tenant_resolver.resolve(db, subdomain)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Store not found"
         )
 
-    return {
-        "store_name": instructor.store_name,
-        "full_name": instructor.full_name,
-        "bio": instructor.bio,
-        "profile_image": instructor.profile_image,
-        "subdomain": instructor.subdomain,
-        # Footer information
-        "footer_company_name": instructor.footer_company_name,
-        "footer_ceo_name": instructor.footer_ceo_name,
-        "footer_privacy_officer": instructor.footer_privacy_officer,
-        "footer_business_number": instructor.footer_business_number,
-        "footer_sales_number": instructor.footer_sales_number,
-        "footer_contact": instructor.footer_contact,
-        "footer_business_hours": instructor.footer_business_hours,
-        "footer_address": instructor.footer_address,
-        # Banner slides
-        "banner_slides": instructor.banner_slides or [],
-        # Kakao Channel Chat
-        "kakao_channel_id": instructor.kakao_channel_id,
-    }
+    async def render() -> bytes:
+        products, total, facets = await product_crud.search_published_products(
+            db,
+            instructor_id=instructor.id,
+            terms=terms,
+            category=category,
+            skip=skip,
+            limit=limit,
+            columns=CARD_PROJECTION.columns
+        )
+        return ProductSearchResponse(
+            query=" ".join(terms),
+            total=total,
+            items=CARD_PROJECTION.adapter.validate_python(products, from_attributes=True),
+            categories=facets,
+        ).model_dump_json().encode("utf-8")
 
+    name = f"search:{json.dumps([terms, category, skip, limit], ensure_ascii=False)}"
+    return await store_cache.respond(request, instructor.id, name, render)
 
-@router.get("/public/store/{subdomain}/products/{product_id}", response_model=ProductResponse)
-async def get_public_product(
+
+@router.get("/public/store/{subdomain}/info")
+async def get_public_store_info(
+    request: Request,
     subdomain: str,
-    product_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get a single published product (public access)"""
-    # Find instructor by subdomain
-    instructor = await instructor_crud.get_instructor_by_subdomain(db, subdomain=subdomain)
+    """Get store information (public access, cached)"""
+    instructor = await tenant_resolver.resolve(db, subdomain)
 
     if not instructor:
         raise HTTPException(
@@ -233,26 +384,88 @@ async def get_public_product(
             detail="Store not found"
         )
 
-    # Get product
-    product = await product_crud.get_product(db, product_id=product_id)
+    async def render() -> bytes:
+        return store_info_json(instructor)
 
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
+    return await store_cache.respond(request, instructor.id, "info", render)
+
+
+@router.get("/public/store/{subdomain}/products/{product_id}", response_model=ProductResponse)
+async def get_public_product(
+    request: Request,
+    subdomain: str,
+    product_id: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a single published product (public access, cached)"""
+    found, instructor = await tenant_resolver.cached(subdomain)
+    product = None
+    if not found:
+        # Store and product in one joined query
+        store, product = await product_crud.get_published_product_by_subdomain(
+            db, subdomain=subdomain, product_id=product_id
         )
+        instructor = await tenant_resolver.remember(subdomain, store)
 
-    # Check if product belongs to this instructor and is published
-    if product.instructor_id != instructor.id:
+    if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
+            detail="Store not found"
         )
 
-    if not product.is_published:
+    async def render() -> bytes:
+        nonlocal product
+        if product is None and found:
+            product = await product_crud.get_published_product(
+                db, instructor_id=instructor.id, product_id=product_id
+            )
+        if not product:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+        return ProductResponse.model_validate(product).model_dump_json().encode("utf-8")
+
+    return await store_cache.respond(request, instructor.id, f"product:{product_id}", render)
+
+
+@router.get("/public/store/{subdomain}/bootstrap")
+async def get_public_store_bootstrap(
+    request: Request,
+    subdomain: str,
+    limit: int = Query(100, ge=1, le=100),
+    projection: ProductProjection = Depends(product_projection),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Everything the store home page needs in one call (public access, cached)
+
+    Returns {"store": <same as /info>, "products": <same as /products>}.
+    On a cold cache the store and its products come from one joined query.
+    """
+    found, instructor = await tenant_resolver.cached(subdomain)
+    products = None
+    if not found:
+        store, products = await product_crud.get_storefront(
+            db, subdomain=subdomain, limit=limit, columns=projection.columns
+        )
+        instructor = await tenant_resolver.remember(subdomain, store)
+
+    if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
+            detail="Store not found"
         )
 
-    return product
+    async def render():
+        nonlocal products
+        if products is None:
+            products = await product_crud.get_published_products_by_instructor(
+                db, instructor_id=instructor.id, limit=limit, columns=projection.columns
+            )
+        body = b'{"store":' + store_info_json(instructor) + b',"products":' + projection.dump(products) + b'}'
+        return body, page_headers(products, limit)
+
+    return await store_cache.respond(
+        request, instructor.id, f"bootstrap:{projection.name}:{limit}", render
+    )
@@ -1,68 +1,155 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+import math
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_db
 from app.core.dependencies import get_current_instructor
-from app.core.s3 import s3_service
-from app.models.instructor import Instructor
-from typing import List
+from app.core.storage import storage, generate_unique_filename, MIN_PART_SIZE
+from app.core.principal import InstructorPrincipal
+from app.core.upload_stream import MultipartFileStream, UploadTooLarge
+from app.crud import upload as upload_crud
+from app.models.upload import UploadedAsset, UploadStatus
+from app.schemas.upload import (
+    UploadKind,
+    PresignMethod,
+    PresignRequest,
+    PresignResponse,
+    PresignedPart,
+    UploadCompleteRequest,
+    UploadedAssetResponse,
+)
 
 router = APIRouter()
 
+MB = 1024 * 1024
 
-@router.post("/upload/image", status_code=status.HTTP_201_CREATED)
-async def upload_image(
-    file: UploadFile = File(...),
-    current_instructor: Instructor = Depends(get_current_instructor)
-):
-    """
-    Upload an image file (thumbnail, profile image, etc.)
+# S3 allows at most 10000 parts per multipart upload
+MAX_PARTS = 10000
 
-    Allowed formats: jpg, jpeg, png, gif, webp
-    Max size: 10MB
-    """
-    # Check file extension
-    allowed_extensions = ['jpg', 'jpeg', 'png', 'gif', 'webp']
-    file_extension = file.filename.split('.')[-1].lower()
+# Allowed extensions, content types, max size and folder per upload kind
+UPLOAD_RULES = {
+    UploadKind.IMAGE: {
+        "extensions": ['jpg', 'jpeg', 'png', 'gif', 'webp'],
+        "content_types": ("image/",),
+        "max_size": 10 * MB,
+        "folder": "images",
+    },
+    UploadKind.VIDEO: {
+        "extensions": ['mp4', 'avi', 'mov', 'wmv', 'flv'],
+        "content_types": ("video/",),
+        "max_size": 500 * MB,
+        "folder": "videos",
+    },
+    UploadKind.DOCUMENT: {
+        "extensions": ['pdf', 'epub', 'mobi', 'doc', 'docx'],
+        "content_types": ("application/",),
+        "max_size": 50 * MB,
+        "folder": "documents",
+    },
+}
 
+
+def check_extension(filename: str, kind: UploadKind) -> None:
+    allowed_extensions = UPLOAD_RULES[kind]["extensions"]
+    file_extension = filename.split('.')[-1].lower()
     if file_extension not in allowed_extensions:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
         )
 
-    # Check file size (10MB limit)
-    content = await file.read()
-    if len(content) > 10 * 1024 * 1024:  # 10MB
+
+def check_content_type(content_type: str, kind: UploadKind) -> None:
+    if not content_type.lower().startswith(UPLOAD_RULES[kind]["content_types"]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds 10MB limit"
+            detail=f"Invalid content type for {kind.value}: {content_type}"
         )
 
+
+def size_limit_error(kind: UploadKind) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File size exceeds {UPLOAD_RULES[kind]['max_size'] // MB}MB limit"
+    )
+
+
+def instructor_folder(instructor_id: str, kind: UploadKind) -> str:
+    return f"instructors/{instructor_id}/{UPLOAD_RULES[kind]['folder']}"
+
+# The body is parsed by MultipartFileStream, so describe it for the docs
+FILE_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+async def stream_upload(request: Request, kind: UploadKind, instructor_id: str) -> dict:
+    """
+    Stream the request's file field straight to storage
+
+    The file is never held in memory as a whole: the size limit is checked
+    against Content-Length before reading and against the bytes received
+    while streaming, aborting the upload as soon as it is exceeded.
+    """
+    stream = MultipartFileStream(request, max_size=UPLOAD_RULES[kind]["max_size"])
     try:
-        # Upload to S3
-        file_url = await s3_service.upload_file(
-            file_content=content,
-            filename=file.filename,
-            content_type=file.content_type,
-            folder=f"instructors/{current_instructor.id}/images"
-        )
+        await stream.start()
+    except UploadTooLarge:
+        raise size_limit_error(kind)
 
-        return {
-            "url": file_url,
-            "filename": file.filename,
-            "content_type": file.content_type,
-            "size": len(content)
-        }
+    # Check file extension
+    check_extension(stream.filename, kind)
 
+    key = f"{instructor_folder(instructor_id, kind)}/{generate_unique_filename(stream.filename)}"
+    try:
+        await storage.upload_stream(stream, key, content_type=stream.content_type)
+    except UploadTooLarge:
+        raise size_limit_error(kind)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+    return {
+        "url": storage.file_url(key),
+        "filename": stream.filename,
+        "content_type": stream.content_type,
+        "size": stream.size
+    }
 
-@router.post("/upload/video", status_code=status.HTTP_201_CREATED)
+
+@router.post("/upload/image", status_code=status.HTTP_201_CREATED, openapi_extra=FILE_UPLOAD_OPENAPI)
+async def upload_image(
+    request: Request,
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor)
+):
+    """
+    Upload an image file (thumbnail, profile image, etc.)
+
+    Allowed formats: jpg, jpeg, png, gif, webp
+    Max size: 10MB
+    """
+    return await stream_upload(request, UploadKind.IMAGE, current_instructor.id)
+
+
+@router.post("/upload/video", status_code=status.HTTP_201_CREATED, openapi_extra=FILE_UPLOAD_OPENAPI)
 async def upload_video(
-    file: UploadFile = File(...),
-    current_instructor: Instructor = Depends(get_current_instructor)
+    request: Request,
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor)
 ):
     """
     Upload a video file
@@ -70,40 +157,50 @@ async def upload_video(
     Allowed formats: mp4, avi, mov, wmv, flv
     Max size: 500MB
     """
-    # Check file extension
-    allowed_extensions = ['mp4', 'avi', 'mov', 'wmv', 'flv']
-    file_extension = file.filename.split('.')[-1].lower()
+    return await stream_upload(request, UploadKind.VIDEO, current_instructor.id)
 
-    if file_extension not in allowed_extensions:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
-        )
 
-    # Check file size (500MB limit)
-    content = await file.read()
-    if len(content) > 500 * 1024 * 1024:  # 500MB
+@router.post("/upload/document", status_code=status.HTTP_201_CREATED, openapi_extra=FILE_UPLOAD_OPENAPI)
+async def upload_document(
+    request: Request,
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor)
+):
+    """
+    Upload a document file (ebook, PDF, etc.)
+
+    Allowed formats: pdf, epub, mobi, doc, docx
+    Max size: 50MB
+    """
+    return await stream_upload(request, UploadKind.DOCUMENT, current_instructor.id)
+
+
+@router.delete("/upload")
+async def delete_file(
+    file_url: str,
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor)
+):
+    """
+    Delete an uploaded file
+
+    Note: This only deletes the file if it belongs to the current instructor
+    """
+    # Check if the file URL belongs to the current instructor
+    key = storage.key_from_url(file_url)
+    if key is None or not key.startswith(f"instructors/{current_instructor.id}/"):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds 500MB limit"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to delete this file"
         )
 
     try:
-        # Upload to S3
-        file_url = await s3_service.upload_file(
-            file_content=content,
-            filename=file.filename,
-            content_type=file.content_type,
-            folder=f"instructors/{current_instructor.id}/videos"
-        )
-
-        return {
-            "url": file_url,
-            "filename": file.filename,
-            "content_type": file.content_type,
-            "size": len(content)
-        }
+        await storage.delete(key)
+        return {"message": "File deleted successfully"}
 
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file URL"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -111,88 +208,196 @@ async def upload_video(
         )
 
 
-@router.post("/upload/document", status_code=status.HTTP_201_CREATED)
-async def upload_document(
-    file: UploadFile = File(...),
-    current_instructor: Instructor = Depends(get_current_instructor)
-):
-    """
-    Upload a document file (ebook, PDF, etc.)
+def asset_response(asset: UploadedAsset) -> UploadedAssetResponse:
+    return UploadedAssetResponse(
+        id=asset.id,
+        kind=asset.kind,
+        filename=asset.filename,
+        content_type=asset.content_type,
+        size=asset.size,
+        status=asset.status,
+        url=storage.file_url(asset.s3_key),
+        created_at=asset.created_at,
+        completed_at=asset.completed_at,
+    )
 
-    Allowed formats: pdf, epub, mobi, doc, docx
-    Max size: 50MB
-    """
-    # Check file extension
-    allowed_extensions = ['pdf', 'epub', 'mobi', 'doc', 'docx']
-    file_extension = file.filename.split('.')[-1].lower()
 
-    if file_extension not in allowed_extensions:
+def require_direct_upload() -> None:
+    if not storage.supports_direct_upload:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Direct uploads are not supported by the storage backend"
         )
-
-    # Check file size (50MB limit)
-    content = await file.read()
-    if len(content) > 50 * 1024 * 1024:  # 50MB
+    if not storage.is_configured():
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds 50MB limit"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Storage is not configured"
         )
 
-    try:
-        # Upload to S3
-        file_url = await s3_service.upload_file(
-            file_content=content,
-            filename=file.filename,
-            content_type=file.content_type,
-            folder=f"instructors/{current_instructor.id}/documents"
+
+@router.post("/upload/presign", response_model=PresignResponse, status_code=status.HTTP_201_CREATED)
+async def presign_upload(
+    upload_in: PresignRequest,
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Issue presigned URLs so the browser uploads straight to S3
+
+    Same formats and size limits as the /upload/{kind} endpoints. Files over
+    S3_PRESIGN_MULTIPART_THRESHOLD get one presigned URL per part (PUT each
+    part, keep the ETag response headers). Call /complete afterwards.
+    """
+    require_direct_upload()
+    kind = upload_in.kind
+    check_extension(upload_in.filename, kind)
+    check_content_type(upload_in.content_type, kind)
+    if upload_in.size > UPLOAD_RULES[kind]["max_size"]:
+        raise size_limit_error(kind)
+
+    method = upload_in.method
+    if method is None:
+        method = (
+            PresignMethod.MULTIPART if upload_in.size > settings.S3_PRESIGN_MULTIPART_THRESHOLD
+            else PresignMethod.POST
         )
 
-        return {
-            "url": file_url,
-            "filename": file.filename,
-            "content_type": file.content_type,
-            "size": len(content)
-        }
+    expires_in = settings.S3_PRESIGN_EXPIRES
+    s3_key = (
+        f"{instructor_folder(current_instructor.id, kind)}/"
+        f"{generate_unique_filename(upload_in.filename)}"
+    )
+    response = {"key": s3_key, "method": method, "expires_in": expires_in}
+    upload_id = None
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+    if method == PresignMethod.POST:
+        post = storage.presigned_post(
+            s3_key, upload_in.content_type, UPLOAD_RULES[kind]["max_size"], expires_in
+        )
+        response.update(url=post["url"], fields=post["fields"])
+    elif method == PresignMethod.PUT:
+        response.update(
+            url=storage.presigned_put_url(s3_key, upload_in.content_type, expires_in),
+            headers={"Content-Type": upload_in.content_type},
+        )
+    else:
+        part_size = max(settings.S3_MULTIPART_PART_SIZE, MIN_PART_SIZE, math.ceil(upload_in.size / MAX_PARTS))
+        upload_id = await storage.create_multipart_upload(s3_key, upload_in.content_type)
+        response.update(
+            part_size=part_size,
+            parts=[
+                PresignedPart(
+                    part_number=number,
+                    url=storage.presigned_part_url(s3_key, upload_id, number, expires_in),
+                )
+                for number in range(1, math.ceil(upload_in.size / part_size) + 1)
+            ],
         )
 
+    asset = await upload_crud.create_asset(
+        db,
+        instructor_id=current_instructor.id,
+        kind=kind.value,
+        s3_key=s3_key,
+        filename=upload_in.filename,
+        content_type=upload_in.content_type,
+        size=upload_in.size,
+        multipart_upload_id=upload_id,
+    )
+    return PresignResponse(asset_id=asset.id, **response)
 
-@router.delete("/upload")
-async def delete_file(
-    file_url: str,
-    current_instructor: Instructor = Depends(get_current_instructor)
+
+@router.post("/upload/presign/{asset_id}/complete", response_model=UploadedAssetResponse)
+async def complete_presigned_upload(
+    asset_id: str,
+    complete_in: UploadCompleteRequest = UploadCompleteRequest(),
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Delete a file from S3
+    Confirm a presigned upload
 
-    Note: This only deletes the file if it belongs to the current instructor
+    Completes the multipart upload if any, then checks the stored object's
+    size and content type; invalid objects are deleted and the upload marked
+    ABORTED.
     """
-    # Check if the file URL belongs to the current instructor
-    if f"instructors/{current_instructor.id}" not in file_url:
+    require_direct_upload()
+    asset = await upload_crud.get_asset(db, asset_id=asset_id, instructor_id=current_instructor.id)
+    if not asset:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to delete this file"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    if asset.status == UploadStatus.COMPLETED:
+        return asset_response(asset)
+    if asset.status == UploadStatus.ABORTED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload was aborted"
         )
 
-    try:
-        success = await s3_service.delete_file(file_url)
-
-        if success:
-            return {"message": "File deleted successfully"}
+    if asset.multipart_upload_id:
+        if complete_in.parts:
+            parts = [{"PartNumber": p.part_number, "ETag": p.etag} for p in complete_in.parts]
         else:
+            parts = await storage.list_uploaded_parts(asset.s3_key, asset.multipart_upload_id)
+        try:
+            await storage.complete_multipart_upload(asset.s3_key, asset.multipart_upload_id, parts)
+        except Exception as e:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to delete file"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to complete multipart upload: {str(e)}"
             )
 
-    except Exception as e:
+    stored = await storage.head(asset.s3_key)
+    if stored is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File has not been uploaded yet"
+        )
+
+    kind = UploadKind(asset.kind)
+    error = None
+    if stored.size > UPLOAD_RULES[kind]["max_size"]:
+        error = size_limit_error(kind)
+    elif stored.content_type.split(";")[0].strip().lower() != asset.content_type.lower():
+        error = HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded content type does not match the requested one"
         )
+    if error:
+        await storage.delete(asset.s3_key)
+        await upload_crud.abort_asset(db, asset)
+        raise error
+
+    asset = await upload_crud.complete_asset(db, asset, size=stored.size)
+    return asset_response(asset)
+
+
+@router.delete("/upload/presign/{asset_id}")
+async def abort_presigned_upload(
+    asset_id: str,
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel a pending presigned upload (uploaded parts/objects are deleted)
+    """
+    require_direct_upload()
+    asset = await upload_crud.get_asset(db, asset_id=asset_id, instructor_id=current_instructor.id)
+    if not asset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    if asset.status != UploadStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is already {asset.status.value}"
+        )
+
+    if asset.multipart_upload_id:
+        await storage.abort_multipart_upload(asset.s3_key, asset.multipart_upload_id)
+    await storage.delete(asset.s3_key)
+    await upload_crud.abort_asset(db, asset)
+    return {"message": "Upload aborted"}
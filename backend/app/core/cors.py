@@ -0,0 +1,163 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Methods advertised in preflight responses
+ALLOWED_METHODS = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
+
+# Response headers readable by the frontend (list pagination, search totals)
+EXPOSED_HEADERS = "X-Next-Cursor, X-Total-Count"
+
+# Always allowed on top of BACKEND_CORS_ORIGINS (the main domain, every
+# instructor store and local development), so an older .env listing only
+# exact origins does not lock the stores out
+ALWAYS_ALLOWED_ORIGINS = (
+    "https://class-on.kr",
+    "https://*.class-on.kr",
+    "http://localhost",
+    "http://localhost:*",
+)
+
+# Hosts under which anyone can publish a site. A wildcard label directly
+# below one of these (or below a bare TLD), e.g. "https://*.vercel.app",
+# would hand credentialed access to every site there and is refused
+PUBLIC_SUFFIXES = frozenset({
+    "vercel.app", "netlify.app", "pages.dev", "workers.dev", "github.io",
+    "herokuapp.com", "onrender.com", "fly.dev", "web.app", "firebaseapp.com",
+    "azurewebsites.net", "cloudfront.net", "amazonaws.com", "ngrok.io", "ngrok-free.app",
+    "co.kr", "or.kr", "ne.kr", "go.kr", "ac.kr", "co.jp", "co.uk",
+})
+
+# Upper bound for memoized origin decisions (protects against random Origin spam)
+MATCH_CACHE_SIZE = 4096
+
+
+class OriginMatcher:
+    """
+    Decide whether an Origin header value is allowed
+
+    Entries without "*" are matched exactly. Entries with "*" are compiled once,
+    where "*" matches (part of) a single DNS label or a port, e.g.
+    "https://*.class-on.kr", "https://classon-v2-*.vercel.app" or
+    "http://localhost:*". A whole-label wildcard directly below a public
+    suffix raises ValueError, since allowed origins get credentials.
+    Decisions are memoized per origin.
+    """
+
+    def __init__(self, origins: Iterable[str]):
+        self.exact = set()
+        patterns = []
+        for origin in origins:
+            origin = origin.strip().rstrip("/")
+            if not origin:
+                continue
+            if "*" in origin:
+                check_wildcard(origin)
+                pattern = re.escape(origin).replace(r"\*", "[a-zA-Z0-9-]+")
+                patterns.append(f"(?:{pattern})")
+            else:
+                self.exact.add(origin.encode("latin-1"))
+
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+        self._cache: Dict[bytes, bool] = {}
+
+    def is_allowed(self, origin: bytes) -> bool:
+        """Check a raw Origin header value"""
+        allowed = self._cache.get(origin)
+        if allowed is not None:
+            return allowed
+
+        allowed = origin in self.exact
+        if not allowed and self.pattern is not None:
+            allowed = self.pattern.fullmatch(origin.decode("latin-1")) is not None
+
+        if len(self._cache) >= MATCH_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[origin] = allowed
+        return allowed
+
+
+def check_wildcard(origin: str) -> None:
+    """Refuse wildcard origins that would match sites run by anyone"""
+    host = origin.split("://", 1)[-1].split(":", 1)[0]
+    labels = host.split(".")
+    for index, label in enumerate(labels):
+        if "*" not in label:
+            continue
+        suffix = ".".join(labels[index + 1:])
+        if label == "*" and (suffix in PUBLIC_SUFFIXES or suffix.count(".") == 0):
+            raise ValueError(
+                f"CORS origin {origin!r} matches every site under {suffix or 'any domain'!r}; "
+                f"list the project's hosts or use a prefix such as 'https://project-*.{suffix or 'example.com'}'"
+            )
+
+
+class CORSMiddleware:
+    """
+    Pure ASGI CORS middleware
+
+    Allowed origins (allow_origins plus ALWAYS_ALLOWED_ORIGINS) are echoed
+    back with credentials enabled, and preflight responses carry
+    Access-Control-Max-Age so browsers can cache them. Only OPTIONS requests
+    with Access-Control-Request-Method are answered as preflights; other
+    OPTIONS requests and requests without an allowed Origin reach the app.
+    """
+
+    def __init__(self, app, allow_origins: Iterable[str], max_age: int = 600):
+        self.app = app
+        self.matcher = OriginMatcher([*ALWAYS_ALLOWED_ORIGINS, *allow_origins])
+
+        # Header blocks are built once and reused for every request
+        self.simple_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-expose-headers", EXPOSED_HEADERS.encode("latin-1")),
+            (b"vary", b"Origin"),
+        ]
+        self.preflight_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-allow-methods", ALLOWED_METHODS.encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"vary", b"Origin, Access-Control-Request-Headers"),
+            (b"content-length", b"0"),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin: Optional[bytes] = None
+        request_method: Optional[bytes] = None
+        request_headers: Optional[bytes] = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None or not self.matcher.is_allowed(origin):
+            await self.app(scope, receive, send)
+            return
+
+        # Answer preflight requests directly
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = [(b"access-control-allow-origin", origin)]
+            headers.extend(self.preflight_headers)
+            if request_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        simple_headers = self.simple_headers
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"access-control-allow-origin", origin))
+                headers.extend(simple_headers)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
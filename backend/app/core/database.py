@@ -1,29 +1,277 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import asyncio
+import hashlib
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import declarative_base, Session
+from sqlalchemy.sql import functions
+from app.core.cache import create_cache
 from app.core.config import settings
+from app.core.db_metrics import PoolMetrics, instrumented_pool_class
+
+
+def engine_options(url: str, metrics: PoolMetrics) -> dict:
+    """Build create_async_engine() keyword arguments for a database URL"""
+    options = {
+        "echo": settings.DATABASE_ECHO,
+        "future": True,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+    # In-memory SQLite (tests) must keep its single static connection
+    if ":memory:" in url:
+        return options
+
+    options.update({
+        "poolclass": instrumented_pool_class(metrics),
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    })
+    if url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+class PrimarySession(Session):
+    """Session bound to the primary; records writes for read-your-writes pinning"""
+
+
+class PrimaryAsyncSession(AsyncSession):
+    """Pins the client to the primary once a commit that wrote has returned"""
+
+    async def commit(self) -> None:
+        await super().commit()
+        client_key = self.info.pop("pin_client", None)
+        if client_key:
+            await read_your_writes.pin(client_key)
+
 
 # Create async engine
+pool_metrics = PoolMetrics()
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    future=True,
-    pool_pre_ping=True,
+    **engine_options(settings.DATABASE_URL, pool_metrics),
 )
+pool_metrics.attach(engine.sync_engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=PrimaryAsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False,
 )
 
+# Optional read replica
+replica_metrics = PoolMetrics()
+replica_engine: Optional[AsyncEngine] = None
+ReplicaSessionLocal: Optional[async_sessionmaker] = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        settings.DATABASE_REPLICA_URL,
+        **engine_options(settings.DATABASE_REPLICA_URL, replica_metrics),
+    )
+    replica_metrics.attach(replica_engine.sync_engine)
+    ReplicaSessionLocal = async_sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+class ModelBase:
+    # Fetch server-generated columns (created_at, updated_at, ...) with
+    # INSERT/UPDATE ... RETURNING, so writes never need a refresh() SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+
 # Base class for models
-Base = declarative_base()
+Base = declarative_base(cls=ModelBase)
+
+
+@event.listens_for(Base, "before_insert", propagate=True)
+def _load_null_columns(mapper, connection, target):
+    """
+    Insert unset columns without any default as explicit NULLs so they count
+    as loaded afterwards (otherwise reading them after commit needs a SELECT)
+    """
+    state_dict = target.__dict__
+    for prop in mapper.column_attrs:
+        column = prop.columns[0]
+        if (
+            prop.key not in state_dict
+            and column.default is None
+            and column.server_default is None
+        ):
+            setattr(target, prop.key, None)
+
+
+class ReadYourWrites:
+    """
+    Clients that recently committed a write (see _client_key)
+
+    Pinned clients read from the primary until the window expires, so e.g. a
+    customer sees their order right after checkout even if the replica lags.
+    Pins live in the shared cache when CACHE_REDIS_URL is set, so every
+    worker sees them; the in-process fallback only holds with a single
+    worker process (another worker may serve the next read from the
+    replica).
+    """
+
+    def __init__(self, window: float, max_entries: int = 100_000):
+        self.window = window
+        self.cache = create_cache("read_your_writes", max_entries)
+
+    @staticmethod
+    def _key(client_key: str) -> str:
+        # Credentials are never stored, only their hash
+        return hashlib.sha256(client_key.encode("utf-8")).hexdigest()
+
+    async def pin(self, client_key: str) -> None:
+        await self.cache.set(self._key(client_key), 1, self.window)
+
+    async def is_pinned(self, client_key: Optional[str]) -> bool:
+        if not client_key:
+            return False
+        return await self.cache.get(self._key(client_key)) is not None
+
+
+class ReplicaLagMonitor:
+    """Measure replica lag at most once per check interval"""
+
+    # Zero when fully replayed, so an idle primary does not look like lag
+    POSTGRES_LAG_QUERY = text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, replica: AsyncEngine, max_lag: float, interval: float):
+        self.replica = replica
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: Optional[float] = None  # None = unknown / unreachable
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _measure(self) -> Optional[float]:
+        try:
+            async with self.replica.connect() as conn:
+                if self.replica.dialect.name == "postgresql":
+                    return float((await conn.execute(self.POSTGRES_LAG_QUERY)).scalar() or 0)
+                await conn.execute(text("SELECT 1"))
+                return 0.0
+        except Exception as e:
+            print(f"Replica lag check failed: {e}")
+            return None
+
+    async def is_usable(self) -> bool:
+        if time.monotonic() - self.checked_at >= self.interval and not self._lock.locked():
+            async with self._lock:
+                self.lag = await self._measure()
+                self.checked_at = time.monotonic()
+        return self.lag is not None and self.lag <= self.max_lag
+
+
+read_your_writes = ReadYourWrites(settings.READ_YOUR_WRITES_SECONDS)
+replica_lag = (
+    ReplicaLagMonitor(
+        replica_engine,
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+    )
+    if replica_engine is not None else None
+)
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_orm_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _pin_writer(session):
+    # The pin itself is awaited by PrimaryAsyncSession.commit()
+    if session.info.pop("wrote", False) and session.info.get("client_key"):
+        session.info["pin_client"] = session.info["client_key"]
+
+
+@compiles(functions.now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    """
+    now() on SQLite in the format SQLAlchemy binds datetimes with
+
+    CURRENT_TIMESTAMP has no fractional part ("2024-01-01 10:00:00"), and
+    SQLite compares timestamps as text, so server_default rows would sort
+    before an equal bound datetime ("...10:00:00.000000") and cursor
+    pagination would return the same page again.
+    """
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def dialect_insert(db: AsyncSession, model):
+    """INSERT construct of the session's dialect (supports ON CONFLICT upserts)"""
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def _client_key(request: Request) -> Optional[str]:
+    """
+    Who a read-your-writes pin belongs to: the Authorization header, else
+    the client address (first X-Forwarded-For hop behind the proxy)
+
+    Anonymous clients behind one address share a pin, which only sends a
+    few more reads to the primary.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return authorization
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        return "addr:" + forwarded.split(",")[0].strip()
+    if request.client is not None:
+        return "addr:" + request.client.host
+    return None
 
 
 # Dependency to get DB session
-async def get_db() -> AsyncSession:
+async def get_db(request: Request) -> AsyncSession:
     async with AsyncSessionLocal() as session:
+        if replica_engine is not None:
+            session.info["client_key"] = _client_key(request)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+# Dependency for read-only routes: replica session when it is configured,
+# caught up and the client has no recent writes; primary otherwise
+async def get_read_db(request: Request) -> AsyncSession:
+    client_key = _client_key(request)
+    use_replica = (
+        ReplicaSessionLocal is not None
+        and not await read_your_writes.is_pinned(client_key)
+        and await replica_lag.is_usable()
+    )
+
+    async with (ReplicaSessionLocal if use_replica else AsyncSessionLocal)() as session:
+        if replica_engine is not None and not use_replica:
+            session.info["client_key"] = client_key
         try:
             yield session
         finally:
@@ -0,0 +1,118 @@
+import time
+from bisect import bisect_left
+from typing import Dict, List, Type
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Checkout wait histogram bucket upper bounds (milliseconds)
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative counts, Prometheus style)"""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> Dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.total,
+            "sum": round(self.sum, 3),
+            "max": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+class PoolMetrics:
+    """
+    Connection pool telemetry collected from SQLAlchemy pool events
+
+    Pool gauges (in use, overflow, idle) are read from the pool itself;
+    counters are fed by the events below and the checkout wait histogram
+    by the pool class from instrumented_pool_class().
+    """
+
+    def __init__(self):
+        self.checkout_wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checkout_errors = 0
+
+    def attach(self, engine: Engine) -> None:
+        """Register pool event listeners (they survive engine.dispose())"""
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> Dict:
+        data = {
+            "pool_class": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "checkout_errors": self.checkout_errors,
+            "checkout_wait_ms": self.checkout_wait_ms.snapshot(),
+        }
+        # QueuePool gauges
+        if hasattr(pool, "checkedout"):
+            data.update({
+                "pool_size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return data
+
+
+def instrumented_pool_class(metrics: PoolMetrics) -> Type[AsyncAdaptedQueuePool]:
+    """
+    Build an AsyncAdaptedQueuePool subclass that times how long each checkout
+    waits for a connection (queueing for a free slot plus connecting a new one)
+    """
+
+    class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except Exception:
+                metrics.checkout_errors += 1
+                raise
+            finally:
+                metrics.checkout_wait_ms.observe((time.perf_counter() - start) * 1000)
+
+    return InstrumentedAsyncPool
@@ -1,18 +1,41 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.principal import (
+    InstructorPrincipal,
+    CustomerPrincipal,
+    get_cached_instructor,
+    cache_instructor,
+    get_cached_customer,
+    cache_customer,
+)
 from app.crud import instructor as instructor_crud, user as user_crud, customer as customer_crud
 from app.models.instructor import Instructor
 from app.models.user import User
 from app.models.customer import Customer
 from typing import Optional
+import secrets
 
 security = HTTPBearer()
 
 
+async def require_internal_access(
+    x_internal_token: Optional[str] = Header(None)
+) -> None:
+    """Guard internal endpoints with INTERNAL_API_TOKEN (closed when unset, also in DEBUG)"""
+    token = settings.INTERNAL_API_TOKEN
+    if token and x_internal_token and secrets.compare_digest(x_internal_token, token):
+        return
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Not Found"
+    )
+
+
 async def get_current_user_email(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> str:
@@ -41,19 +64,38 @@ async def get_current_user_email(
 async def get_current_instructor(
     email: str = Depends(get_current_user_email),
     db: AsyncSession = Depends(get_db)
+) -> InstructorPrincipal:
+    """Get current authenticated instructor (cached; no DB query on a hit)"""
+    principal = await get_cached_instructor(email)
+    if principal is None:
+        instructor = await instructor_crud.get_instructor_by_email(db, email=email)
+        if not instructor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Instructor not found"
+            )
+        principal = InstructorPrincipal.from_instructor(instructor)
+        await cache_instructor(principal)
+
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive instructor"
+        )
+    return principal
+
+
+async def get_current_instructor_record(
+    principal: InstructorPrincipal = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db)
 ) -> Instructor:
-    """Get current authenticated instructor"""
-    instructor = await instructor_crud.get_instructor_by_email(db, email=email)
+    """Get the full Instructor row of the authenticated instructor (profile routes)"""
+    instructor = await instructor_crud.get_instructor_by_id(db, instructor_id=principal.id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instructor not found"
         )
-    if not instructor.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive instructor"
-        )
     return instructor
 
 
@@ -77,8 +119,8 @@ async def get_current_user(
 
 
 async def get_current_active_instructor(
-    current_instructor: Instructor = Depends(get_current_instructor)
-) -> Instructor:
+    current_instructor: InstructorPrincipal = Depends(get_current_instructor)
+) -> InstructorPrincipal:
     """Get current active instructor (additional check)"""
     if not current_instructor.is_active:
         raise HTTPException(
@@ -88,11 +130,10 @@ async def get_current_active_instructor(
     return current_instructor
 
 
-async def get_current_customer(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> Customer:
-    """Get current authenticated customer"""
+async def get_current_customer_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
+    """Extract and validate a customer JWT, return the customer ID"""
     try:
         token = credentials.credentials
         payload = jwt.decode(
@@ -100,39 +141,62 @@ async def get_current_customer(
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
 
-        # Check if this is a customer token
-        user_type = payload.get("user_type")
-        if user_type != "customer":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type",
-            )
+    # Check if this is a customer token
+    user_type = payload.get("user_type")
+    if user_type != "customer":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type",
+        )
 
-        customer_id = payload.get("customer_id")
-        if not customer_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-            )
+    customer_id = payload.get("customer_id")
+    if not customer_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    return customer_id
 
+
+async def get_current_customer(
+    customer_id: str = Depends(get_current_customer_id),
+    db: AsyncSession = Depends(get_db)
+) -> CustomerPrincipal:
+    """Get current authenticated customer (cached; no DB query on a hit)"""
+    principal = await get_cached_customer(customer_id)
+    if principal is None:
         customer = await customer_crud.get_customer(db, customer_id=customer_id)
         if not customer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Customer not found"
             )
+        principal = CustomerPrincipal.from_customer(customer)
+        await cache_customer(principal)
 
-        if not customer.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Inactive customer account"
-            )
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive customer account"
+        )
+    return principal
 
-        return customer
 
-    except JWTError:
+async def get_current_customer_record(
+    principal: CustomerPrincipal = Depends(get_current_customer),
+    db: AsyncSession = Depends(get_db)
+) -> Customer:
+    """Get the full Customer row of the authenticated customer (profile routes)"""
+    customer = await customer_crud.get_customer(db, customer_id=principal.id)
+    if not customer:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer not found"
         )
+    return customer
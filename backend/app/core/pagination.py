@@ -0,0 +1,99 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Response header carrying the number of matches of a search
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in a list ordered by (created_at DESC, id DESC)"""
+    created_at: datetime
+    id: str
+
+
+def encode_position(*values) -> str:
+    """Opaque cursor from the sort key of the last row of a page (JSON values)"""
+    payload = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_position(value: Optional[str], types: Sequence[type]) -> Optional[list]:
+    """
+    Sort key of a cursor issued by encode_position, one value per type
+
+    400 if it was not issued by us: not a list of exactly those JSON types.
+    """
+    if not value:
+        return None
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        # bool is an int subclass, but never part of a sort key here
+        or any(isinstance(v, bool) or not isinstance(v, t) for v, t in zip(values, types))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
+def encode_cursor(row) -> str:
+    """Opaque cursor pointing just after this row"""
+    return encode_position(row.created_at.isoformat(), row.id)
+
+
+def decode_cursor(value: Optional[str]) -> Optional[Cursor]:
+    """Parse a cursor query parameter (400 if it was not issued by us)"""
+    position = decode_position(value, (str, str))
+    if position is None:
+        return None
+    try:
+        return Cursor(created_at=datetime.fromisoformat(position[0]), id=position[1])
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def paginate(query: Select, model, skip: int, limit: int, cursor: Optional[Cursor] = None) -> Select:
+    """
+    Newest-first page of a list query
+
+    With a cursor, rows are seeked with (created_at, id) < cursor, which the
+    (instructor_id, created_at, id) indexes serve in constant time whatever
+    the page; skip is ignored. Without one, plain OFFSET/LIMIT.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+    if cursor is not None:
+        return query.filter(tuple_(model.created_at, model.id) < (cursor.created_at, cursor.id))
+    return query.offset(skip)
+
+
+def next_cursor(rows: Sequence, limit: int) -> Optional[str]:
+    """Cursor of the following page, if this page is full (there may be more rows)"""
+    if rows and len(rows) == limit:
+        return encode_cursor(rows[-1])
+    return None
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int) -> None:
+    """Add X-Next-Cursor to a list response"""
+    cursor = next_cursor(rows, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,73 @@
+from dataclasses import dataclass, asdict
+from typing import Optional
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.models.customer import Customer
+from app.models.instructor import Instructor
+
+
+@dataclass(frozen=True)
+class InstructorPrincipal:
+    """Authenticated instructor (only what authorization needs)"""
+    id: str
+    email: str
+    is_active: bool
+
+    @classmethod
+    def from_instructor(cls, instructor: Instructor) -> "InstructorPrincipal":
+        return cls(id=instructor.id, email=instructor.email, is_active=bool(instructor.is_active))
+
+
+@dataclass(frozen=True)
+class CustomerPrincipal:
+    """Authenticated customer (only what authorization needs)"""
+    id: str
+    instructor_id: str
+    is_active: bool
+
+    @classmethod
+    def from_customer(cls, customer: Customer) -> "CustomerPrincipal":
+        return cls(
+            id=customer.id,
+            instructor_id=customer.instructor_id,
+            is_active=bool(customer.is_active),
+        )
+
+
+# Principals keyed by token subject; short TTL bounds staleness of changes
+# made outside the crud functions below
+principal_cache = create_cache("principal", settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+def _instructor_key(email: str) -> str:
+    return f"instructor:{email}"
+
+
+def _customer_key(customer_id: str) -> str:
+    return f"customer:{customer_id}"
+
+
+async def get_cached_instructor(email: str) -> Optional[InstructorPrincipal]:
+    cached = await principal_cache.get(_instructor_key(email))
+    return InstructorPrincipal(**cached) if cached is not None else None
+
+
+async def cache_instructor(principal: InstructorPrincipal) -> None:
+    await principal_cache.set(_instructor_key(principal.email), asdict(principal), settings.PRINCIPAL_CACHE_TTL)
+
+
+async def invalidate_instructor(*emails: Optional[str]) -> None:
+    await principal_cache.delete(*(_instructor_key(e) for e in emails if e))
+
+
+async def get_cached_customer(customer_id: str) -> Optional[CustomerPrincipal]:
+    cached = await principal_cache.get(_customer_key(customer_id))
+    return CustomerPrincipal(**cached) if cached is not None else None
+
+
+async def cache_customer(principal: CustomerPrincipal) -> None:
+    await principal_cache.set(_customer_key(principal.id), asdict(principal), settings.PRINCIPAL_CACHE_TTL)
+
+
+async def invalidate_customer(customer_id: str) -> None:
+    await principal_cache.delete(_customer_key(customer_id))
@@ -1,12 +1,16 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 from jose import jwt
 import bcrypt
 from app.core.config import settings
+from app.core.db_metrics import Histogram, WAIT_BUCKETS_MS
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking; use verify_password_async in handlers)"""
     return bcrypt.checkpw(
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
@@ -14,12 +18,108 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    salt = bcrypt.gensalt()
+    """Hash a password (blocking; use get_password_hash_async in handlers)"""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when a bcrypt hash ("$2b$<cost>$...") was made with another cost"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool so it never blocks the event loop
+
+    At most `concurrency` jobs run at once; the rest wait on a semaphore, which
+    keeps the backlog visible (queue depth, wait histogram) instead of hidden
+    in the executor queue. bcrypt releases the GIL while hashing.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bcrypt")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.queue_wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.run_ms = Histogram(WAIT_BUCKETS_MS)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop (tests may start several)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return self._slots
+
+    async def run(self, func: Callable, *args):
+        slots = self._semaphore()
+        queued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.queued -= 1
+
+        started = time.perf_counter()
+        self.queue_wait_ms.observe((started - queued_at) * 1000)
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.run_ms.observe((time.perf_counter() - started) * 1000)
+            slots.release()
+
+    def snapshot(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            "run_ms": self.run_ms.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_CONCURRENCY)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password; on success also return a new hash when the stored one
+    uses a different bcrypt cost (the caller saves it), otherwise None
+    """
+    if not await verify_password_async(plain_password, hashed_password):
+        return False, None
+    if password_needs_rehash(hashed_password):
+        return True, await get_password_hash_async(plain_password)
+    return True, None
+
+
 def create_access_token(
     subject: Union[str, Any] = None,
     data: dict = None,
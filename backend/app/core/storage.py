@@ -0,0 +1,377 @@
+import asyncio
+import mimetypes
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Optional
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from app.core.config import settings
+
+# S3 rejects multipart parts (except the last one) smaller than 5MB
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class StorageNotConfigured(Exception):
+    """The storage backend is missing credentials or settings"""
+
+
+@dataclass
+class StoredObject:
+    size: int
+    content_type: str
+
+
+def generate_unique_filename(original_filename: str) -> str:
+    """Generate unique filename with timestamp and UUID"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    unique_id = str(uuid.uuid4())[:8]
+    extension = original_filename.split('.')[-1] if '.' in original_filename else ''
+
+    if extension:
+        return f"{timestamp}_{unique_id}.{extension}"
+    return f"{timestamp}_{unique_id}"
+
+
+class StorageBackend:
+    """
+    Async file storage interface
+
+    Files are addressed by key ("instructors/{id}/images/...") and exposed
+    through a public URL. Implementations must never block the event loop.
+    """
+
+    # Whether presigned direct-to-storage uploads are available
+    supports_direct_upload = False
+
+    def __init__(self, max_workers: int):
+        # Blocking I/O (boto3, file system) runs here
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    def is_configured(self) -> bool:
+        raise NotImplementedError
+
+    def file_url(self, key: str) -> str:
+        """Public URL of a stored file"""
+        raise NotImplementedError
+
+    def key_from_url(self, file_url: str) -> Optional[str]:
+        """Key of a file URL made by file_url(), None if it is not ours"""
+        raise NotImplementedError
+
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], key: str, content_type: str
+    ) -> None:
+        """Store a file from an async byte stream without buffering it whole"""
+        raise NotImplementedError
+
+    async def head(self, key: str) -> Optional[StoredObject]:
+        """Size and content type of a stored file, None if it does not exist"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def upload_file(
+        self,
+        file_content: bytes,
+        filename: str,
+        content_type: str,
+        folder: str = "uploads"
+    ) -> str:
+        """Store an in-memory file under folder and return its URL"""
+        async def single_chunk():
+            yield file_content
+
+        key = f"{folder}/{generate_unique_filename(filename)}"
+        await self.upload_stream(single_chunk(), key, content_type)
+        return self.file_url(key)
+
+    async def delete_file(self, file_url: str) -> bool:
+        """Delete a file by URL; False if the URL is not one of ours"""
+        key = self.key_from_url(file_url)
+        if key is None:
+            return False
+        await self.delete(key)
+        return True
+
+
+class S3Storage(StorageBackend):
+    """
+    Amazon S3 storage
+
+    boto3 is blocking, so every call runs on the storage executor with one
+    pooled HTTP connection per worker thread. Retries use botocore's
+    adaptive mode (client-side rate limiting on throttling errors) and
+    connect/read timeouts bound how long a thread can be stuck.
+    """
+
+    supports_direct_upload = True
+
+    def __init__(self):
+        super().__init__(max_workers=settings.S3_MAX_CONCURRENCY)
+        self.bucket = settings.S3_BUCKET_NAME
+        self.client = None
+        if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
+            self.client = boto3.client(
+                's3',
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION,
+                config=Config(
+                    max_pool_connections=settings.S3_MAX_CONCURRENCY,
+                    retries={"mode": "adaptive", "max_attempts": settings.S3_MAX_ATTEMPTS},
+                    connect_timeout=settings.S3_CONNECT_TIMEOUT,
+                    read_timeout=settings.S3_READ_TIMEOUT,
+                    tcp_keepalive=True,
+                ),
+            )
+
+    def is_configured(self) -> bool:
+        return self.client is not None and bool(self.bucket)
+
+    def file_url(self, key: str) -> str:
+        return f"https://{self.bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+    def key_from_url(self, file_url: str) -> Optional[str]:
+        # Format: https://bucket-name.s3.region.amazonaws.com/folder/filename
+        prefix = self.file_url("")
+        return file_url[len(prefix):] if file_url.startswith(prefix) else None
+
+    async def _call(self, method: str, **kwargs) -> dict:
+        """Run a boto3 client call on the storage executor"""
+        if not self.is_configured():
+            raise StorageNotConfigured("S3 is not configured. Please set AWS credentials and bucket name.")
+        return await self._run(getattr(self.client, method), Bucket=self.bucket, **kwargs)
+
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], key: str, content_type: str
+    ) -> None:
+        """
+        Data is cut into S3_MULTIPART_PART_SIZE parts and sent with a multipart
+        upload, at most S3_MULTIPART_MAX_IN_FLIGHT parts at a time; reading
+        from the stream pauses while all slots are busy. Memory per upload is
+        therefore bounded by part size * (parts in flight + 1). Files smaller
+        than one part go up with a single put_object. The multipart upload is
+        aborted if the stream or any part fails.
+        """
+        if not self.is_configured():
+            raise StorageNotConfigured("S3 is not configured. Please set AWS credentials and bucket name.")
+
+        part_size = max(settings.S3_MULTIPART_PART_SIZE, MIN_PART_SIZE)
+        slots = asyncio.Semaphore(settings.S3_MULTIPART_MAX_IN_FLIGHT)
+        buffer = bytearray()
+        upload_id = None
+        tasks = []
+
+        async def send_part(number: int, body: bytes) -> dict:
+            try:
+                result = await self._call(
+                    "upload_part", Key=key, UploadId=upload_id, PartNumber=number, Body=body,
+                )
+                return {"PartNumber": number, "ETag": result["ETag"]}
+            finally:
+                slots.release()
+
+        async def start_part(body: bytes) -> None:
+            nonlocal upload_id
+            if upload_id is None:
+                upload_id = await self.create_multipart_upload(key, content_type)
+            await slots.acquire()
+            # Fail fast instead of reading the rest of the upload
+            for task in tasks:
+                if task.done() and task.exception():
+                    slots.release()
+                    raise task.exception()
+            tasks.append(asyncio.create_task(send_part(len(tasks) + 1, body)))
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                while len(buffer) >= part_size:
+                    with memoryview(buffer) as view:
+                        body = view[:part_size].tobytes()
+                    del buffer[:part_size]
+                    await start_part(body)
+
+            if upload_id is None:
+                await self._call("put_object", Key=key, Body=bytes(buffer), ContentType=content_type)
+                return
+
+            if buffer:
+                await start_part(bytes(buffer))
+                buffer = bytearray()
+            parts = await asyncio.gather(*tasks)
+            await self.complete_multipart_upload(key, upload_id, parts)
+
+        except BaseException:
+            # Let parts already running in the executor finish (they cannot be
+            # cancelled), otherwise they could land after the abort
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if upload_id is not None:
+                try:
+                    await self.abort_multipart_upload(key, upload_id)
+                except ClientError as abort_error:
+                    print(f"Error aborting multipart upload {upload_id}: {abort_error}")
+            raise
+
+    async def head(self, key: str) -> Optional[StoredObject]:
+        try:
+            result = await self._call("head_object", Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(size=result["ContentLength"], content_type=result.get("ContentType", ""))
+
+    async def delete(self, key: str) -> None:
+        await self._call("delete_object", Key=key)
+
+    # Direct uploads: the client sends the bytes to S3 with presigned URLs
+    # (presigning is local signing, no network call)
+
+    def presigned_post(self, key: str, content_type: str, max_size: int, expires_in: int) -> dict:
+        """Presigned form POST; S3 itself rejects other content types or larger files"""
+        return self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires_in,
+        )
+
+    def presigned_put_url(self, key: str, content_type: str, expires_in: int) -> str:
+        """Presigned PUT; the request must send the same Content-Type"""
+        return self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket, "Key": key, "ContentType": content_type},
+            ExpiresIn=expires_in,
+        )
+
+    def presigned_part_url(self, key: str, upload_id: str, part_number: int, expires_in: int) -> str:
+        return self.client.generate_presigned_url(
+            "upload_part",
+            Params={"Bucket": self.bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+            ExpiresIn=expires_in,
+        )
+
+    async def create_multipart_upload(self, key: str, content_type: str) -> str:
+        """Start a multipart upload and return its UploadId"""
+        result = await self._call("create_multipart_upload", Key=key, ContentType=content_type)
+        return result["UploadId"]
+
+    async def list_uploaded_parts(self, key: str, upload_id: str) -> List[dict]:
+        """Parts uploaded so far, in complete_multipart_upload format"""
+        parts = []
+        marker = 0
+        while True:
+            page = await self._call("list_parts", Key=key, UploadId=upload_id, PartNumberMarker=marker)
+            parts += [{"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in page.get("Parts", [])]
+            if not page.get("IsTruncated"):
+                return parts
+            marker = page["NextPartNumberMarker"]
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: List[dict]) -> None:
+        await self._call(
+            "complete_multipart_upload", Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+        )
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        await self._call("abort_multipart_upload", Key=key, UploadId=upload_id)
+
+
+class LocalStorage(StorageBackend):
+    """
+    Local file system storage (single-node deployments, development, tests)
+
+    Files live under LOCAL_STORAGE_PATH and are served by the app at
+    LOCAL_STORAGE_URL (see main.py). Writes go to a temporary file that is
+    renamed into place, so readers never see a partial file.
+    """
+
+    # Bytes gathered before each write, so small chunks do not each cost a thread hop
+    WRITE_BUFFER = 1024 * 1024
+
+    def __init__(self, root: str, base_url: str):
+        super().__init__(max_workers=4)
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def is_configured(self) -> bool:
+        return True
+
+    def _path(self, key: str) -> Path:
+        # Keys are plain relative paths; "a/../b" would let a key prefix check
+        # (instructors/{id}/...) be bypassed
+        parts = key.split("/")
+        if any(part in ("", ".", "..") for part in parts):
+            raise ValueError(f"Invalid storage key: {key}")
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def file_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_from_url(self, file_url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return file_url[len(prefix):] if file_url.startswith(prefix) else None
+
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], key: str, content_type: str
+    ) -> None:
+        path = self._path(key)
+        partial = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.part")
+        await self._run(path.parent.mkdir, parents=True, exist_ok=True)
+        handle = await self._run(open, partial, "wb")
+        try:
+            buffer = bytearray()
+            async for chunk in chunks:
+                buffer += chunk
+                if len(buffer) >= self.WRITE_BUFFER:
+                    await self._run(handle.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await self._run(handle.write, bytes(buffer))
+            await self._run(handle.close)
+            await self._run(os.replace, partial, path)
+        except BaseException:
+            await self._run(handle.close)
+            await self._run(partial.unlink, missing_ok=True)
+            raise
+
+    async def head(self, key: str) -> Optional[StoredObject]:
+        path = self._path(key)
+        try:
+            stat = await self._run(path.stat)
+        except FileNotFoundError:
+            return None
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return StoredObject(size=stat.st_size, content_type=content_type)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._path(key).unlink, missing_ok=True)
+
+
+def create_storage() -> StorageBackend:
+    """Storage backend selected by STORAGE_BACKEND ("s3" or "local")"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.LOCAL_STORAGE_PATH, settings.LOCAL_STORAGE_URL)
+    return S3Storage()
+
+
+# Global storage instance
+storage = create_storage()
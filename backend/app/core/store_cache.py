@@ -0,0 +1,118 @@
+import hashlib
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+from fastapi import Request, Response
+from app.core.cache import CacheBackend, create_cache
+from app.core.config import settings
+from app.core.database import replica_engine
+
+# Versions outlive response entries
+VERSION_TTL = 24 * 3600
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class StoreResponseCache:
+    """
+    Serialized public storefront responses, keyed by store content version
+
+    Every store has a random version token; writes to its products or
+    profile call bump(), so entries of the old version are simply never
+    read again (they age out with the TTL). Each entry holds the JSON body
+    and a strong ETag (hash of the body), so repeat visitors get a 304.
+
+    Public reads may come from a lagging replica, so for a short time after
+    a bump responses are served but not cached, to avoid caching old rows
+    under the new version.
+
+    A bump must reach every worker, so several workers need the shared
+    cache; with enabled=False responses are rendered on every request (the
+    ETag still answers repeat visitors with a 304).
+    """
+
+    def __init__(self, cache: CacheBackend, ttl: float, version_ttl: float, enabled: bool = True):
+        self.cache = cache
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self.enabled = enabled
+        self.fill_delay = settings.REPLICA_MAX_LAG_SECONDS if replica_engine is not None else 0
+
+    async def _version(self, instructor_id: str) -> dict:
+        key = f"version:{instructor_id}"
+        version = await self.cache.get(key)
+        if version is None:
+            version = {"token": uuid.uuid4().hex[:16], "bumped_at": 0}
+            await self.cache.set(key, version, self.version_ttl)
+        return version
+
+    async def bump(self, *instructor_ids: str) -> None:
+        """Invalidate everything cached for these stores (call after commit)"""
+        if not self.enabled:
+            return
+        for instructor_id in instructor_ids:
+            await self.cache.set(
+                f"version:{instructor_id}",
+                {"token": uuid.uuid4().hex[:16], "bumped_at": time.time()},
+                self.version_ttl,
+            )
+
+    async def respond(
+        self,
+        request: Request,
+        instructor_id: str,
+        name: str,
+        render: Callable[[], Awaitable[Union[bytes, Tuple[bytes, Dict[str, str]]]]],
+        cache_control: str = "public, max-age=60",
+    ) -> Response:
+        """
+        Cached JSON response for one storefront resource
+
+        name identifies the resource within the store (including query
+        parameters); render() builds the JSON body on a miss, or a
+        (body, headers) pair when extra headers (e.g. X-Next-Cursor) must be
+        cached with it.
+        """
+        entry = version = key = None
+        if self.enabled:
+            version = await self._version(instructor_id)
+            key = f"response:{instructor_id}:{version['token']}:{name}"
+            entry = await self.cache.get(key)
+
+        if entry is None:
+            body, extra_headers = await render(), {}
+            if isinstance(body, tuple):
+                body, extra_headers = body
+            entry = {
+                "body": body.decode("utf-8"),
+                "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+                "headers": extra_headers,
+            }
+            if self.enabled and time.time() - version["bumped_at"] >= self.fill_delay:
+                await self.cache.set(key, entry, self.ttl)
+
+        headers = {"ETag": entry["etag"], "Cache-Control": cache_control, **entry.get("headers", {})}
+        if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+store_cache = StoreResponseCache(
+    create_cache("store", settings.STORE_CACHE_MAX_ENTRIES),
+    ttl=settings.STORE_CACHE_TTL,
+    version_ttl=VERSION_TTL,
+    enabled=bool(settings.CACHE_REDIS_URL) or settings.WEB_CONCURRENCY <= 1,
+)
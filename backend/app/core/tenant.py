@@ -0,0 +1,119 @@
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import CacheBackend, create_cache
+from app.core.config import settings
+from app.core.database import replica_engine
+from app.models.instructor import Instructor
+
+# Cached marker for subdomains that do not exist
+MISSING = "__missing__"
+
+# Cached marker for subdomains invalidated less than fill_delay ago
+INVALIDATED = "__invalidated__"
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """
+    Public store data of an instructor, resolved from a subdomain
+
+    Secrets (password hash, Kakao client secret) are never cached here.
+    """
+    id: str
+    subdomain: str
+    store_name: str
+    full_name: str
+    bio: Optional[str] = None
+    profile_image: Optional[str] = None
+    is_active: bool = True
+
+    # Footer information
+    footer_company_name: Optional[str] = None
+    footer_ceo_name: Optional[str] = None
+    footer_privacy_officer: Optional[str] = None
+    footer_business_number: Optional[str] = None
+    footer_sales_number: Optional[str] = None
+    footer_contact: Optional[str] = None
+    footer_business_hours: Optional[str] = None
+    footer_address: Optional[str] = None
+
+    # Banner slides
+    banner_slides: Optional[List[Dict[str, Any]]] = None
+
+    # Kakao Login / Channel
+    kakao_enabled: bool = False
+    kakao_client_id: Optional[str] = None
+    kakao_redirect_uri: Optional[str] = None
+    kakao_channel_id: Optional[str] = None
+
+    @classmethod
+    def from_instructor(cls, instructor: Instructor) -> "Tenant":
+        return cls(**{f.name: getattr(instructor, f.name) for f in fields(cls)})
+
+
+class TenantResolver:
+    """
+    Subdomain -> Tenant lookup with a TTL/LRU cache
+
+    Unknown subdomains are cached too (for a shorter time) so bots probing
+    random stores do not reach the database. Writes must call invalidate().
+
+    Lookups may come from a lagging replica, so for fill_delay seconds after
+    an invalidation the subdomain holds a marker instead: lookups miss and
+    are served but not cached, to avoid caching the old store (or a 404 for
+    a store just created) for the whole TTL.
+    """
+
+    def __init__(self, cache: CacheBackend, ttl: float, negative_ttl: float, fill_delay: float = 0):
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.fill_delay = fill_delay
+
+    async def cached(self, subdomain: str) -> Tuple[bool, Optional[Tenant]]:
+        """Cache-only lookup: (found in cache, tenant or None for an unknown store)"""
+        cached = await self.cache.get(subdomain)
+        if cached is None or cached == INVALIDATED:
+            return False, None
+        if cached == MISSING:
+            return True, None
+        return True, Tenant(**cached)
+
+    async def remember(self, subdomain: str, instructor: Optional[Instructor]) -> Optional[Tenant]:
+        """Cache the result of a lookup done elsewhere (e.g. joined with products)"""
+        tenant = Tenant.from_instructor(instructor) if instructor else None
+        if self.fill_delay and await self.cache.get(subdomain) == INVALIDATED:
+            return tenant
+
+        if tenant is None:
+            await self.cache.set(subdomain, MISSING, self.negative_ttl)
+        else:
+            await self.cache.set(subdomain, asdict(tenant), self.ttl)
+        return tenant
+
+    async def resolve(self, db: AsyncSession, subdomain: str) -> Optional[Tenant]:
+        found, tenant = await self.cached(subdomain)
+        if found:
+            return tenant
+
+        result = await db.execute(select(Instructor).filter(Instructor.subdomain == subdomain))
+        return await self.remember(subdomain, result.scalars().first())
+
+    async def invalidate(self, *subdomains: Optional[str]) -> None:
+        subdomains = [s for s in subdomains if s]
+        if not self.fill_delay:
+            await self.cache.delete(*subdomains)
+            return
+        # The marker expires when the replica has caught up
+        for subdomain in subdomains:
+            await self.cache.set(subdomain, INVALIDATED, self.fill_delay)
+
+
+tenant_resolver = TenantResolver(
+    create_cache("tenant", settings.TENANT_CACHE_MAX_ENTRIES),
+    ttl=settings.TENANT_CACHE_TTL,
+    negative_ttl=settings.TENANT_CACHE_NEGATIVE_TTL,
+    fill_delay=settings.REPLICA_MAX_LAG_SECONDS if replica_engine is not None else 0,
+)
@@ -0,0 +1,167 @@
+import hashlib
+import html
+import json
+import math
+import re
+from typing import Any, List, NamedTuple, Optional
+
+# Bump when the HTML or text output changes: every stored content_hash
+# becomes stale and app.jobs.render_ebook_sections re-renders the sections
+RENDERER_VERSION = 2
+
+# 한국어 기준 평균 읽기 속도 (공백 제외 글자 수 / 분)
+READING_CHARS_PER_MINUTE = 500
+
+# Deeper nodes are dropped (guards the recursion against hostile documents)
+MAX_DEPTH = 64
+
+# Node types of the editor's extensions (StarterKit, Image, Link) -> tags
+BLOCK_TAGS = {
+    "paragraph": "p",
+    "blockquote": "blockquote",
+    "bulletList": "ul",
+    "orderedList": "ol",
+    "listItem": "li",
+    "codeBlock": "pre",
+}
+VOID_TAGS = {"hardBreak": "<br>", "horizontalRule": "<hr>"}
+# Block nodes that end a line of the plain text (search index)
+TEXT_BLOCKS = {"paragraph", "heading", "listItem", "codeBlock", "blockquote"}
+MARK_TAGS = {"bold": "strong", "italic": "em", "strike": "s", "underline": "u", "code": "code"}
+
+SAFE_URL = re.compile(r"^(?:https?://|mailto:|/(?!/)|#)", re.IGNORECASE)
+SAFE_LANGUAGE = re.compile(r"^[\w+#-]{1,32}$")
+
+
+class RenderedSection(NamedTuple):
+    """What is stored for a section's Tiptap content"""
+    content_hash: str
+    content_html: str
+    content_text: str  # 검색용 본문 텍스트 (블록마다 줄바꿈)
+    reading_time: Optional[int]  # 분 (본문 텍스트가 없으면 None)
+
+
+def content_hash(content: Any) -> str:
+    """Hash of a Tiptap document (canonical JSON) and the renderer version"""
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{RENDERER_VERSION}:{canonical}".encode("utf-8")).hexdigest()
+
+
+def _attr(value: Any) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def _safe_url(value: Any) -> Optional[str]:
+    if isinstance(value, str) and SAFE_URL.match(value.strip()):
+        return value.strip()
+    return None
+
+
+class _Renderer:
+    """
+    Tiptap JSON -> HTML with a whitelist
+
+    Only the editor's node and mark types are emitted; text and attributes
+    are escaped, URLs must be http(s), mailto, relative or fragments, and
+    unknown nodes render their children only. Collects the plain text
+    (one line per block) and counts its non-whitespace characters on the
+    way for the reading time.
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.text_parts: List[str] = []
+        self.characters = 0
+
+    def node(self, node: Any, depth: int = 0) -> None:
+        if not isinstance(node, dict) or depth > MAX_DEPTH:
+            return
+        node_type = node.get("type")
+        attrs = node.get("attrs") if isinstance(node.get("attrs"), dict) else {}
+
+        if node_type == "text":
+            self.text(node)
+        elif node_type in VOID_TAGS:
+            self.parts.append(VOID_TAGS[node_type])
+            self.text_parts.append("\n")
+        elif node_type == "image":
+            src = _safe_url(attrs.get("src"))
+            if src:
+                alt = _attr(attrs.get("alt") or "")
+                title = f' title="{_attr(attrs["title"])}"' if attrs.get("title") else ""
+                self.parts.append(f'<img src="{_attr(src)}" alt="{alt}"{title}>')
+        elif node_type == "heading":
+            level = attrs.get("level")
+            level = level if level in (1, 2, 3, 4, 5, 6) else 2
+            self.element(f"h{level}", "", node, depth)
+        elif node_type == "orderedList":
+            start = attrs.get("start")
+            extra = f' start="{start}"' if isinstance(start, int) and start != 1 else ""
+            self.element("ol", extra, node, depth)
+        elif node_type == "codeBlock":
+            language = attrs.get("language")
+            self.parts.append("<pre>")
+            if isinstance(language, str) and SAFE_LANGUAGE.match(language):
+                self.element("code", f' class="language-{language}"', node, depth)
+            else:
+                self.element("code", "", node, depth)
+            self.parts.append("</pre>")
+        elif node_type in BLOCK_TAGS:
+            self.element(BLOCK_TAGS[node_type], "", node, depth)
+        else:
+            self.children(node, depth)
+
+        if node_type in TEXT_BLOCKS:
+            self.text_parts.append("\n")
+
+    def element(self, tag: str, attributes: str, node: dict, depth: int) -> None:
+        self.parts.append(f"<{tag}{attributes}>")
+        self.children(node, depth)
+        self.parts.append(f"</{tag}>")
+
+    def children(self, node: dict, depth: int) -> None:
+        content = node.get("content")
+        if isinstance(content, list):
+            for child in content:
+                self.node(child, depth + 1)
+
+    def text(self, node: dict) -> None:
+        text = node.get("text")
+        if not isinstance(text, str):
+            return
+        self.characters += sum(1 for char in text if not char.isspace())
+        self.text_parts.append(text)
+
+        opening, closing = [], []
+        marks = node.get("marks") if isinstance(node.get("marks"), list) else []
+        for mark in marks:
+            if not isinstance(mark, dict):
+                continue
+            mark_type = mark.get("type")
+            if mark_type == "link":
+                mark_attrs = mark.get("attrs") if isinstance(mark.get("attrs"), dict) else {}
+                href = _safe_url(mark_attrs.get("href"))
+                if href:
+                    opening.append(f'<a href="{_attr(href)}" target="_blank" rel="noopener noreferrer nofollow">')
+                    closing.append("</a>")
+            elif mark_type in MARK_TAGS:
+                opening.append(f"<{MARK_TAGS[mark_type]}>")
+                closing.append(f"</{MARK_TAGS[mark_type]}>")
+
+        self.parts.append("".join(opening) + html.escape(text, quote=False) + "".join(reversed(closing)))
+
+
+def render_section(content: Any) -> RenderedSection:
+    """
+    Render a section's Tiptap document
+
+    A plain function of its argument so it can run in a thread or in a
+    process pool (app.jobs.render_ebook_sections).
+    """
+    renderer = _Renderer()
+    renderer.node(content)
+    reading_time = (
+        math.ceil(renderer.characters / READING_CHARS_PER_MINUTE) if renderer.characters else None
+    )
+    content_text = re.sub(r"\n{2,}", "\n", "".join(renderer.text_parts)).strip()
+    return RenderedSection(content_hash(content), "".join(renderer.parts), content_text, reading_time)
@@ -0,0 +1,130 @@
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Allowance for the multipart framing around the file in Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """The streamed file grew past its size limit"""
+
+
+class MultipartFileStream:
+    """
+    Streams one file field of a multipart/form-data request as it arrives
+
+    Unlike UploadFile nothing is spooled to memory or disk: each chunk the
+    client sends is parsed, handed to the consumer and dropped, so memory
+    stays flat whatever the file size. Other form fields are ignored.
+
+    Usage:
+        stream = MultipartFileStream(request, max_size=...)
+        await stream.start()        # reads up to the file's headers
+        async for chunk in stream:  # raises UploadTooLarge past max_size
+            ...
+    """
+
+    def __init__(self, request: Request, max_size: int, field_name: str = "file"):
+        self.request = request
+        self.max_size = max_size
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+
+        self._events: List[Tuple[str, object]] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._headers = {}
+        self._in_file = False
+        self._reader = self._read()
+
+    # Parser callbacks (sync): only queue events for the file field
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._in_file = name == self.field_name and b"filename" in options and self.filename is None
+        if self._in_file:
+            filename = options[b"filename"].decode("utf-8", "replace")
+            content_type = self._headers.get(b"content-type", b"application/octet-stream")
+            self._events.append(("file", (filename, content_type.decode("latin-1"))))
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._events.append(("data", data[start:end]))
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self._events.append(("end", None))
+
+    async def _read(self) -> AsyncIterator[Tuple[str, object]]:
+        _, params = parse_options_header(self.request.headers.get("content-type", ""))
+        if b"boundary" not in params:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a multipart/form-data request"
+            )
+
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+        async for chunk in self.request.stream():
+            parser.write(chunk)
+            events, self._events = self._events, []
+            for event in events:
+                yield event
+                if event[0] == "end":
+                    return  # the rest of the body is not needed
+
+    async def start(self) -> None:
+        """Reject oversized requests up front, then read until the file field begins"""
+        content_length = self.request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_size + MULTIPART_OVERHEAD:
+            raise UploadTooLarge()
+
+        async for kind, value in self._reader:
+            if kind == "file":
+                self.filename, self.content_type = value
+                return
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing file field '{self.field_name}'"
+        )
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for kind, value in self._reader:
+            if kind == "end":
+                return
+            self.size += len(value)
+            if self.size > self.max_size:
+                raise UploadTooLarge()
+            yield value
+
+        # Body ended before the closing boundary (client went away)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incomplete upload"
+        )
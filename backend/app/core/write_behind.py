@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class WriteBehindBuffer:
+    """
+    In-process write-behind buffer: coalesces writes per key, flushes in batches
+
+    add() merges a value into the one pending for its key (merge(old, new));
+    pending values are written with one write(values) call every interval
+    seconds, as soon as max_entries keys are pending, and at shutdown
+    (stop()). interval 0 writes through on every add(). A failed write puts
+    its values back (merged under anything newer), so the next flush retries
+    them.
+
+    Values pending in a process that dies without a clean shutdown are lost:
+    only use it for data where losing the last interval is acceptable.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[List[Any]], Awaitable[Any]],
+        merge: Callable[[Any, Any], Any],
+        interval: float,
+        max_entries: int,
+    ):
+        self.name = name
+        self.write = write
+        self.merge = merge
+        self.interval = interval
+        self.max_entries = max_entries
+        self._pending: Dict[Hashable, Any] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def add(self, key: Hashable, value: Any) -> None:
+        current = self._pending.get(key)
+        self._pending[key] = value if current is None else self.merge(current, value)
+        if self.interval <= 0 or len(self._pending) >= self.max_entries:
+            await self.flush()
+
+    def discard(self, key: Hashable) -> None:
+        """Drop a pending value (e.g. superseded by a direct write)"""
+        self._pending.pop(key, None)
+
+    async def flush(self) -> int:
+        """Write everything pending now; returns the number of values written"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            try:
+                await self.write(list(batch.values()))
+            except Exception:
+                for key, value in batch.items():
+                    newer = self._pending.get(key)
+                    self._pending[key] = value if newer is None else self.merge(value, newer)
+                raise
+            return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as exc:
+                print(f"⚠️ {self.name}: flush failed, {len(self)} pending values kept for retry ({exc!r})")
+
+    def start(self) -> None:
+        """Start the periodic flush (call from the app's startup)"""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write what is pending (call at shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,247 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, desc
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.models.analytics import InstructorDailySales, ProductDailySales
+from app.models.counters import InstructorCounters
+from app.models.order import Order, OrderStatus
+from app.models.product import Product
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+ROLLUP_COLUMNS = ("orders", "paid_orders", "paid_revenue", "refunded_orders", "refunded_revenue")
+
+ZONE = ZoneInfo(settings.ANALYTICS_TIMEZONE)
+
+# Orders are read and written in batches of this size by rebuild()
+REBUILD_BATCH = 5000
+
+
+class OrderSnapshot(NamedTuple):
+    """The order fields the rollups depend on"""
+    instructor_id: str
+    product_id: str
+    status: OrderStatus
+    paid_price: int
+    created_at: Optional[datetime]
+    paid_at: Optional[datetime]
+    refunded_at: Optional[datetime]
+
+
+SNAPSHOT_COLUMNS = (
+    Order.instructor_id, Order.product_id, Order.status, Order.paid_price,
+    Order.created_at, Order.paid_at, Order.refunded_at,
+)
+
+
+def snapshot(order: Order) -> OrderSnapshot:
+    return OrderSnapshot(*(getattr(order, column.key) for column in SNAPSHOT_COLUMNS))
+
+
+def sales_day(timestamp: Optional[datetime]) -> date:
+    """Day of a timestamp in ANALYTICS_TIMEZONE (naive timestamps are UTC)"""
+    if timestamp is None:
+        # Not flushed yet (server default): the order is being created now
+        timestamp = datetime.now(timezone.utc)
+    elif timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(ZONE).date()
+
+
+def contributions(order: OrderSnapshot, sign: int = 1) -> Dict[date, Dict[str, int]]:
+    """
+    What one order adds to the rollups, per day
+
+    Creation counts on the day it was placed, payment on the day it was
+    paid and a refund on the day it was refunded; a refunded order keeps its
+    payment, so net revenue = paid_revenue - refunded_revenue.
+    """
+    days: Dict[date, Dict[str, int]] = {}
+
+    def add(timestamp: Optional[datetime], **deltas: int) -> None:
+        day = days.setdefault(sales_day(timestamp), {})
+        for name, value in deltas.items():
+            day[name] = day.get(name, 0) + sign * value
+
+    price = order.paid_price or 0
+    add(order.created_at, orders=1)
+    if order.paid_at is not None and order.status in (OrderStatus.PAID, OrderStatus.REFUNDED):
+        add(order.paid_at, paid_orders=1, paid_revenue=price)
+        if order.status == OrderStatus.REFUNDED and order.refunded_at is not None:
+            add(order.refunded_at, refunded_orders=1, refunded_revenue=price)
+    return days
+
+
+async def _upsert(db: AsyncSession, model, values: Dict, deltas: Dict[str, int]) -> None:
+    table = model.__table__
+    insert = dialect_insert(db, model).values(**values, **deltas)
+    await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=[column for column in table.primary_key.columns],
+            set_={name: table.c[name] + insert.excluded[name] for name in deltas},
+        )
+    )
+
+
+async def apply(db: AsyncSession, *changes: Tuple[OrderSnapshot, int]) -> None:
+    """
+    Add (sign=1) or subtract (sign=-1) orders from the rollups
+
+    Runs in the caller's transaction (no commit). An update passes the old
+    state with -1 and the new one with +1; days whose totals do not change
+    are skipped.
+    """
+    merged: Dict[Tuple[str, str, date], Dict[str, int]] = {}
+    for order, sign in changes:
+        for day, deltas in contributions(order, sign).items():
+            key = (order.instructor_id, order.product_id, day)
+            current = merged.setdefault(key, {})
+            for name, value in deltas.items():
+                current[name] = current.get(name, 0) + value
+
+    for (instructor_id, product_id, day), deltas in merged.items():
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            continue
+        await _upsert(db, InstructorDailySales, {"instructor_id": instructor_id, "day": day}, deltas)
+        await _upsert(
+            db, ProductDailySales,
+            {"product_id": product_id, "day": day, "instructor_id": instructor_id}, deltas
+        )
+
+
+async def remove_orders(db: AsyncSession, *criteria) -> None:
+    """Subtract orders the database is about to delete by ON DELETE CASCADE"""
+    result = await db.execute(select(*SNAPSHOT_COLUMNS).filter(*criteria))
+    await apply(db, *((OrderSnapshot(*row), -1) for row in result.all()))
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # 월요일 시작
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+async def get_sales_series(
+    db: AsyncSession,
+    instructor_id: str,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    product_id: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Sales per day, week (from Monday) or month between start and end (inclusive)
+
+    Reads at most one rollup row per day of the range; periods without
+    sales are returned with zeros so charts have a continuous axis.
+    """
+    if product_id:
+        model = ProductDailySales
+        query = select(ProductDailySales).filter(
+            ProductDailySales.product_id == product_id,
+            ProductDailySales.instructor_id == instructor_id,
+        )
+    else:
+        model = InstructorDailySales
+        query = select(InstructorDailySales).filter(InstructorDailySales.instructor_id == instructor_id)
+
+    result = await db.execute(
+        query.filter(model.day >= start, model.day <= end).order_by(model.day)
+    )
+
+    buckets: Dict[date, Dict] = {}
+    period = period_start(start, granularity)
+    while period <= end:
+        buckets[period] = {"period_start": period, **{name: 0 for name in ROLLUP_COLUMNS}}
+        period = next_period(period, granularity)
+
+    for row in result.scalars():
+        bucket = buckets[period_start(row.day, granularity)]
+        for name in ROLLUP_COLUMNS:
+            bucket[name] += getattr(row, name)
+
+    return list(buckets.values())
+
+
+async def get_product_sales(
+    db: AsyncSession,
+    instructor_id: str,
+    start: date,
+    end: date,
+    limit: int = 10,
+) -> List[Dict]:
+    """Products of a store ranked by net revenue between start and end"""
+    totals = [func.sum(getattr(ProductDailySales, name)).label(name) for name in ROLLUP_COLUMNS]
+    net = (func.sum(ProductDailySales.paid_revenue) - func.sum(ProductDailySales.refunded_revenue)).label("net_revenue")
+    result = await db.execute(
+        select(ProductDailySales.product_id, Product.title, *totals, net)
+        .join(Product, Product.id == ProductDailySales.product_id)
+        .filter(
+            ProductDailySales.instructor_id == instructor_id,
+            ProductDailySales.day >= start,
+            ProductDailySales.day <= end,
+        )
+        .group_by(ProductDailySales.product_id, Product.title)
+        .order_by(desc("net_revenue"), ProductDailySales.product_id)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in result.all()]
+
+
+async def rebuild(db: AsyncSession, instructor_id: str) -> int:
+    """
+    Recompute an instructor's rollups from the orders table; returns the order count
+
+    Order writes also upsert the instructor's counters row, so locking it
+    first keeps them out until the rebuilt rollups are committed.
+    """
+    await db.execute(
+        select(InstructorCounters.instructor_id)
+        .filter(InstructorCounters.instructor_id == instructor_id)
+        .with_for_update()
+    )
+    await db.execute(delete(InstructorDailySales).filter(InstructorDailySales.instructor_id == instructor_id))
+    await db.execute(delete(ProductDailySales).filter(ProductDailySales.instructor_id == instructor_id))
+
+    store_days: Dict[date, Dict[str, int]] = {}
+    product_days: Dict[Tuple[str, date], Dict[str, int]] = {}
+    count = 0
+    result = await db.stream(
+        select(*SNAPSHOT_COLUMNS)
+        .filter(Order.instructor_id == instructor_id)
+        .execution_options(yield_per=REBUILD_BATCH)
+    )
+    async for row in result:
+        order = OrderSnapshot(*row)
+        count += 1
+        for day, deltas in contributions(order).items():
+            for target in (store_days.setdefault(day, {}), product_days.setdefault((order.product_id, day), {})):
+                for name, value in deltas.items():
+                    target[name] = target.get(name, 0) + value
+
+    def rows(items):
+        return [{**{name: 0 for name in ROLLUP_COLUMNS}, **key, **deltas} for key, deltas in items]
+
+    store_rows = rows(({"instructor_id": instructor_id, "day": day}, deltas) for day, deltas in store_days.items())
+    product_rows = rows(
+        ({"instructor_id": instructor_id, "product_id": product_id, "day": day}, deltas)
+        for (product_id, day), deltas in product_days.items()
+    )
+    for model, values in ((InstructorDailySales, store_rows), (ProductDailySales, product_rows)):
+        for offset in range(0, len(values), REBUILD_BATCH):
+            await db.execute(model.__table__.insert(), values[offset:offset + REBUILD_BATCH])
+
+    await db.commit()
+    return count
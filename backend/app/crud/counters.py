@@ -0,0 +1,150 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case
+from app.core.database import dialect_insert
+from app.models.counters import InstructorCounters
+from app.models.customer import Customer
+from app.models.order import Order, OrderStatus
+from app.models.product import Product
+from typing import Dict, Optional
+
+COUNTER_COLUMNS = (
+    "products",
+    "published_products",
+    "customers",
+    "orders_pending",
+    "orders_paid",
+    "orders_cancelled",
+    "orders_refunded",
+    "revenue",
+)
+
+
+def order_deltas(status: OrderStatus, paid_price: int, sign: int = 1) -> Dict[str, int]:
+    """Counter changes for adding (sign=1) or removing (sign=-1) one order"""
+    deltas = {f"orders_{OrderStatus(status).value.lower()}": sign}
+    if status == OrderStatus.PAID:
+        deltas["revenue"] = sign * (paid_price or 0)
+    return deltas
+
+
+def merge_deltas(*deltas: Dict[str, int]) -> Dict[str, int]:
+    """Sum several delta dicts"""
+    merged: Dict[str, int] = {}
+    for delta in deltas:
+        for name, value in delta.items():
+            merged[name] = merged.get(name, 0) + value
+    return merged
+
+
+async def adjust(db: AsyncSession, instructor_id: str, **deltas: int) -> None:
+    """
+    Add deltas to an instructor's counters
+
+    A single atomic upsert, executed in the caller's transaction (no
+    commit), so counters change if and only if the write they describe
+    commits.
+    """
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    table = InstructorCounters.__table__
+    insert = dialect_insert(db, InstructorCounters).values(instructor_id=instructor_id, **deltas)
+    await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=[table.c.instructor_id],
+            set_={
+                **{name: table.c[name] + insert.excluded[name] for name in deltas},
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def remove_orders(db: AsyncSession, *criteria) -> None:
+    """
+    Subtract orders matching criteria from the counters
+
+    For rows the database deletes by ON DELETE CASCADE (product or customer
+    deletion); call before the parent row is deleted.
+    """
+    result = await db.execute(
+        select(Order.instructor_id, Order.status, func.count(), func.coalesce(func.sum(Order.paid_price), 0))
+        .filter(*criteria)
+        .group_by(Order.instructor_id, Order.status)
+    )
+    per_instructor: Dict[str, Dict[str, int]] = {}
+    for instructor_id, order_status, count, paid in result.all():
+        deltas = {f"orders_{OrderStatus(order_status).value.lower()}": -count}
+        if order_status == OrderStatus.PAID:
+            deltas["revenue"] = -paid
+        per_instructor[instructor_id] = merge_deltas(per_instructor.get(instructor_id, {}), deltas)
+
+    for instructor_id, deltas in per_instructor.items():
+        await adjust(db, instructor_id, **deltas)
+
+
+async def get_counters(db: AsyncSession, instructor_id: str) -> InstructorCounters:
+    """Counters of an instructor (all zero before their first write)"""
+    counters = await db.get(InstructorCounters, instructor_id)
+    if counters is None:
+        counters = InstructorCounters(instructor_id=instructor_id, **{name: 0 for name in COUNTER_COLUMNS})
+    return counters
+
+
+async def compute_counters(db: AsyncSession, instructor_id: str) -> Dict[str, int]:
+    """Counters of an instructor recomputed from the source tables"""
+    counters = {name: 0 for name in COUNTER_COLUMNS}
+
+    products = await db.execute(
+        select(func.count(), func.coalesce(func.sum(case((Product.is_published == True, 1), else_=0)), 0))
+        .filter(Product.instructor_id == instructor_id)
+    )
+    counters["products"], counters["published_products"] = products.one()
+
+    customers = await db.execute(
+        select(func.count()).filter(Customer.instructor_id == instructor_id)
+    )
+    counters["customers"] = customers.scalar()
+
+    orders = await db.execute(
+        select(Order.status, func.count(), func.coalesce(func.sum(Order.paid_price), 0))
+        .filter(Order.instructor_id == instructor_id)
+        .group_by(Order.status)
+    )
+    for order_status, count, paid in orders.all():
+        counters[f"orders_{OrderStatus(order_status).value.lower()}"] = count
+        if order_status == OrderStatus.PAID:
+            counters["revenue"] = paid
+
+    return counters
+
+
+async def reconcile(db: AsyncSession, instructor_id: str) -> Optional[Dict[str, int]]:
+    """
+    Repair one instructor's counters; returns the drift found (None if none)
+
+    The counters row is locked first, so writes that commit meanwhile wait
+    and then apply their delta on top of the recomputed values.
+    """
+    current = (await db.execute(
+        select(InstructorCounters)
+        .filter(InstructorCounters.instructor_id == instructor_id)
+        .with_for_update()
+    )).scalars().first()
+
+    expected = await compute_counters(db, instructor_id)
+    actual = {name: getattr(current, name) if current else 0 for name in COUNTER_COLUMNS}
+    drift = {name: expected[name] - actual[name] for name in COUNTER_COLUMNS if expected[name] != actual[name]}
+
+    if drift or current is None:
+        table = InstructorCounters.__table__
+        insert = dialect_insert(db, InstructorCounters).values(instructor_id=instructor_id, **expected)
+        await db.execute(
+            insert.on_conflict_do_update(
+                index_elements=[table.c.instructor_id],
+                set_={**{name: insert.excluded[name] for name in COUNTER_COLUMNS}, "updated_at": func.now()},
+            )
+        )
+    await db.commit()
+    return drift or None
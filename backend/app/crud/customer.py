@@ -1,9 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, update
+from sqlalchemy import select, and_, or_, func, update, case
 from app.models.customer import Customer
 from app.schemas.customer import CustomerCreate, CustomerUpdate
-from app.core.security import get_password_hash
-from typing import Optional, List
+from app.core.security import get_password_hash_async
+from app.core.principal import invalidate_customer
+from app.core.pagination import Cursor, paginate
+from app.crud import analytics, counters
+from app.models.order import Order
+from typing import Optional, List, Tuple
 from datetime import datetime
 import uuid
 
@@ -21,9 +25,8 @@ async def get_customer_by_email_and_instructor(
 
 
 async def get_customer(db: AsyncSession, customer_id: str) -> Optional[Customer]:
-    """Get customer by ID"""
-    result = await db.execute(select(Customer).filter(Customer.id == customer_id))
-    return result.scalars().first()
+    """Get customer by ID (served from the session identity map when already loaded)"""
+    return await db.get(Customer, customer_id)
 
 
 async def create_customer(
@@ -34,13 +37,13 @@ async def create_customer(
         id=str(uuid.uuid4()),
         instructor_id=instructor_id,
         email=customer_in.email,
-        hashed_password=get_password_hash(customer_in.password),
+        hashed_password=await get_password_hash_async(customer_in.password),
         full_name=customer_in.full_name,
         phone=customer_in.phone,
     )
     db.add(db_customer)
+    await counters.adjust(db, instructor_id, customers=1)
     await db.commit()
-    await db.refresh(db_customer)
     return db_customer
 
 
@@ -60,7 +63,9 @@ async def update_customer(
 
     customer.updated_at = datetime.now()
     await db.commit()
-    await db.refresh(customer)
+
+    # is_active may have changed; authenticated requests must see it at once
+    await invalidate_customer(customer_id)
     return customer
 
 
@@ -70,21 +75,30 @@ async def delete_customer(db: AsyncSession, customer_id: str) -> bool:
     if not customer:
         return False
 
+    # Their orders go with them (ON DELETE CASCADE)
+    await counters.remove_orders(db, Order.customer_id == customer_id)
+    await analytics.remove_orders(db, Order.customer_id == customer_id)
+    await counters.adjust(db, customer.instructor_id, customers=-1)
     await db.delete(customer)
     await db.commit()
+
+    await invalidate_customer(customer_id)
     return True
 
 
 async def list_customers_by_instructor(
-    db: AsyncSession, instructor_id: str, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    instructor_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Cursor] = None,
 ) -> List[Customer]:
     """List all customers for a specific instructor"""
     result = await db.execute(
-        select(Customer)
-        .filter(Customer.instructor_id == instructor_id)
-        .order_by(Customer.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+        paginate(
+            select(Customer).filter(Customer.instructor_id == instructor_id),
+            Customer, skip, limit, cursor
+        )
     )
     return list(result.scalars().all())
 
@@ -107,6 +121,15 @@ async def update_last_login(db: AsyncSession, customer_id: str) -> None:
     await db.commit()
 
 
+# Queries shorter than a trigram can only be served as prefixes
+MIN_SUBSTRING_SEARCH = 3
+
+
+def _like_escape(value: str) -> str:
+    """Escape LIKE wildcards with "/" (as SQLAlchemy's autoescape does)"""
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
 async def search_customers(
     db: AsyncSession,
     instructor_id: str,
@@ -114,21 +137,54 @@ async def search_customers(
     is_active: Optional[bool] = None,
     skip: int = 0,
     limit: int = 100,
-) -> List[Customer]:
-    """Search customers with filters"""
-    query = select(Customer).filter(Customer.instructor_id == instructor_id)
-
-    if search_query:
-        search_filter = f"%{search_query}%"
-        query = query.filter(
-            (Customer.full_name.ilike(search_filter))
-            | (Customer.email.ilike(search_filter))
-        )
-
+) -> Tuple[List[Customer], int]:
+    """
+    Search customers by name, email or phone; returns (page, total matches)
+
+    Queries of MIN_SUBSTRING_SEARCH characters or more match anywhere in
+    the name, email or phone (pg_trgm GIN indexes on PostgreSQL) and are
+    ranked prefix matches first, then by trigram similarity. Shorter ones
+    take the prefix fast path: name or email prefix only, served by the
+    (instructor_id, lower(...)) indexes. The total comes from a window count
+    in the same query.
+    """
+    query_text = (search_query or "").strip().lower()
+    filters = [Customer.instructor_id == instructor_id]
     if is_active is not None:
-        query = query.filter(Customer.is_active == is_active)
-
-    query = query.order_by(Customer.created_at.desc()).offset(skip).limit(limit)
+        filters.append(Customer.is_active == is_active)
+
+    prefix = _like_escape(query_text) + "%"
+    name_prefix = func.lower(Customer.full_name).like(prefix, escape="/")
+    email_prefix = func.lower(Customer.email).like(prefix, escape="/")
+    rank = []
+    if len(query_text) >= MIN_SUBSTRING_SEARCH:
+        filters.append(or_(
+            Customer.full_name.icontains(query_text, autoescape=True),
+            Customer.email.icontains(query_text, autoescape=True),
+            Customer.phone.icontains(query_text, autoescape=True),
+        ))
+        rank.append(case((or_(name_prefix, email_prefix), 1), else_=0).desc())
+        if db.bind.dialect.name == "postgresql":
+            rank.append(func.greatest(
+                func.word_similarity(query_text, Customer.full_name),
+                func.word_similarity(query_text, Customer.email),
+                func.coalesce(func.word_similarity(query_text, Customer.phone), 0),
+            ).desc())
+    elif query_text:
+        filters.append(or_(name_prefix, email_prefix))
 
-    result = await db.execute(query)
-    return list(result.scalars().all())
+    result = await db.execute(
+        select(Customer, func.count().over().label("total"))
+        .filter(*filters)
+        .order_by(*rank, Customer.created_at.desc(), Customer.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = result.all()
+    if rows:
+        return [customer for customer, _ in rows], rows[0].total
+    if skip == 0:
+        return [], 0
+    # Past the last page: the window count had no row to ride on
+    total = await db.execute(select(func.count(Customer.id)).filter(*filters))
+    return [], total.scalar() or 0
@@ -0,0 +1,622 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, select, delete, and_, or_, case, func, literal_column, tuple_
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, dialect_insert, replica_engine
+from app.core.compression import compress_variants
+from app.core.tiptap import content_hash, render_section
+from app.core.write_behind import WriteBehindBuffer
+from app.models.customer import Customer
+from app.models.ebook import EbookChapter, EbookSection, EbookCompletion, UserEbookProgress
+from app.models.order import Order, OrderStatus
+from app.schemas.ebook import EbookSectionResponse
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import html
+import json
+import re
+import time
+import uuid
+
+# Compiled tables of contents keyed by product id; every chapter/section
+# write of the product replaces its entry with an invalidation marker
+toc_cache = create_cache("ebook_toc", settings.EBOOK_TOC_CACHE_MAX_ENTRIES)
+
+# Readers may query a lagging replica: right after an invalidation the TOC
+# is compiled but not cached, so an old one is not cached as new
+TOC_FILL_DELAY = settings.REPLICA_MAX_LAG_SECONDS if replica_engine is not None else 0
+
+TOC_SECTION_COLUMNS = (
+    EbookSection.id,
+    EbookSection.title,
+    EbookSection.order_index,
+    EbookSection.reading_time,
+    EbookSection.is_free,
+)
+
+
+async def has_purchased(db: AsyncSession, customer_id: str, product_id: str) -> bool:
+    """Whether the customer has a paid order for the product"""
+    result = await db.execute(
+        select(Order.id).where(
+            and_(
+                Order.customer_id == customer_id,
+                Order.product_id == product_id,
+                Order.status == OrderStatus.PAID,
+            )
+        ).limit(1)
+    )
+    return result.first() is not None
+
+
+class SectionAccess(NamedTuple):
+    product_id: str
+    allowed: bool  # 무료 미리보기이거나 구매한 상품
+
+
+async def section_access(db: AsyncSession, customer_id: str, section_ids: Sequence[str]) -> Dict[str, SectionAccess]:
+    """
+    Product of each existing section and whether the customer may read it
+
+    Same rule as the section reader: free preview sections, or a paid
+    order for the product. One query; unknown ids are left out.
+    """
+    purchased = EbookChapter.product_id.in_(
+        select(Order.product_id).where(
+            and_(
+                Order.customer_id == customer_id,
+                Order.status == OrderStatus.PAID,
+            )
+        )
+    )
+    result = await db.execute(
+        select(EbookSection.id, EbookChapter.product_id, EbookSection.is_free, purchased)
+        .join(EbookChapter)
+        .where(EbookSection.id.in_(set(section_ids)))
+    )
+    return {
+        section_id: SectionAccess(product_id, bool(is_free) or bool(paid))
+        for section_id, product_id, is_free, paid in result.all()
+    }
+
+
+async def render_content(section: EbookSection, keep_reading_time: bool = False) -> bool:
+    """
+    Refresh content_html, content_text and reading_time from section.content
+
+    Skipped when the content hash matches the one the stored HTML was
+    rendered from; returns whether it rendered. Rendering runs in a thread
+    so long documents do not block the event loop. keep_reading_time keeps
+    a reading_time the instructor set explicitly.
+    """
+    if section.content is None:
+        section.content_html = section.content_text = section.content_hash = None
+        return False
+    if section.content_hash == content_hash(section.content):
+        return False
+
+    rendered = await asyncio.get_running_loop().run_in_executor(None, render_section, section.content)
+    section.content_html = rendered.content_html
+    section.content_text = rendered.content_text
+    section.content_hash = rendered.content_hash
+    if not keep_reading_time:
+        section.reading_time = rendered.reading_time
+    return True
+
+
+def section_body(response: EbookSectionResponse) -> Tuple[str, bytes]:
+    """The reader's JSON response for a section and its revision (hash of its fields)"""
+    fields = json.dumps(response.model_dump(mode="json", exclude={"revision"}), sort_keys=True, separators=(",", ":"))
+    revision = hashlib.sha256(fields.encode("utf-8")).hexdigest()[:32]
+    return revision, response.model_copy(update={"revision": revision}).model_dump_json().encode("utf-8")
+
+
+def apply_variants(section: EbookSection, revision: str, variants: Dict[str, bytes]) -> None:
+    section.revision = revision
+    section.body_gzip = variants["gzip"]
+    section.body_br = variants.get("br")
+
+
+async def store_variants(section: EbookSection) -> None:
+    """
+    Precompute the reader's response for a section (revision + gzip/brotli)
+
+    Call after the section's fields are final, before commit. The
+    timestamps are set here rather than by the database, so the stored
+    response matches the row.
+    """
+    now = datetime.now(timezone.utc)
+    if section.created_at is None:
+        section.created_at = now
+    else:
+        section.updated_at = now
+
+    revision, body = section_body(EbookSectionResponse.model_validate(section))
+    variants = await asyncio.get_running_loop().run_in_executor(None, compress_variants, body)
+    apply_variants(section, revision, variants)
+
+
+async def compile_toc(db: AsyncSession, product_id: str) -> List[Dict]:
+    """
+    Published chapters of a product with their published sections
+
+    One query over the TOC columns only; section content (Tiptap JSON and
+    HTML) is never loaded.
+    """
+    result = await db.execute(
+        select(
+            EbookChapter.id,
+            EbookChapter.title,
+            EbookChapter.description,
+            EbookChapter.order_index,
+            *TOC_SECTION_COLUMNS,
+        )
+        .outerjoin(EbookSection, and_(
+            EbookSection.chapter_id == EbookChapter.id,
+            EbookSection.is_published == True,
+        ))
+        .where(
+            and_(
+                EbookChapter.product_id == product_id,
+                EbookChapter.is_published == True,
+            )
+        )
+        .order_by(EbookChapter.order_index, EbookChapter.id, EbookSection.order_index, EbookSection.id)
+    )
+
+    chapters: Dict[str, Dict] = {}
+    for chapter_id, title, description, order_index, *section in result.all():
+        chapter = chapters.get(chapter_id)
+        if chapter is None:
+            chapter = chapters[chapter_id] = {
+                "id": chapter_id,
+                "title": title,
+                "description": description,
+                "order_index": order_index,
+                "sections": [],
+            }
+        if section[0] is not None:
+            chapter["sections"].append(dict(zip((c.key for c in TOC_SECTION_COLUMNS), section)))
+    return list(chapters.values())
+
+
+async def get_toc(db: AsyncSession, product_id: str) -> List[Dict]:
+    """Table of contents of a product (cached until its chapters or sections change)"""
+    entry = await toc_cache.get(product_id)
+    if entry is not None and "chapters" in entry:
+        return entry["chapters"]
+
+    chapters = await compile_toc(db, product_id)
+    if entry is None or time.time() - entry["invalidated_at"] >= TOC_FILL_DELAY:
+        await toc_cache.set(product_id, {"chapters": chapters}, settings.EBOOK_TOC_CACHE_TTL)
+    return chapters
+
+
+async def invalidate_toc(*product_ids: str) -> None:
+    """Drop cached tables of contents (call after commit)"""
+    for product_id in product_ids:
+        await toc_cache.set(product_id, {"invalidated_at": time.time()}, settings.EBOOK_TOC_CACHE_TTL)
+
+
+# ts_headline wraps matched words in these; the snippet is HTML-escaped and
+# they become <mark> tags, so section text can never inject markup
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+SNIPPET_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    'MaxWords=30, MinWords=12, MaxFragments=2, FragmentDelimiter=" … "'
+)
+# Snippet length of the LIKE fallback (databases without ts_headline)
+SNIPPET_CHARS = 120
+
+
+def highlight_snippet(snippet: str) -> str:
+    """Escape a snippet and turn the highlight markers into <mark> tags"""
+    escaped = html.escape(snippet, quote=False)
+    return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+
+def fallback_snippet(text: str, terms: Sequence[str]) -> str:
+    """Text around the first match with the terms marked, like ts_headline output"""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    start = max(0, min(positions) - SNIPPET_CHARS // 3) if positions else 0
+    snippet = text[start:start + SNIPPET_CHARS]
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    snippet = pattern.sub(lambda match: f"{HIGHLIGHT_START}{match.group(0)}{HIGHLIGHT_STOP}", snippet)
+    return ("… " if start else "") + snippet + (" …" if start + SNIPPET_CHARS < len(text) else "")
+
+
+async def search_sections(
+    db: AsyncSession,
+    product_id: str,
+    terms: Sequence[str],
+    free_only: bool = False,
+    skip: int = 0,
+    limit: int = 20,
+) -> Tuple[List[Dict], int]:
+    """
+    Search the published sections of an ebook; returns (page, total matches)
+
+    Every term must match the title or text (as a word prefix, like the
+    store search). PostgreSQL uses the ebook_sections.search_vector GIN
+    index, ranks by ts_rank_cd (title > text) and builds snippets with
+    ts_headline for the page's rows only; other databases (SQLite tests)
+    fall back to LIKE with title matches first. free_only limits the hits
+    to free preview sections (readers who have not purchased).
+    """
+    postgresql = db.bind.dialect.name == "postgresql"
+    if postgresql:
+        search_vector = literal_column("ebook_sections.search_vector")
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        match = search_vector.op("@@")(tsquery)
+        rank = func.ts_rank_cd(search_vector, tsquery)
+        snippet = func.coalesce(func.ts_headline("simple", EbookSection.content_text, tsquery, SNIPPET_OPTIONS), "")
+    else:
+        match = and_(*(
+            EbookSection.title.icontains(term, autoescape=True)
+            | EbookSection.content_text.icontains(term, autoescape=True)
+            for term in terms
+        ))
+        rank = case((and_(*(EbookSection.title.icontains(term, autoescape=True) for term in terms)), 1), else_=0)
+        snippet = func.coalesce(EbookSection.content_text, "")
+
+    filters = [
+        EbookChapter.product_id == product_id,
+        EbookChapter.is_published == True,
+        EbookSection.is_published == True,
+        match,
+    ]
+    if free_only:
+        filters.append(EbookSection.is_free == True)
+
+    # Ranked page of ids first, so snippets are only built for its rows
+    page = (
+        select(
+            EbookSection.id,
+            rank.label("rank"),
+            func.count().over().label("total"),
+        )
+        .join(EbookChapter)
+        .where(*filters)
+        .order_by(rank.desc(), EbookChapter.order_index, EbookSection.order_index, EbookSection.id)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            EbookSection.id,
+            EbookSection.title,
+            EbookSection.is_free,
+            EbookChapter.id.label("chapter_id"),
+            EbookChapter.title.label("chapter_title"),
+            snippet.label("snippet"),
+            page.c.total,
+        )
+        .join(page, page.c.id == EbookSection.id)
+        .join(EbookChapter)
+        .order_by(page.c.rank.desc(), EbookChapter.order_index, EbookSection.order_index, EbookSection.id)
+    )
+    rows = result.all()
+    if not rows:
+        if skip == 0:
+            return [], 0
+        # Past the last page: the window count had no row to ride on
+        total = await db.execute(select(func.count(EbookSection.id)).join(EbookChapter).where(*filters))
+        return [], total.scalar() or 0
+
+    hits = [
+        {
+            "section_id": row.id,
+            "title": row.title,
+            "is_free": row.is_free,
+            "chapter_id": row.chapter_id,
+            "chapter_title": row.chapter_title,
+            "snippet": highlight_snippet(row.snippet if postgresql else fallback_snippet(row.snippet, terms)),
+        }
+        for row in rows
+    ]
+    return hits, rows[0].total
+
+
+# Rows per INSERT ... ON CONFLICT statement when writing progress
+PROGRESS_UPSERT_BATCH = 500
+
+
+class ProgressEvent(NamedTuple):
+    """Reading progress of one customer in one section"""
+    customer_id: str
+    section_id: str
+    reading_progress: int
+    is_completed: bool
+    read_at: datetime
+
+
+def merge_progress(current: ProgressEvent, event: ProgressEvent) -> ProgressEvent:
+    """Keep the furthest progress: highest percentage, completion sticks, latest read time"""
+    return current._replace(
+        reading_progress=max(current.reading_progress, event.reading_progress),
+        is_completed=current.is_completed or event.is_completed,
+        read_at=max(current.read_at, event.read_at),
+    )
+
+
+async def upsert_progress(db: AsyncSession, events: Sequence[ProgressEvent]) -> int:
+    """
+    Write progress events, at most one per (customer, section); returns rows written
+
+    Multi-row INSERT ... ON CONFLICT (customer_id, section_id) DO UPDATE,
+    merging with the stored row by the same rule as merge_progress, then
+    the completions of the customers and products written are refreshed.
+    Events of sections or customers deleted meanwhile are dropped. No
+    commit.
+    """
+    section_ids = {event.section_id for event in events}
+    customer_ids = {event.customer_id for event in events}
+    sections = dict((await db.execute(
+        select(EbookSection.id, EbookChapter.product_id)
+        .join(EbookChapter)
+        .where(EbookSection.id.in_(section_ids))
+    )).all())
+    customers = set((await db.execute(
+        select(Customer.id).where(Customer.id.in_(customer_ids))
+    )).scalars())
+
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "customer_id": event.customer_id,
+            "section_id": event.section_id,
+            "reading_progress": event.reading_progress,
+            "is_completed": event.is_completed,
+            "last_read_at": event.read_at,
+        }
+        for event in events
+        if event.section_id in sections and event.customer_id in customers
+    ]
+
+    table = UserEbookProgress.__table__
+    greatest = func.greatest if db.bind.dialect.name == "postgresql" else func.max
+    for offset in range(0, len(rows), PROGRESS_UPSERT_BATCH):
+        insert = dialect_insert(db, UserEbookProgress).values(rows[offset:offset + PROGRESS_UPSERT_BATCH])
+        await db.execute(
+            insert.on_conflict_do_update(
+                index_elements=[table.c.customer_id, table.c.section_id],
+                set_={
+                    "reading_progress": greatest(table.c.reading_progress, insert.excluded.reading_progress),
+                    "is_completed": or_(table.c.is_completed, insert.excluded.is_completed),
+                    "last_read_at": greatest(table.c.last_read_at, insert.excluded.last_read_at),
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    if rows:
+        await refresh_completions(
+            db,
+            UserEbookProgress.customer_id.in_({row["customer_id"] for row in rows}),
+            EbookChapter.product_id.in_({sections[row["section_id"]] for row in rows}),
+        )
+    return len(rows)
+
+
+def completion_rate(completed_sections: int, total_sections: int) -> int:
+    """Completed share of the published sections, 0-100"""
+    if not total_sections:
+        return 0
+    return min(100, completed_sections * 100 // total_sections)
+
+
+def completion_counts(*criteria) -> Select:
+    """
+    Completed published sections and last read time per (product, customer)
+
+    Groups all progress rows matching criteria (criteria may use
+    UserEbookProgress, EbookSection and EbookChapter), not only those of
+    published sections, so a customer whose completed sections were all
+    unpublished still gets a row of 0. Only customers with a paid order for
+    the product count as its learners: free preview reading adds no row.
+    """
+    purchased = (
+        select(Order.id)
+        .where(
+            and_(
+                Order.customer_id == UserEbookProgress.customer_id,
+                Order.product_id == EbookChapter.product_id,
+                Order.status == OrderStatus.PAID,
+            )
+        )
+        .exists()
+    )
+    published_completion = and_(
+        UserEbookProgress.is_completed == True,
+        EbookSection.is_published == True,
+        EbookChapter.is_published == True,
+    )
+    return (
+        select(
+            EbookChapter.product_id,
+            UserEbookProgress.customer_id,
+            func.count(case((published_completion, 1))).label("completed_sections"),
+            func.max(UserEbookProgress.last_read_at).label("last_read_at"),
+        )
+        .select_from(UserEbookProgress)
+        .join(EbookSection, EbookSection.id == UserEbookProgress.section_id)
+        .join(EbookChapter, EbookChapter.id == EbookSection.chapter_id)
+        .where(*criteria)
+        .group_by(EbookChapter.product_id, UserEbookProgress.customer_id)
+        # Checked once per group, not per progress row
+        .having(purchased)
+    )
+
+
+async def refresh_completions(db: AsyncSession, *criteria) -> None:
+    """
+    Recompute the completions of the (product, customer) pairs matching criteria
+
+    One INSERT ... SELECT ... ON CONFLICT DO UPDATE executed in the
+    caller's transaction (no commit), so a completion changes if and only
+    if the progress it describes commits. Criteria must select whole pairs
+    (customers and products), not single sections.
+    """
+    table = EbookCompletion.__table__
+    insert = dialect_insert(db, EbookCompletion).from_select(
+        ["product_id", "customer_id", "completed_sections", "last_read_at"],
+        completion_counts(*criteria),
+    )
+    await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=[table.c.product_id, table.c.customer_id],
+            set_={
+                "completed_sections": insert.excluded.completed_sections,
+                "last_read_at": insert.excluded.last_read_at,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def rebuild_completions(db: AsyncSession, product_id: str) -> None:
+    """
+    Recompute every completion of a product
+
+    For writes that change which of its sections count: publishing or
+    unpublishing a section or chapter, deleting one (call after the delete
+    is flushed). The product's rows are replaced, so customers left
+    without progress or without a paid order drop out. Reads all progress
+    of the product, so it belongs to these rare instructor edits, never to
+    reads. No commit.
+    """
+    await db.execute(delete(EbookCompletion).where(EbookCompletion.product_id == product_id))
+    await refresh_completions(db, EbookChapter.product_id == product_id)
+
+
+async def get_customer_completions(
+    db: AsyncSession, customer_id: str, product_ids: Optional[Sequence[str]] = None
+) -> List[Dict]:
+    """
+    Completion of a customer's ebooks (of product_ids, else of every product paid for)
+
+    One query grouping the published sections of the products per product,
+    outer joined to the customer's progress. Products without a published
+    section are left out. Most recently read first.
+    """
+    query = (
+        select(
+            EbookChapter.product_id,
+            func.count(EbookSection.id).label("total_sections"),
+            func.count(case((UserEbookProgress.is_completed == True, 1))).label("completed_sections"),
+            func.max(UserEbookProgress.last_read_at).label("last_read_at"),
+        )
+        .select_from(EbookSection)
+        .join(EbookChapter, EbookChapter.id == EbookSection.chapter_id)
+        .outerjoin(UserEbookProgress, and_(
+            UserEbookProgress.section_id == EbookSection.id,
+            UserEbookProgress.customer_id == customer_id,
+        ))
+        .where(
+            and_(
+                EbookSection.is_published == True,
+                EbookChapter.is_published == True,
+            )
+        )
+        .group_by(EbookChapter.product_id)
+    )
+    if product_ids is not None:
+        query = query.where(EbookChapter.product_id.in_(product_ids))
+    else:
+        query = query.where(EbookChapter.product_id.in_(
+            select(Order.product_id).where(
+                and_(
+                    Order.customer_id == customer_id,
+                    Order.status == OrderStatus.PAID,
+                )
+            )
+        ))
+
+    completions = [
+        {
+            "product_id": row.product_id,
+            "completed_sections": row.completed_sections,
+            "total_sections": row.total_sections,
+            "completion_rate": completion_rate(row.completed_sections, row.total_sections),
+            "last_read_at": row.last_read_at,
+        }
+        for row in (await db.execute(query)).all()
+    ]
+    completions.sort(key=lambda c: (c["last_read_at"] is not None, c["last_read_at"] or 0), reverse=True)
+    return completions
+
+
+async def get_completion_report(
+    db: AsyncSession, product_id: str, limit: int, after: Optional[Sequence] = None
+) -> Dict:
+    """
+    Learners of a product with their completion, most completed first
+
+    Reads the maintained ebook_completions rows only: a count/average over
+    the product's rows and one keyset page of the
+    (product_id, completed_sections, customer_id) index, so the cost does
+    not grow with the number of learners or sections. after is the
+    (completed_sections, customer_id) of the previous page's last row.
+    """
+    total_sections = sum(len(chapter["sections"]) for chapter in await get_toc(db, product_id))
+
+    learners, completed_learners, average = (await db.execute(
+        select(
+            func.count(),
+            func.count(case((EbookCompletion.completed_sections >= total_sections, 1))),
+            func.coalesce(func.avg(EbookCompletion.completed_sections), 0),
+        ).where(EbookCompletion.product_id == product_id)
+    )).one()
+
+    query = (
+        select(EbookCompletion, Customer.full_name, Customer.email)
+        .join(Customer, Customer.id == EbookCompletion.customer_id)
+        .where(EbookCompletion.product_id == product_id)
+        .order_by(EbookCompletion.completed_sections.desc(), EbookCompletion.customer_id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(
+            tuple_(EbookCompletion.completed_sections, EbookCompletion.customer_id) < tuple(after)
+        )
+
+    return {
+        "product_id": product_id,
+        "total_sections": total_sections,
+        "learners": learners,
+        "completed_learners": completed_learners if total_sections else 0,
+        "average_completion_rate": completion_rate(round(average * 100), total_sections * 100),
+        "items": [
+            {
+                "customer_id": completion.customer_id,
+                "full_name": full_name,
+                "email": email,
+                "completed_sections": completion.completed_sections,
+                "completion_rate": completion_rate(completion.completed_sections, total_sections),
+                "last_read_at": completion.last_read_at,
+            }
+            for completion, full_name, email in (await db.execute(query)).all()
+        ],
+    }
+
+
+async def write_progress(events: List[ProgressEvent]) -> None:
+    async with AsyncSessionLocal() as db:
+        await upsert_progress(db, events)
+        await db.commit()
+
+
+# Scroll progress is buffered per (customer, section) and written in batches;
+# started/stopped with the app (main.py)
+progress_buffer = WriteBehindBuffer(
+    "ebook progress",
+    write=write_progress,
+    merge=merge_progress,
+    interval=settings.PROGRESS_FLUSH_INTERVAL,
+    max_entries=settings.PROGRESS_BUFFER_MAX_ENTRIES,
+)
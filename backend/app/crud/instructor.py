@@ -2,7 +2,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.instructor import Instructor
 from app.schemas.instructor import InstructorCreate, InstructorUpdate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.core.tenant import tenant_resolver
+from app.core.principal import invalidate_instructor
+from app.core.store_cache import store_cache
 from typing import Optional
 from datetime import datetime
 
@@ -20,16 +23,15 @@ async def get_instructor_by_subdomain(db: AsyncSession, subdomain: str) -> Optio
 
 
 async def get_instructor_by_id(db: AsyncSession, instructor_id: str) -> Optional[Instructor]:
-    """Get instructor by ID"""
-    result = await db.execute(select(Instructor).filter(Instructor.id == instructor_id))
-    return result.scalars().first()
+    """Get instructor by ID (served from the session identity map when already loaded)"""
+    return await db.get(Instructor, instructor_id)
 
 
 async def create_instructor(db: AsyncSession, instructor_in: InstructorCreate) -> Instructor:
     """Create new instructor"""
     db_instructor = Instructor(
         email=instructor_in.email,
-        hashed_password=get_password_hash(instructor_in.password),
+        hashed_password=await get_password_hash_async(instructor_in.password),
         full_name=instructor_in.full_name,
         subdomain=instructor_in.subdomain,
         store_name=instructor_in.store_name,
@@ -37,7 +39,9 @@ async def create_instructor(db: AsyncSession, instructor_in: InstructorCreate) -
     )
     db.add(db_instructor)
     await db.commit()
-    await db.refresh(db_instructor)
+
+    # Drop a cached "store not found" for the new subdomain
+    await tenant_resolver.invalidate(db_instructor.subdomain)
     return db_instructor
 
 
@@ -48,11 +52,19 @@ async def update_instructor(
 ) -> Instructor:
     """Update instructor"""
     update_data = instructor_update.model_dump(exclude_unset=True)
+    old_subdomain = instructor.subdomain
+    old_email = instructor.email
 
     for field, value in update_data.items():
         setattr(instructor, field, value)
 
     instructor.updated_at = datetime.utcnow()
     await db.commit()
-    await db.refresh(instructor)
+
+    # Store data is cached per subdomain; a rename invalidates both names
+    await tenant_resolver.invalidate(old_subdomain, instructor.subdomain)
+    # Principals are cached by email (the token subject)
+    await invalidate_instructor(old_email, instructor.email)
+    # Public store info is served from the response cache
+    await store_cache.bump(instructor.id)
     return instructor
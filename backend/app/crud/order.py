@@ -3,6 +3,8 @@ from sqlalchemy import select, func
 from app.models.order import Order, OrderStatus
 from app.models.product import Product
 from app.schemas.order import OrderCreate, OrderUpdate
+from app.core.pagination import Cursor, paginate
+from app.crud import analytics, counters
 from typing import List, Optional
 from datetime import datetime
 import uuid
@@ -16,11 +18,8 @@ def generate_order_number() -> str:
 
 
 async def get_order(db: AsyncSession, order_id: str) -> Optional[Order]:
-    """Get a single order by ID"""
-    result = await db.execute(
-        select(Order).filter(Order.id == order_id)
-    )
-    return result.scalars().first()
+    """Get a single order by ID (served from the session identity map when already loaded)"""
+    return await db.get(Order, order_id)
 
 
 async def get_order_by_number(db: AsyncSession, order_number: str) -> Optional[Order]:
@@ -53,7 +52,8 @@ async def get_orders_by_instructor(
     instructor_id: str,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[OrderStatus] = None
+    status: Optional[OrderStatus] = None,
+    cursor: Optional[Cursor] = None
 ) -> List[Order]:
     """Get all orders for an instructor's products"""
     query = select(Order).filter(Order.instructor_id == instructor_id)
@@ -61,12 +61,7 @@ async def get_orders_by_instructor(
     if status:
         query = query.filter(Order.status == status)
 
-    result = await db.execute(
-        query
-        .offset(skip)
-        .limit(limit)
-        .order_by(Order.created_at.desc())
-    )
+    result = await db.execute(paginate(query, Order, skip, limit, cursor))
     return result.scalars().all()
 
 
@@ -88,8 +83,11 @@ async def create_order(
         status=OrderStatus.PENDING,
     )
     db.add(db_order)
+    await counters.adjust(
+        db, instructor_id, **counters.order_deltas(OrderStatus.PENDING, order_in.paid_price)
+    )
+    await analytics.apply(db, (analytics.snapshot(db_order), 1))
     await db.commit()
-    await db.refresh(db_order)
     return db_order
 
 
@@ -99,7 +97,10 @@ async def update_order(
     order_update: OrderUpdate
 ) -> Optional[Order]:
     """Update an order"""
-    db_order = await get_order(db, order_id)
+    # Lock the row and re-read it (the route already loaded it into the
+    # session), so concurrent status changes apply their deltas one after
+    # the other instead of both starting from the same old status
+    db_order = await db.get(Order, order_id, with_for_update=True, populate_existing=True)
     if not db_order:
         return None
 
@@ -114,20 +115,31 @@ async def update_order(
         elif update_data["status"] == OrderStatus.REFUNDED and not db_order.refunded_at:
             update_data["refunded_at"] = datetime.now()
 
+    before = analytics.snapshot(db_order)
     for field, value in update_data.items():
         setattr(db_order, field, value)
 
+    if db_order.status != before.status:
+        await counters.adjust(db, db_order.instructor_id, **counters.merge_deltas(
+            counters.order_deltas(before.status, db_order.paid_price, -1),
+            counters.order_deltas(db_order.status, db_order.paid_price),
+        ))
+        await analytics.apply(db, (before, -1), (analytics.snapshot(db_order), 1))
     await db.commit()
-    await db.refresh(db_order)
     return db_order
 
 
 async def delete_order(db: AsyncSession, order_id: str) -> bool:
     """Delete an order"""
-    db_order = await get_order(db, order_id)
+    # Locked, so a concurrent delete or status change cannot count it twice
+    db_order = await db.get(Order, order_id, with_for_update=True, populate_existing=True)
     if not db_order:
         return False
 
+    await counters.adjust(
+        db, db_order.instructor_id, **counters.order_deltas(db_order.status, db_order.paid_price, -1)
+    )
+    await analytics.apply(db, (analytics.snapshot(db_order), -1))
     await db.delete(db_order)
     await db.commit()
     return True
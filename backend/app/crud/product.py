@@ -1,30 +1,51 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, update, delete, and_, func, case, literal_column
+from sqlalchemy.orm import load_only
+from typing import Dict, List, Optional, Sequence, Tuple
+import re
 from datetime import datetime, timedelta
+from app.models.instructor import Instructor
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate
+from app.core.store_cache import store_cache
+from app.core.pagination import Cursor, paginate
+from app.crud import analytics, counters
+from app.models.order import Order
 
 
 async def get_product(db: AsyncSession, product_id: str) -> Optional[Product]:
-    """Get a product by ID"""
-    result = await db.execute(select(Product).filter(Product.id == product_id))
-    return result.scalars().first()
+    """Get a product by ID (served from the session identity map when already loaded)"""
+    return await db.get(Product, product_id)
+
+
+def project(query, columns: Optional[Sequence[str]] = None):
+    """
+    Load only these Product columns (all when None)
+
+    The large TEXT/JSON columns of the detail page are left unloaded, so
+    callers must not touch attributes outside columns (no lazy loads in
+    async). id and created_at are always loaded for list cursors.
+    """
+    if columns is None:
+        return query
+    names = dict.fromkeys(("id", "created_at", *columns))
+    return query.options(load_only(*(getattr(Product, name) for name in names)))
 
 
 async def get_products_by_instructor(
     db: AsyncSession,
     instructor_id: str,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[Cursor] = None,
+    columns: Optional[Sequence[str]] = None
 ) -> List[Product]:
     """Get all products for an instructor"""
     result = await db.execute(
-        select(Product)
-        .filter(Product.instructor_id == instructor_id)
-        .offset(skip)
-        .limit(limit)
-        .order_by(Product.created_at.desc())
+        paginate(
+            project(select(Product), columns).filter(Product.instructor_id == instructor_id),
+            Product, skip, limit, cursor
+        )
     )
     return result.scalars().all()
 
@@ -33,17 +54,145 @@ async def get_published_products_by_instructor(
     db: AsyncSession,
     instructor_id: str,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[Cursor] = None,
+    columns: Optional[Sequence[str]] = None
 ) -> List[Product]:
     """Get published products for an instructor (for public store)"""
     result = await db.execute(
-        select(Product)
-        .filter(Product.instructor_id == instructor_id, Product.is_published == True)
+        paginate(
+            project(select(Product), columns)
+            .filter(Product.instructor_id == instructor_id, Product.is_published == True),
+            Product, skip, limit, cursor
+        )
+    )
+    return result.scalars().all()
+
+
+# Longest search a visitor can run (words beyond this are ignored)
+MAX_SEARCH_TERMS = 8
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search query (punctuation and tsquery syntax dropped)"""
+    return re.findall(r"[^\W_]+", query.lower())[:MAX_SEARCH_TERMS]
+
+
+async def search_published_products(
+    db: AsyncSession,
+    instructor_id: str,
+    terms: Sequence[str],
+    category: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+    columns: Optional[Sequence[str]] = None
+) -> Tuple[List[Product], int, List[Dict]]:
+    """
+    Search a store's published products; returns (page, total, category facets)
+
+    Every term must match (as a word prefix, so "강의" finds "강의를").
+    PostgreSQL uses the products.search_vector GIN index and ranks by
+    ts_rank_cd with title > category > description weights; other databases
+    (SQLite tests) fall back to LIKE with title matches first.
+    """
+    if db.bind.dialect.name == "postgresql":
+        search_vector = literal_column("products.search_vector")
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        match = search_vector.op("@@")(tsquery)
+        rank = func.ts_rank_cd(search_vector, tsquery)
+    else:
+        match = and_(*(
+            Product.title.icontains(term, autoescape=True)
+            | Product.category.icontains(term, autoescape=True)
+            | Product.description.icontains(term, autoescape=True)
+            for term in terms
+        ))
+        rank = case((and_(*(Product.title.icontains(term, autoescape=True) for term in terms)), 1), else_=0)
+
+    matches = (Product.instructor_id == instructor_id, Product.is_published == True, match)
+
+    # Facets ignore the category filter, so the visitor can switch categories
+    facet_rows = (await db.execute(
+        select(Product.category, func.count())
+        .filter(*matches)
+        .group_by(Product.category)
+        .order_by(func.count().desc(), Product.category)
+    )).all()
+    facets = [{"category": name, "count": count} for name, count in facet_rows]
+    if category is not None:
+        total = sum(facet["count"] for facet in facets if facet["category"] == category)
+    else:
+        total = sum(facet["count"] for facet in facets)
+
+    if total <= skip:
+        return [], total, facets
+
+    query = project(select(Product), columns).filter(*matches)
+    if category is not None:
+        query = query.filter(Product.category == category)
+    result = await db.execute(
+        query
+        .order_by(rank.desc(), Product.created_at.desc(), Product.id.desc())
         .offset(skip)
         .limit(limit)
-        .order_by(Product.created_at.desc())
     )
-    return result.scalars().all()
+    return result.scalars().all(), total, facets
+
+
+async def get_storefront(
+    db: AsyncSession,
+    subdomain: str,
+    limit: int = 100,
+    columns: Optional[Sequence[str]] = None
+) -> Tuple[Optional[Instructor], List[Product]]:
+    """Instructor of a subdomain and its published products, in one joined query"""
+    result = await db.execute(
+        project(select(Instructor, Product), columns)
+        .outerjoin(Product, and_(Product.instructor_id == Instructor.id, Product.is_published == True))
+        .filter(Instructor.subdomain == subdomain)
+        .order_by(Product.created_at.desc(), Product.id.desc())
+        .limit(limit)
+    )
+    rows = result.all()
+    if not rows:
+        return None, []
+    return rows[0][0], [product for _, product in rows if product is not None]
+
+
+async def get_published_product(
+    db: AsyncSession,
+    instructor_id: str,
+    product_id: str
+) -> Optional[Product]:
+    """Get a published product of an instructor"""
+    result = await db.execute(
+        select(Product)
+        .filter(
+            Product.id == product_id,
+            Product.instructor_id == instructor_id,
+            Product.is_published == True,
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_published_product_by_subdomain(
+    db: AsyncSession,
+    subdomain: str,
+    product_id: str
+) -> Tuple[Optional[Instructor], Optional[Product]]:
+    """Instructor of a subdomain and one of its published products, in one joined query"""
+    result = await db.execute(
+        select(Instructor, Product)
+        .outerjoin(Product, and_(
+            Product.instructor_id == Instructor.id,
+            Product.id == product_id,
+            Product.is_published == True,
+        ))
+        .filter(Instructor.subdomain == subdomain)
+    )
+    row = result.first()
+    return (row[0], row[1]) if row else (None, None)
 
 
 async def create_product(
@@ -89,8 +238,12 @@ async def create_product(
         modal_end_time=modal_end_time,
     )
     db.add(db_product)
+    await counters.adjust(
+        db, instructor_id, products=1, published_products=int(bool(product_in.is_published))
+    )
     await db.commit()
-    await db.refresh(db_product)
+
+    await store_cache.bump(instructor_id)
     return db_product
 
 
@@ -100,8 +253,7 @@ async def update_product(
     product_in: ProductUpdate
 ) -> Optional[Product]:
     """Update a product"""
-    result = await db.execute(select(Product).filter(Product.id == product_id))
-    db_product = result.scalars().first()
+    db_product = await get_product(db, product_id)
 
     if not db_product:
         return None
@@ -124,30 +276,116 @@ async def update_product(
                 days=days, hours=hours, minutes=minutes, seconds=seconds
             )
 
+    if "is_published" in update_data:
+        # Lock the row and re-read the old flag, so concurrent publish
+        # toggles apply their counter delta one after the other
+        db_product = await db.get(Product, product_id, with_for_update=True, populate_existing=True)
+        if not db_product:
+            return None
+
+    was_published = bool(db_product.is_published)
     for field, value in update_data.items():
         setattr(db_product, field, value)
 
+    await counters.adjust(
+        db, db_product.instructor_id,
+        published_products=int(bool(db_product.is_published)) - int(was_published)
+    )
     await db.commit()
-    await db.refresh(db_product)
+
+    await store_cache.bump(db_product.instructor_id)
     return db_product
 
 
 async def delete_product(db: AsyncSession, product_id: str) -> bool:
     """Delete a product"""
-    result = await db.execute(select(Product).filter(Product.id == product_id))
-    db_product = result.scalars().first()
+    # Locked, so a concurrent delete or publish toggle cannot count it twice
+    db_product = await db.get(Product, product_id, with_for_update=True, populate_existing=True)
 
     if not db_product:
         return False
 
+    # Its orders go with it (ON DELETE CASCADE)
+    await counters.remove_orders(db, Order.product_id == product_id)
+    await analytics.remove_orders(db, Order.product_id == product_id)
+    await counters.adjust(
+        db, db_product.instructor_id, products=-1, published_products=-int(bool(db_product.is_published))
+    )
     await db.delete(db_product)
     await db.commit()
+
+    await store_cache.bump(db_product.instructor_id)
     return True
 
 
+async def bulk_update_products(
+    db: AsyncSession,
+    instructor_id: str,
+    product_ids: Sequence[str],
+    values: Dict
+) -> List[str]:
+    """
+    Set values on the instructor's products among product_ids; returns the ids updated
+
+    A single UPDATE ... WHERE id IN (...) AND instructor_id = ..., so ids of
+    other instructors are simply not matched. When is_published is set, the
+    rows are locked and their old flags read first, for the counters.
+    """
+    owned = (Product.id.in_(product_ids), Product.instructor_id == instructor_id)
+    if "is_published" in values:
+        published = bool(values["is_published"])
+        previous = await db.execute(select(Product.is_published).filter(*owned).with_for_update())
+        await counters.adjust(
+            db, instructor_id,
+            published_products=sum(int(published) - int(bool(was)) for was in previous.scalars())
+        )
+
+    result = await db.execute(
+        update(Product)
+        .where(*owned)
+        .values(**values)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = list(result.scalars().all())
+    await db.commit()
+
+    if updated:
+        await store_cache.bump(instructor_id)
+    return updated
+
+
+async def bulk_delete_products(
+    db: AsyncSession,
+    instructor_id: str,
+    product_ids: Sequence[str]
+) -> List[str]:
+    """Delete the instructor's products among product_ids in one statement; returns the ids deleted"""
+    # Their orders go with them (ON DELETE CASCADE)
+    owned_orders = (Order.product_id.in_(product_ids), Order.instructor_id == instructor_id)
+    await counters.remove_orders(db, *owned_orders)
+    await analytics.remove_orders(db, *owned_orders)
+
+    result = await db.execute(
+        delete(Product)
+        .where(Product.id.in_(product_ids), Product.instructor_id == instructor_id)
+        .returning(Product.id, Product.is_published)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    await counters.adjust(
+        db, instructor_id, products=-len(rows), published_products=-sum(bool(was) for _, was in rows)
+    )
+    await db.commit()
+
+    if rows:
+        await store_cache.bump(instructor_id)
+    return [product_id for product_id, _ in rows]
+
+
 async def count_products_by_instructor(db: AsyncSession, instructor_id: str) -> int:
     """Count total products for an instructor"""
     result = await db.execute(
-        select(Product).filter(Product.instructor_id == instructor_id)
+        select(func.count()).select_from(Product).filter(Product.instructor_id == instructor_id)
     )
-    return len(result.scalars().all())
+    return result.scalar()
@@ -0,0 +1,55 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.upload import UploadedAsset, UploadStatus
+from typing import Optional
+from datetime import datetime
+import uuid
+
+
+async def create_asset(
+    db: AsyncSession,
+    instructor_id: str,
+    kind: str,
+    s3_key: str,
+    filename: str,
+    content_type: str,
+    size: int,
+    multipart_upload_id: Optional[str] = None
+) -> UploadedAsset:
+    """Record a pending direct upload"""
+    asset = UploadedAsset(
+        id=str(uuid.uuid4()),
+        instructor_id=instructor_id,
+        kind=kind,
+        s3_key=s3_key,
+        filename=filename,
+        content_type=content_type,
+        size=size,
+        multipart_upload_id=multipart_upload_id,
+    )
+    db.add(asset)
+    await db.commit()
+    return asset
+
+
+async def get_asset(db: AsyncSession, asset_id: str, instructor_id: str) -> Optional[UploadedAsset]:
+    """Get an upload owned by an instructor"""
+    asset = await db.get(UploadedAsset, asset_id)
+    if asset is None or asset.instructor_id != instructor_id:
+        return None
+    return asset
+
+
+async def complete_asset(db: AsyncSession, asset: UploadedAsset, size: int) -> UploadedAsset:
+    """Mark an upload as verified, with the size found in storage"""
+    asset.size = size
+    asset.status = UploadStatus.COMPLETED
+    asset.completed_at = datetime.now()
+    await db.commit()
+    return asset
+
+
+async def abort_asset(db: AsyncSession, asset: UploadedAsset) -> UploadedAsset:
+    """Mark an upload as cancelled or rejected"""
+    asset.status = UploadStatus.ABORTED
+    await db.commit()
+    return asset
@@ -2,7 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from typing import Optional
 
 
@@ -16,10 +16,9 @@ async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
     """Create new user"""
     db_user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
         full_name=user_in.full_name,
     )
     db.add(db_user)
     await db.commit()
-    await db.refresh(db_user)
     return db_user
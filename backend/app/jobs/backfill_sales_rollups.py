@@ -0,0 +1,50 @@
+"""
+Sales rollups backfill
+
+Rebuilds instructor_daily_sales and product_daily_sales from the orders
+table: run once after creating the tables, after changing
+ANALYTICS_TIMEZONE, or to repair rollups after writes made outside the
+API. Each store is rebuilt in its own transaction while its order writes
+wait, so it is safe to run while the API is serving.
+
+Usage:
+    python -m app.jobs.backfill_sales_rollups [--instructor-id ID ...]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, Optional, Sequence
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal, engine
+from app.crud import analytics as analytics_crud
+from app.models.instructor import Instructor
+
+
+async def backfill_sales_rollups(instructor_ids: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    """Rebuild the given instructors' rollups (all when None); returns orders processed per instructor"""
+    async with AsyncSessionLocal() as db:
+        if instructor_ids is None:
+            result = await db.execute(select(Instructor.id).order_by(Instructor.id))
+            instructor_ids = result.scalars().all()
+
+        processed = {}
+        for instructor_id in instructor_ids:
+            processed[instructor_id] = await analytics_crud.rebuild(db, instructor_id)
+        return processed
+
+
+async def main(instructor_ids: Optional[Sequence[str]]):
+    started = time.perf_counter()
+    processed = await backfill_sales_rollups(instructor_ids)
+    print(
+        f"✅ sales rollups rebuilt for {len(processed)} stores, "
+        f"{sum(processed.values())} orders in {time.perf_counter() - started:.1f}s"
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instructor-id", action="append", dest="instructor_ids")
+    args = parser.parse_args()
+    asyncio.run(main(args.instructor_ids))
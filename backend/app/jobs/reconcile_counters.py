@@ -0,0 +1,50 @@
+"""
+Instructor counters reconciliation
+
+Recomputes every instructor's dashboard counters from the products,
+customers and orders tables and repairs the ones that drifted (writes
+made outside the API, manual SQL, rows created before the counters
+existed). Safe to run while the API is serving writes; schedule it e.g.
+nightly.
+
+Usage:
+    python -m app.jobs.reconcile_counters [--instructor-id ID ...]
+"""
+import argparse
+import asyncio
+from typing import Dict, Optional, Sequence
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal, engine
+from app.crud import counters as counters_crud
+from app.models.instructor import Instructor
+
+
+async def reconcile_counters(instructor_ids: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, int]]:
+    """Reconcile the given instructors (all when None); returns drift per repaired instructor"""
+    async with AsyncSessionLocal() as db:
+        if instructor_ids is None:
+            result = await db.execute(select(Instructor.id).order_by(Instructor.id))
+            instructor_ids = result.scalars().all()
+
+        repaired = {}
+        for instructor_id in instructor_ids:
+            # One short transaction per instructor keeps row locks brief
+            drift = await counters_crud.reconcile(db, instructor_id)
+            if drift:
+                repaired[instructor_id] = drift
+        return repaired
+
+
+async def main(instructor_ids: Optional[Sequence[str]]):
+    repaired = await reconcile_counters(instructor_ids)
+    for instructor_id, drift in repaired.items():
+        print(f"repaired {instructor_id}: {drift}")
+    print(f"✅ counters reconciled ({len(repaired)} repaired)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instructor-id", action="append", dest="instructor_ids")
+    args = parser.parse_args()
+    asyncio.run(main(args.instructor_ids))
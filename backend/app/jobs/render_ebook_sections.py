@@ -0,0 +1,193 @@
+"""
+Ebook section re-render
+
+Renders content_html, the search text (content_text) and a missing
+reading_time from the Tiptap content of every section whose content_hash
+is missing or stale: sections saved before server-side rendering, or all
+of them after RENDERER_VERSION was bumped. The precompressed reader
+responses of those sections (and of any section without one) are rebuilt
+too. Hashing, rendering and compression run across a process pool;
+unchanged sections are skipped, so the job can be re-run at any time. A
+section saved while the job runs keeps its newer HTML and response.
+
+The tables of contents of re-rendered products (reading times) are
+invalidated in the cache. That reaches the API workers only through the
+shared cache (CACHE_REDIS_URL), so without it the job refuses to run
+unless given --no-cache-invalidation: the workers then keep serving the
+old TOCs until EBOOK_TOC_CACHE_TTL expires, or until they are restarted.
+
+Usage:
+    python -m app.jobs.render_ebook_sections [--product-id ID ...] [--workers N] [--batch 200]
+        [--no-cache-invalidation]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Sequence, Tuple
+from sqlalchemy import select, update, bindparam, func
+from app.core.compression import compress_variants
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.tiptap import RenderedSection, content_hash, render_section
+from app.crud import ebook as ebook_crud
+from app.models.ebook import EbookChapter, EbookSection
+from app.schemas.ebook import EbookSectionResponse
+
+BATCH = 200
+
+
+def render_if_stale(content: Any, stored_hash: Optional[str]) -> Optional[RenderedSection]:
+    """Worker: None when the stored HTML is current"""
+    if content is None or content_hash(content) == stored_hash:
+        return None
+    return render_section(content)
+
+
+async def render_ebook_sections(
+    product_ids: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    batch: int = BATCH,
+    invalidate_toc: bool = True,
+) -> Tuple[int, int]:
+    """
+    Re-render stale sections (of the given products, all when None)
+
+    Also precomputes the reader response variants of re-rendered sections
+    and of sections that have none yet, and invalidates the cached TOCs of
+    their products unless invalidate_toc is False. Returns (sections
+    rendered, sections whose variants were stored).
+    """
+    loop = asyncio.get_running_loop()
+    table = EbookSection.__table__
+    # updated_at is kept: re-rendering is not an edit
+    save_html = (
+        update(table)
+        .where(table.c.id == bindparam("section_id"))
+        # Saved through the API meanwhile: its HTML is already newer
+        .where(table.c.content_hash.is_not_distinct_from(bindparam("stored_hash")))
+        .values(
+            content_html=bindparam("html"),
+            content_text=bindparam("text"),
+            content_hash=bindparam("new_hash"),
+            reading_time=func.coalesce(table.c.reading_time, bindparam("minutes")),
+            updated_at=table.c.updated_at,
+        )
+    )
+    save_variants = (
+        update(table)
+        .where(table.c.id == bindparam("section_id"))
+        .where(table.c.revision.is_not_distinct_from(bindparam("stored_revision")))
+        .values(
+            revision=bindparam("new_revision"),
+            body_gzip=bindparam("gzip"),
+            body_br=bindparam("br"),
+            updated_at=table.c.updated_at,
+        )
+    )
+
+    rendered_count = stored_count = 0
+    last_id = ""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            async with AsyncSessionLocal() as db:
+                query = (
+                    select(
+                        EbookSection.id, EbookSection.content, EbookSection.content_hash,
+                        EbookSection.revision, EbookChapter.product_id,
+                    )
+                    .join(EbookChapter)
+                    .where(EbookSection.id > last_id)
+                    .order_by(EbookSection.id)
+                    .limit(batch)
+                )
+                if product_ids is not None:
+                    query = query.where(EbookChapter.product_id.in_(product_ids))
+                rows = (await db.execute(query)).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(pool, render_if_stale, row.content, row.content_hash)
+                    for row in rows
+                ))
+                changed = [(row, rendered) for row, rendered in zip(rows, results) if rendered is not None]
+                if changed:
+                    await db.execute(save_html, [
+                        {
+                            "section_id": row.id,
+                            "stored_hash": row.content_hash,
+                            "html": rendered.content_html,
+                            "text": rendered.content_text,
+                            "new_hash": rendered.content_hash,
+                            "minutes": rendered.reading_time,
+                        }
+                        for row, rendered in changed
+                    ])
+                    await db.commit()
+
+                # Reader responses of what was re-rendered or never stored
+                outdated = {row.id for row, _ in changed} | {row.id for row in rows if row.revision is None}
+                if outdated:
+                    sections = (await db.execute(
+                        select(EbookSection).where(EbookSection.id.in_(outdated))
+                    )).scalars().all()
+                    bodies = [
+                        (section, *ebook_crud.section_body(EbookSectionResponse.model_validate(section)))
+                        for section in sections
+                    ]
+                    variants = await asyncio.gather(*(
+                        loop.run_in_executor(pool, compress_variants, body) for _, _, body in bodies
+                    ))
+                    await db.execute(save_variants, [
+                        {
+                            "section_id": section.id,
+                            "stored_revision": section.revision,
+                            "new_revision": revision,
+                            "gzip": compressed["gzip"],
+                            "br": compressed.get("br"),
+                        }
+                        for (section, revision, _), compressed in zip(bodies, variants)
+                    ])
+                    await db.commit()
+                    stored_count += len(bodies)
+
+            rendered_count += len(changed)
+            if changed and invalidate_toc:
+                await ebook_crud.invalidate_toc(*{row.product_id for row, _ in changed})
+
+    return rendered_count, stored_count
+
+
+async def main(product_ids: Optional[Sequence[str]], workers: Optional[int], batch: int, invalidate_toc: bool):
+    started = time.perf_counter()
+    rendered, stored = await render_ebook_sections(product_ids, workers, batch, invalidate_toc)
+    print(
+        f"✅ {rendered} ebook sections rendered, {stored} reader responses precompressed "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    if rendered and not invalidate_toc:
+        print(
+            "⚠️ Cached tables of contents were not invalidated: restart the API workers to refresh "
+            f"them now (they expire within {settings.EBOOK_TOC_CACHE_TTL}s)"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--product-id", action="append", dest="product_ids")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--batch", type=int, default=BATCH)
+    parser.add_argument(
+        "--no-cache-invalidation", action="store_false", dest="invalidate_toc",
+        help="run without CACHE_REDIS_URL; API workers keep their cached tables of contents",
+    )
+    args = parser.parse_args()
+    if args.invalidate_toc and not settings.CACHE_REDIS_URL:
+        parser.error(
+            "CACHE_REDIS_URL is not set, so the API workers' cached tables of contents cannot be "
+            "invalidated; set it, or pass --no-cache-invalidation and restart the workers afterwards"
+        )
+    asyncio.run(main(args.product_ids, args.workers, args.batch, args.invalidate_toc))
@@ -1,10 +1,9 @@
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from fastapi import FastAPI
 from app.core.config import settings
-from app.core.database import engine, Base
-import re
+from app.core.cors import CORSMiddleware
+from app.core.database import engine, replica_engine, Base
+from app.core.store_cache import store_cache
+from app.crud.ebook import progress_buffer
 
 # Create FastAPI app
 app = FastAPI(
@@ -14,52 +13,12 @@ app = FastAPI(
     docs_url=f"{settings.API_V1_STR}/docs",
 )
 
-# Custom CORS middleware to allow all *.class-on.kr subdomains
-class DynamicCORSMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        origin = request.headers.get("origin")
-
-        # List of allowed origins
-        allowed_origins = settings.BACKEND_CORS_ORIGINS.copy()
-
-        # Check if origin matches *.class-on.kr pattern
-        if origin:
-            # Allow main domain class-on.kr
-            if origin == "https://class-on.kr":
-                allowed_origins.append(origin)
-            # Allow all subdomains of class-on.kr
-            if re.match(r"^https://[a-zA-Z0-9-]+\.class-on\.kr$", origin):
-                allowed_origins.append(origin)
-            # Also allow localhost for development
-            if origin.startswith("http://localhost"):
-                allowed_origins.append(origin)
-
-        # Handle preflight OPTIONS requests
-        if request.method == "OPTIONS":
-            if origin in allowed_origins:
-                return Response(
-                    status_code=200,
-                    headers={
-                        "Access-Control-Allow-Origin": origin,
-                        "Access-Control-Allow-Credentials": "true",
-                        "Access-Control-Allow-Methods": "*",
-                        "Access-Control-Allow-Headers": "*",
-                    }
-                )
-
-        response = await call_next(request)
-
-        # Set CORS headers if origin is allowed
-        if origin in allowed_origins:
-            response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            response.headers["Access-Control-Allow-Methods"] = "*"
-            response.headers["Access-Control-Allow-Headers"] = "*"
-
-        return response
-
-# Add custom CORS middleware (handles all CORS including wildcards)
-app.add_middleware(DynamicCORSMiddleware)
+# CORS for the main domain, every *.class-on.kr store and local development
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
+    max_age=settings.CORS_PREFLIGHT_MAX_AGE,
+)
 
 
 @app.on_event("startup")
@@ -67,6 +26,12 @@ async def startup_event():
     """Create database tables on startup"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    progress_buffer.start()
+    if not store_cache.enabled:
+        print(
+            f"⚠️ WEB_CONCURRENCY={settings.WEB_CONCURRENCY} without CACHE_REDIS_URL: workers cannot see "
+            "each other's store updates, so the storefront response cache is disabled"
+        )
     print(f"🚀 {settings.PROJECT_NAME} started!")
     print(f"📚 Docs: http://{settings.HOST}:{settings.PORT}{settings.API_V1_STR}/docs")
 
@@ -74,7 +39,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up on shutdown"""
+    await progress_buffer.stop()  # write buffered reading progress
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
     print(f"👋 {settings.PROJECT_NAME} shutting down...")
 
 
@@ -95,7 +63,7 @@ async def health_check():
 
 
 # Import and include routers
-from app.api.v1 import auth, products, upload, orders, customers, kakao_auth, ebook
+from app.api.v1 import auth, products, upload, orders, customers, kakao_auth, ebook, analytics, internal
 
 app.include_router(auth.router, prefix=settings.API_V1_STR, tags=["auth"])
 app.include_router(products.router, prefix=settings.API_V1_STR, tags=["products"])
@@ -104,3 +72,13 @@ app.include_router(orders.router, prefix=settings.API_V1_STR, tags=["orders"])
 app.include_router(customers.router, prefix=settings.API_V1_STR, tags=["customers"])
 app.include_router(kakao_auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["kakao-auth"])
 app.include_router(ebook.router, prefix=f"{settings.API_V1_STR}/ebook", tags=["ebook"])
+app.include_router(analytics.router, prefix=settings.API_V1_STR, tags=["analytics"])
+app.include_router(internal.router, prefix=f"{settings.API_V1_STR}/internal", tags=["internal"])
+
+# Serve uploaded files when they are stored on local disk
+if settings.STORAGE_BACKEND == "local" and settings.LOCAL_STORAGE_URL.startswith("/"):
+    import os
+    from fastapi.staticfiles import StaticFiles
+
+    os.makedirs(settings.LOCAL_STORAGE_PATH, exist_ok=True)
+    app.mount(settings.LOCAL_STORAGE_URL, StaticFiles(directory=settings.LOCAL_STORAGE_PATH), name="storage")
@@ -3,7 +3,10 @@ from app.models.instructor import Instructor
 from app.models.product import Product, ProductType
 from app.models.customer import Customer
 from app.models.order import Order, OrderStatus
-from app.models.ebook import EbookChapter, EbookSection, UserEbookProgress, UserEbookBookmark
+from app.models.ebook import EbookChapter, EbookSection, UserEbookProgress, UserEbookBookmark, EbookCompletion
+from app.models.upload import UploadedAsset, UploadStatus
+from app.models.counters import InstructorCounters
+from app.models.analytics import InstructorDailySales, ProductDailySales
 
 __all__ = [
     "User",
@@ -17,4 +20,10 @@ __all__ = [
     "EbookSection",
     "UserEbookProgress",
     "UserEbookBookmark",
+    "EbookCompletion",
+    "UploadedAsset",
+    "UploadStatus",
+    "InstructorCounters",
+    "InstructorDailySales",
+    "ProductDailySales",
 ]
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, ForeignKey, Index
+from app.core.database import Base
+
+
+class SalesRollupColumns:
+    """Daily sales aggregates shared by the store and product rollups"""
+    orders = Column(Integer, nullable=False, default=0)  # 주문 생성 건수
+    paid_orders = Column(Integer, nullable=False, default=0)  # 결제 완료 건수 (결제일 기준)
+    paid_revenue = Column(BigInteger, nullable=False, default=0)  # 결제 금액 (원)
+    refunded_orders = Column(Integer, nullable=False, default=0)  # 환불 건수 (환불일 기준)
+    refunded_revenue = Column(BigInteger, nullable=False, default=0)  # 환불 금액 (원)
+
+
+class InstructorDailySales(SalesRollupColumns, Base):
+    """
+    Sales of one store on one day (ANALYTICS_TIMEZONE)
+
+    Maintained incrementally by the order writes (app.crud.analytics) and
+    rebuilt from the orders table by app.jobs.backfill_sales_rollups.
+    """
+    __tablename__ = "instructor_daily_sales"
+
+    instructor_id = Column(String, ForeignKey("instructors.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+
+class ProductDailySales(SalesRollupColumns, Base):
+    """Sales of one product on one day (ANALYTICS_TIMEZONE)"""
+    __tablename__ = "product_daily_sales"
+
+    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    instructor_id = Column(String, ForeignKey("instructors.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        # 강사 단위 상품별 집계 (기간 내 상품 순위)
+        Index("ix_product_daily_sales_instructor_day", "instructor_id", "day"),
+    )
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class InstructorCounters(Base):
+    """
+    Dashboard counters of one instructor
+
+    Adjusted in the same transaction as every product, customer and order
+    write (app.crud.counters), and repaired by the reconciliation job
+    (app.jobs.reconcile_counters) if they ever drift.
+    """
+    __tablename__ = "instructor_counters"
+
+    instructor_id = Column(String, ForeignKey("instructors.id", ondelete="CASCADE"), primary_key=True)
+
+    products = Column(Integer, nullable=False, default=0)
+    published_products = Column(Integer, nullable=False, default=0)
+    customers = Column(Integer, nullable=False, default=0)
+
+    # 주문 상태별 건수
+    orders_pending = Column(Integer, nullable=False, default=0)
+    orders_paid = Column(Integer, nullable=False, default=0)
+    orders_cancelled = Column(Integer, nullable=False, default=0)
+    orders_refunded = Column(Integer, nullable=False, default=0)
+    revenue = Column(BigInteger, nullable=False, default=0)  # PAID 주문 결제 금액 합계 (원)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
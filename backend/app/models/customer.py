@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -39,10 +39,29 @@ class Customer(Base):
 
     # Relationships
     instructor = relationship("Instructor", back_populates="customers")
-    orders = relationship("Order", back_populates="customer", cascade="all, delete-orphan")
+    orders = relationship("Order", back_populates="customer", cascade="all, delete-orphan", passive_deletes=True)
 
     # Unique constraint: each instructor can have unique customer emails
     __table_args__ = (
         # Email must be unique per instructor
         # (Different instructors can have customers with the same email)
+        # Cursor pagination of the customer list (created_at DESC, id DESC)
+        Index("ix_customers_instructor_created", "instructor_id", "created_at", "id"),
     )
+
+
+# Customer search (PostgreSQL only): trigram GIN indexes serve ILIKE '%q%' on
+# name, email and phone; the lower() B-tree indexes serve short prefix queries
+event.listen(
+    Customer.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for statement in (
+    "CREATE INDEX ix_customers_full_name_trgm ON customers USING GIN (full_name gin_trgm_ops)",
+    "CREATE INDEX ix_customers_email_trgm ON customers USING GIN (email gin_trgm_ops)",
+    "CREATE INDEX ix_customers_phone_trgm ON customers USING GIN (phone gin_trgm_ops)",
+    "CREATE INDEX ix_customers_instructor_name_prefix ON customers (instructor_id, lower(full_name) text_pattern_ops)",
+    "CREATE INDEX ix_customers_instructor_email_prefix ON customers (instructor_id, lower(email) text_pattern_ops)",
+):
+    event.listen(Customer.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, LargeBinary, ForeignKey, UniqueConstraint, Index, DDL, event
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.dialects.postgresql import JSON
 from app.core.database import Base
 import uuid
@@ -21,7 +21,7 @@ class EbookChapter(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    sections = relationship("EbookSection", back_populates="chapter", cascade="all, delete-orphan", order_by="EbookSection.order_index")
+    sections = relationship("EbookSection", back_populates="chapter", cascade="all, delete-orphan", passive_deletes=True, order_by="EbookSection.order_index")
 
 
 class EbookSection(Base):
@@ -32,18 +32,40 @@ class EbookSection(Base):
     chapter_id = Column(String, ForeignKey("ebook_chapters.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
     content = Column(JSON, nullable=True)  # Tiptap JSON 형식 콘텐츠
-    content_html = Column(Text, nullable=True)  # 렌더링된 HTML (검색/미리보기용)
+    content_html = Column(Text, nullable=True)  # 서버에서 렌더링한 HTML (content로부터 생성)
+    content_hash = Column(String(64), nullable=True)  # content_html을 만든 content + 렌더러 버전의 해시
+    content_text = deferred(Column(Text, nullable=True))  # 검색용 본문 텍스트 (content로부터 생성)
     order_index = Column(Integer, nullable=False, default=0)  # 정렬 순서
     reading_time = Column(Integer, nullable=True)  # 예상 읽기 시간 (분)
     is_published = Column(Boolean, default=True)  # 공개 여부
     is_free = Column(Boolean, default=False)  # 무료 미리보기 여부
 
+    # 학습자 뷰어 응답(JSON) 사전 압축본: 저장할 때 생성, 필요할 때만 로드(deferred)
+    revision = Column(String(32), nullable=True)  # 응답 내용의 해시 (ETag)
+    body_gzip = deferred(Column(LargeBinary, nullable=True))
+    body_br = deferred(Column(LargeBinary, nullable=True))  # brotli 미설치 시 NULL
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     chapter = relationship("EbookChapter", back_populates="sections")
-    progress = relationship("UserEbookProgress", back_populates="section", cascade="all, delete-orphan")
+    progress = relationship("UserEbookProgress", back_populates="section", cascade="all, delete-orphan", passive_deletes=True)
+
+
+# 전자책 본문 검색용 tsvector 컬럼과 GIN 인덱스 (PostgreSQL 전용, 저장 시 자동 갱신)
+# ORM에는 매핑하지 않음: 검색 쿼리에서만 사용 (app.crud.ebook.search_sections)
+# 기존 DB는 migrations/add_ebook_sections_search_vector.sql 로 추가
+SECTION_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(content_text, '')), 'B')"
+)
+
+for statement in (
+    f"ALTER TABLE ebook_sections ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SECTION_SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX ix_ebook_sections_search_vector ON ebook_sections USING GIN (search_vector)",
+):
+    event.listen(EbookSection.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
 
 
 class UserEbookProgress(Base):
@@ -63,6 +85,37 @@ class UserEbookProgress(Base):
     # Relationships
     section = relationship("EbookSection", back_populates="progress")
 
+    __table_args__ = (
+        # 한 사용자당 한 섹션당 하나의 진행률 (진행률 upsert 대상)
+        UniqueConstraint("customer_id", "section_id"),
+    )
+
+
+class EbookCompletion(Base):
+    """
+    Completion of one product's ebook by one customer (instructor report)
+
+    completed_sections counts completed sections that are published (in a
+    published chapter). Refreshed from user_ebook_progress in the same
+    transaction as every progress write and rebuilt for the whole product
+    when its sections are published, unpublished or deleted
+    (app.crud.ebook). The percentage is derived at read time from the
+    product's published section count, so adding a section touches no row.
+    """
+    __tablename__ = "ebook_completions"
+
+    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    customer_id = Column(String, ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True)
+    completed_sections = Column(Integer, nullable=False, default=0)  # 완료한 공개 섹션 수
+    last_read_at = Column(DateTime(timezone=True), nullable=True)  # 마지막 읽은 시간
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # 상품별 학습자 목록 (완료 섹션 수 순, 키셋 페이지네이션)
+        Index("ix_ebook_completions_product_completed", "product_id", "completed_sections", "customer_id"),
+    )
+
 
 class UserEbookBookmark(Base):
     """사용자 전자책 북마크"""
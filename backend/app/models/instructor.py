@@ -46,4 +46,4 @@ class Instructor(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    customers = relationship("Customer", back_populates="instructor", cascade="all, delete-orphan")
+    customers = relationship("Customer", back_populates="instructor", cascade="all, delete-orphan", passive_deletes=True)
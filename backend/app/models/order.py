@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum, Text, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -45,3 +45,10 @@ class Order(Base):
 
     # Relationships
     customer = relationship("Customer", back_populates="orders")
+
+    __table_args__ = (
+        # 목록 커서 페이지네이션 (created_at DESC, id DESC)
+        Index("ix_orders_instructor_created", "instructor_id", "created_at", "id"),
+        # 구매 확인 (전자책 열람 권한, 완료율 집계)
+        Index("ix_orders_customer_product", "customer_id", "product_id"),
+    )
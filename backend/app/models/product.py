@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, Enum, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, Enum, ForeignKey, Index, DDL, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSON
@@ -16,7 +16,7 @@ class Product(Base):
     __tablename__ = "products"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    instructor_id = Column(String, ForeignKey("instructors.id"), nullable=False)
+    instructor_id = Column(String, ForeignKey("instructors.id"), nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)  # 간단한 설명 (목록용)
     detailed_description = Column(Text, nullable=True)  # 상세 설명 (HTML/Markdown)
@@ -53,5 +53,26 @@ class Product(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # 목록 커서 페이지네이션 (created_at DESC, id DESC)
+        Index("ix_products_instructor_created", "instructor_id", "created_at", "id"),
+    )
+
     # Relationships (will be added later)
     # instructor = relationship("Instructor", back_populates="products")
+
+
+# 스토어 검색용 tsvector 컬럼과 GIN 인덱스 (PostgreSQL 전용)
+# ORM에는 매핑하지 않음: 검색 쿼리에서만 사용 (app.crud.product.search_published_products)
+# 기존 DB는 migrations/add_products_search_vector.sql 로 추가
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+for statement in (
+    f"ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX ix_products_search_vector ON products USING GIN (search_vector)",
+):
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+import enum
+
+
+class UploadStatus(str, enum.Enum):
+    PENDING = "PENDING"  # URL issued, upload not confirmed yet
+    COMPLETED = "COMPLETED"  # Object verified in storage
+    ABORTED = "ABORTED"  # Cancelled or rejected on completion
+
+
+class UploadedAsset(Base):
+    """File uploaded directly to storage with a presigned URL"""
+    __tablename__ = "uploaded_assets"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    instructor_id = Column(String, ForeignKey("instructors.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    kind = Column(String, nullable=False)  # image, video, document
+    s3_key = Column(String, unique=True, nullable=False)
+    filename = Column(String, nullable=False)  # Original filename
+    content_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)  # Declared, then verified size in bytes
+    multipart_upload_id = Column(String, nullable=True)  # Set for multipart uploads
+    status = Column(SQLEnum(UploadStatus, name="upload_status"), default=UploadStatus.PENDING, nullable=False)
+
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
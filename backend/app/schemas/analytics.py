@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from enum import Enum
+
+
+class SalesGranularity(str, Enum):
+    DAY = "day"
+    WEEK = "week"  # 월요일 시작
+    MONTH = "month"
+
+
+class SalesTotals(BaseModel):
+    orders: int = 0  # 생성된 주문
+    paid_orders: int = 0  # 결제 완료 (결제일 기준)
+    paid_revenue: int = 0
+    refunded_orders: int = 0  # 환불 (환불일 기준)
+    refunded_revenue: int = 0
+    net_revenue: int = 0  # paid_revenue - refunded_revenue
+
+
+class SalesBucket(SalesTotals):
+    period_start: date
+
+
+class SalesSeriesResponse(BaseModel):
+    start: date
+    end: date
+    granularity: SalesGranularity
+    timezone: str
+    product_id: Optional[str] = None
+    totals: SalesTotals
+    series: List[SalesBucket]
+
+
+class ProductSales(SalesTotals):
+    product_id: str
+    title: str
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Any
 from datetime import datetime
 
@@ -36,7 +36,6 @@ class EbookChapterResponse(EbookChapterBase):
 class EbookSectionBase(BaseModel):
     title: str
     content: Optional[Any] = None  # Tiptap JSON
-    content_html: Optional[str] = None
     order_index: int = 0
     reading_time: Optional[int] = None
     is_published: bool = True
@@ -50,7 +49,6 @@ class EbookSectionCreate(EbookSectionBase):
 class EbookSectionUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[Any] = None
-    content_html: Optional[str] = None
     order_index: Optional[int] = None
     reading_time: Optional[int] = None
     is_published: Optional[bool] = None
@@ -60,6 +58,8 @@ class EbookSectionUpdate(BaseModel):
 class EbookSectionResponse(EbookSectionBase):
     id: str
     chapter_id: str
+    content_html: Optional[str] = None  # content를 서버에서 렌더링한 HTML
+    revision: Optional[str] = None  # 뷰어 응답 버전 (ETag)
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -82,6 +82,25 @@ class UserEbookProgressCreate(UserEbookProgressBase):
     section_id: str
 
 
+# 한 번에 받는 진행률 이벤트 수
+MAX_PROGRESS_EVENTS = 200
+
+
+class UserEbookProgressEvent(BaseModel):
+    """Progress reported while reading (scroll); merged keeping the furthest progress"""
+    section_id: str
+    reading_progress: int = Field(0, ge=0, le=100)
+    is_completed: bool = False
+
+
+class UserEbookProgressBatch(BaseModel):
+    events: List[UserEbookProgressEvent] = Field(..., min_length=1, max_length=MAX_PROGRESS_EVENTS)
+
+
+class UserEbookProgressBatchResponse(BaseModel):
+    accepted: int  # 병합 후 (섹션 단위) 이벤트 수
+
+
 class UserEbookProgressUpdate(BaseModel):
     is_completed: Optional[bool] = None
     reading_progress: Optional[int] = None
@@ -125,8 +144,69 @@ class UserEbookBookmarkResponse(UserEbookBookmarkBase):
         from_attributes = True
 
 
+# Table of contents (viewer sidebar: no section content)
+class EbookTocSection(BaseModel):
+    id: str
+    title: str
+    order_index: int
+    reading_time: Optional[int] = None
+    is_free: bool = False
+
+
+class EbookTocChapter(BaseModel):
+    id: str
+    title: str
+    description: Optional[str] = None
+    order_index: int
+    sections: List[EbookTocSection] = []
+
+
 # Ebook Structure (for viewer)
 class EbookStructureResponse(BaseModel):
     product_id: str
     product_title: str
-    chapters: List[EbookChapterWithSections]
+    chapters: List[EbookTocChapter]
+
+
+# Completion (완료율 = 완료한 공개 섹션 / 공개 섹션, 0-100)
+class EbookCompletionResponse(BaseModel):
+    product_id: str
+    completed_sections: int
+    total_sections: int
+    completion_rate: int
+    last_read_at: Optional[datetime] = None
+
+
+class EbookLearnerCompletion(BaseModel):
+    customer_id: str
+    full_name: str
+    email: str
+    completed_sections: int
+    completion_rate: int
+    last_read_at: Optional[datetime] = None
+
+
+class EbookCompletionReport(BaseModel):
+    product_id: str
+    total_sections: int
+    learners: int  # 학습을 시작한 고객 수
+    completed_learners: int  # 모든 공개 섹션을 완료한 고객 수
+    average_completion_rate: int
+    items: List[EbookLearnerCompletion]
+
+
+# Search inside an ebook
+class EbookSearchHit(BaseModel):
+    section_id: str
+    title: str
+    is_free: bool
+    chapter_id: str
+    chapter_title: str
+    snippet: str  # HTML: 이스케이프된 본문 발췌, 검색어는 <mark>로 강조
+
+
+class EbookSearchResponse(BaseModel):
+    """Matching sections, best match first"""
+    query: str
+    total: int
+    items: List[EbookSearchHit]
@@ -91,3 +91,80 @@ class ProductResponse(ProductBase):
 
     class Config:
         from_attributes = True
+
+
+class ProductCard(BaseModel):
+    """Product grid / list card (no detail page content)"""
+    id: str
+    instructor_id: str
+    title: str
+    description: Optional[str] = None
+    price: int
+    discount_price: Optional[int] = None
+    thumbnail: Optional[str] = None
+    type: ProductType
+    category: Optional[str] = None
+    duration: Optional[int] = None
+    is_published: bool = False
+    is_new: bool = False
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CategoryFacet(BaseModel):
+    category: Optional[str] = None  # None: 카테고리 미지정
+    count: int
+
+
+class ProductSearchResponse(BaseModel):
+    """Store search results, best match first"""
+    query: str
+    total: int  # Matches (within category, when given)
+    items: List[ProductCard]
+    categories: List[CategoryFacet]  # Matches per category, ignoring the category filter
+
+
+# 일괄 처리 한 번에 허용하는 상품 수
+MAX_BULK_PRODUCTS = 500
+
+
+class ProductBulkOperation(str, Enum):
+    PUBLISH = "publish"
+    UNPUBLISH = "unpublish"
+    UPDATE = "update"  # patch 적용
+    DELETE = "delete"
+
+
+class ProductBulkPatch(BaseModel):
+    """Fields that can be set on many products at once (only the ones sent are applied)"""
+    # null은 discount_price, category에만 허용 (할인/카테고리 해제)
+    price: int = Field(None, ge=0)
+    discount_price: Optional[int] = Field(None, ge=0)
+    category: Optional[str] = None
+    is_published: bool = None
+    is_new: bool = None
+
+
+class ProductBulkRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_PRODUCTS)
+    operation: ProductBulkOperation
+    patch: Optional[ProductBulkPatch] = None  # operation이 update일 때 필수
+
+
+class ProductBulkStatus(str, Enum):
+    UPDATED = "updated"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"  # 없거나 다른 강사의 상품
+
+
+class ProductBulkResult(BaseModel):
+    id: str
+    status: ProductBulkStatus
+
+
+class ProductBulkResponse(BaseModel):
+    operation: ProductBulkOperation
+    affected: int
+    results: List[ProductBulkResult]  # 요청한 ids 순서
@@ -0,0 +1,69 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class UploadKind(str, Enum):
+    IMAGE = "image"
+    VIDEO = "video"
+    DOCUMENT = "document"
+
+
+class UploadStatus(str, Enum):
+    PENDING = "PENDING"
+    COMPLETED = "COMPLETED"
+    ABORTED = "ABORTED"
+
+
+class PresignMethod(str, Enum):
+    POST = "POST"  # Form upload; size limit enforced by the storage policy
+    PUT = "PUT"  # Single PUT; size checked on completion
+    MULTIPART = "MULTIPART"  # One PUT per part (large videos)
+
+
+class PresignRequest(BaseModel):
+    kind: UploadKind
+    filename: str = Field(..., min_length=1)
+    content_type: str = Field(..., min_length=1)
+    size: int = Field(..., gt=0)  # Bytes
+    method: Optional[PresignMethod] = None  # Default: POST, MULTIPART for large files
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class PresignResponse(BaseModel):
+    asset_id: str
+    key: str
+    method: PresignMethod
+    expires_in: int  # Seconds
+    url: Optional[str] = None  # POST / PUT
+    fields: Optional[Dict[str, str]] = None  # POST form fields
+    headers: Optional[Dict[str, str]] = None  # Headers the PUT must send
+    part_size: Optional[int] = None  # MULTIPART: bytes per part (last may be smaller)
+    parts: Optional[List[PresignedPart]] = None
+
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(..., ge=1)
+    etag: str
+
+
+class UploadCompleteRequest(BaseModel):
+    # MULTIPART only; when omitted the uploaded parts are listed from storage
+    parts: Optional[List[CompletedPart]] = None
+
+
+class UploadedAssetResponse(BaseModel):
+    id: str
+    kind: UploadKind
+    filename: str
+    content_type: str
+    size: int
+    status: UploadStatus
+    url: str
+    created_at: datetime
+    completed_at: Optional[datetime] = None
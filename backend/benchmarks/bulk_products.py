@@ -0,0 +1,108 @@
+"""
+Bulk product operations benchmark
+
+Fills a throwaway SQLite database with one store's catalog, then times
+publishing/unpublishing batches of 10, 100 and 500 products the way the
+dashboard did it before (one PUT /products/{id} per product: ownership
+SELECT, update, commit) against one bulk_update_products call, and
+deleting the same batches with bulk_delete_products. Per-product work grows
+with the batch; the bulk statements stay close to flat.
+
+Usage:
+    python -m benchmarks.bulk_products [--products 5000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bulk_products.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.crud import counters as counters_crud, product as product_crud  # noqa: E402
+from app.models import Product, ProductType  # noqa: E402
+from app.schemas.product import ProductUpdate  # noqa: E402
+
+STORE = "bench-store"
+BATCHES = (10, 100, 500)
+RUNS = 5
+
+
+async def fill(products: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Product), [
+            {
+                "id": f"product-{n:06d}",
+                "instructor_id": STORE,
+                "title": f"상품 {n}",
+                "price": 10000,
+                "type": ProductType.EBOOK,
+                "is_published": False,
+            }
+            for n in range(products)
+        ])
+    async with AsyncSessionLocal() as db:
+        await counters_crud.reconcile(db, STORE)
+
+
+async def one_by_one(ids, published: bool):
+    async with AsyncSessionLocal() as db:
+        for product_id in ids:
+            product = await product_crud.get_product(db, product_id)
+            assert product.instructor_id == STORE
+            await product_crud.update_product(db, product_id, ProductUpdate(is_published=published))
+
+
+async def bulk(ids, published: bool):
+    async with AsyncSessionLocal() as db:
+        updated = await product_crud.bulk_update_products(db, STORE, ids, {"is_published": published})
+        assert len(updated) == len(ids)
+
+
+async def timed(run, ids) -> float:
+    timings = []
+    for n in range(RUNS):
+        begin = time.perf_counter()
+        await run(ids, n % 2 == 0)
+        timings.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(timings)
+
+
+async def main(products: int):
+    await fill(products)
+    print(f"{products:,} products, median of {RUNS} runs")
+    print(f"  {'batch':>5}  {'one by one':>12}  {'bulk update':>12}  {'bulk delete':>12}")
+
+    offset = 0
+    for size in BATCHES:
+        ids = [f"product-{n:06d}" for n in range(offset, offset + size)]
+        offset += size
+        loop_ms = await timed(one_by_one, ids)
+        bulk_ms = await timed(bulk, ids)
+
+        begin = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            deleted = await product_crud.bulk_delete_products(db, STORE, ids)
+        delete_ms = (time.perf_counter() - begin) * 1000
+        assert len(deleted) == size
+
+        print(f"  {size:>5}  {loop_ms:>10.1f}ms  {bulk_ms:>10.1f}ms  {delete_ms:>10.1f}ms")
+
+    async with AsyncSessionLocal() as db:
+        drift = await counters_crud.reconcile(db, STORE)
+    print(f"counter drift after the run: {drift or 'none'}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.products))
@@ -0,0 +1,142 @@
+"""
+CORS middleware benchmark
+
+Compares requests/sec of the previous BaseHTTPMiddleware implementation
+against the pure ASGI CORSMiddleware, driving the ASGI app directly
+(no sockets) so only middleware overhead is measured.
+
+Usage:
+    python -m benchmarks.cors_middleware [--requests 20000]
+"""
+import argparse
+import asyncio
+import re
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.cors import CORSMiddleware
+
+
+class LegacyDynamicCORSMiddleware(BaseHTTPMiddleware):
+    """The middleware previously defined in app/main.py"""
+
+    async def dispatch(self, request: Request, call_next):
+        origin = request.headers.get("origin")
+        allowed_origins = settings.BACKEND_CORS_ORIGINS.copy()
+
+        if origin:
+            if origin == "https://class-on.kr":
+                allowed_origins.append(origin)
+            if re.match(r"^https://[a-zA-Z0-9-]+\.class-on\.kr$", origin):
+                allowed_origins.append(origin)
+            if origin.startswith("http://localhost"):
+                allowed_origins.append(origin)
+
+        if request.method == "OPTIONS":
+            if origin in allowed_origins:
+                return Response(
+                    status_code=200,
+                    headers={
+                        "Access-Control-Allow-Origin": origin,
+                        "Access-Control-Allow-Credentials": "true",
+                        "Access-Control-Allow-Methods": "*",
+                        "Access-Control-Allow-Headers": "*",
+                    }
+                )
+
+        response = await call_next(request)
+
+        if origin in allowed_origins:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers["Access-Control-Allow-Methods"] = "*"
+            response.headers["Access-Control-Allow-Headers"] = "*"
+
+        return response
+
+
+async def endpoint(request):
+    return JSONResponse({"status": "ok"})
+
+
+def build_app(middleware: str):
+    app = Starlette(routes=[Route("/products", endpoint, methods=["GET"])])
+    if middleware == "legacy":
+        app.add_middleware(LegacyDynamicCORSMiddleware)
+    else:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=settings.BACKEND_CORS_ORIGINS,
+            max_age=settings.CORS_PREFLIGHT_MAX_AGE,
+        )
+    return app
+
+
+def make_scope(method: str, origin: bytes):
+    headers = [(b"host", b"api.class-on.kr"), (b"origin", origin)]
+    if method == "OPTIONS":
+        headers.append((b"access-control-request-method", b"GET"))
+        headers.append((b"access-control-request-headers", b"authorization"))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "https",
+        "path": "/products",
+        "raw_path": b"/products",
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+
+async def run(app, method: str, requests: int) -> float:
+    origins = [f"https://store{i}.class-on.kr".encode() for i in range(100)]
+
+    def make_receive():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # The client never disconnects; the middleware cancels this wait
+            await asyncio.Event().wait()
+        return receive
+
+    async def send(message):
+        pass
+
+    # Warm up (builds the middleware stack)
+    await app(make_scope(method, origins[0]), make_receive(), send)
+
+    calls = [(make_scope(method, origins[i % len(origins)]), make_receive()) for i in range(requests)]
+    start = time.perf_counter()
+    for scope, receive in calls:
+        await app(scope, receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int):
+    for method in ("GET", "OPTIONS"):
+        legacy = await run(build_app("legacy"), method, requests)
+        current = await run(build_app("asgi"), method, requests)
+        print(
+            f"{method:8s} legacy: {legacy:10.0f} req/s   "
+            f"asgi: {current:10.0f} req/s   speedup: {current / legacy:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,122 @@
+"""
+Dashboard stats benchmark
+
+Fills a throwaway SQLite database with one large store (products,
+customers, orders in every status), then times what the three
+/stats/summary endpoints used to run (loading every product row, six order
+queries, a customer count) against the single counters row they read now.
+Finally checks the counters against the source tables with the
+reconciliation job.
+
+Usage:
+    python -m benchmarks.dashboard_counters [--products 20000] [--customers 50000] [--orders 200000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+_db_file = os.path.join(tempfile.mkdtemp(), "dashboard_counters.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.crud import counters as counters_crud  # noqa: E402
+from app.crud import customer as customer_crud, order as order_crud, product as product_crud  # noqa: E402
+from app.jobs.reconcile_counters import reconcile_counters  # noqa: E402
+from app.models import Customer, Instructor, Order, OrderStatus, Product, ProductType  # noqa: E402
+
+STORE = "bench-store"
+BATCH = 20000
+RUNS = 10
+
+
+async def fill(products: int, customers: int, orders: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Instructor), [{
+            "id": STORE, "email": "bench@class-on.kr", "hashed_password": "x", "full_name": "Bench",
+            "subdomain": "bench", "store_name": "Bench Store",
+        }])
+        await conn.execute(insert(Product), [{
+            "id": f"p{n}", "instructor_id": STORE, "title": f"상품 {n}", "price": 10000,
+            "type": ProductType.EBOOK, "is_published": n % 3 != 0, "detailed_description": "<p>상세</p>" * 200,
+        } for n in range(products)])
+        for offset in range(0, customers, BATCH):
+            await conn.execute(insert(Customer), [{
+                "id": f"c{n}", "instructor_id": STORE, "email": f"c{n}@class-on.kr", "full_name": "수강생",
+            } for n in range(offset, min(offset + BATCH, customers))])
+        statuses = list(OrderStatus)
+        for offset in range(0, orders, BATCH):
+            await conn.execute(insert(Order), [{
+                "id": str(uuid.uuid4()), "customer_id": f"c{n % customers}", "product_id": f"p{n % products}",
+                "instructor_id": STORE, "order_number": f"ORD{n:010d}", "status": random.choice(statuses),
+                "original_price": 10000, "paid_price": random.choice((5000, 10000)),
+            } for n in range(offset, min(offset + BATCH, orders))])
+
+
+async def timed(call) -> float:
+    timings = []
+    for _ in range(RUNS):
+        async with AsyncSessionLocal() as db:
+            begin = time.perf_counter()
+            await call(db)
+            timings.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(timings)
+
+
+async def old_stats(db):
+    await product_crud.count_products_by_instructor(db, STORE)
+    await order_crud.count_orders_by_instructor(db, STORE)
+    await order_crud.get_total_revenue_by_instructor(db, STORE)
+    for order_status in OrderStatus:
+        await order_crud.count_orders_by_instructor(db, STORE, status=order_status)
+    await customer_crud.count_customers_by_instructor(db, STORE)
+
+
+async def load_all_products(db):
+    # What count_products_by_instructor did before: fetch every row, len()
+    await db.execute(Product.__table__.select().where(Product.instructor_id == STORE))
+
+
+async def counter_stats(db):
+    # The three endpoints now each do this primary key lookup
+    for _ in range(3):
+        db.expunge_all()
+        await counters_crud.get_counters(db, STORE)
+
+
+async def main(products: int, customers: int, orders: int):
+    begin = time.perf_counter()
+    await fill(products, customers, orders)
+    print(f"filled {products:,} products, {customers:,} customers, {orders:,} orders "
+          f"in {time.perf_counter() - begin:.1f}s")
+
+    # First run builds the counters row (as the migration's backfill does)
+    await reconcile_counters([STORE])
+
+    async def before(db):
+        await load_all_products(db)
+        await old_stats(db)
+
+    print(f"median of {RUNS} dashboard loads (products + orders + customers summary)")
+    print(f"  before (row load + 8 aggregate queries): {await timed(before):8.2f}ms")
+    print(f"  counters row (3 primary key lookups):    {await timed(counter_stats):8.2f}ms")
+
+    drift = await reconcile_counters([STORE])
+    print(f"reconciliation drift: {drift or 'none'}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--orders", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(main(args.products, args.customers, args.orders))
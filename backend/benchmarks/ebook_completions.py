@@ -0,0 +1,146 @@
+"""
+Ebook completion report benchmark
+
+Fills a throwaway SQLite database with one ebook bought and read by many
+learners (each with progress in a random share of its sections), builds the
+ebook_completions rows with the same rebuild the API runs on structure
+changes, then times a page of the instructor report computed on the fly
+(grouping every progress row of the product, as a report without the
+aggregate table would have to) against the report read from the
+maintained rows, first page and a deep keyset page.
+
+Usage:
+    python -m benchmarks.ebook_completions [--learners 50000] [--sections 30]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "ebook_completions.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.crud import ebook as ebook_crud  # noqa: E402
+from app.models import (  # noqa: E402
+    Customer, EbookChapter, EbookCompletion, EbookSection, Instructor, Order, OrderStatus, Product, ProductType,
+    UserEbookProgress,
+)
+
+STORE = "bench-store"
+PRODUCT = "bench-ebook"
+BATCH = 20000
+PAGE = 50
+RUNS = 10
+
+
+async def fill(learners: int, sections: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Instructor), [{
+            "id": STORE, "email": "bench@class-on.kr", "hashed_password": "x", "full_name": "Bench",
+            "subdomain": "bench", "store_name": "Bench Store",
+        }])
+        await conn.execute(insert(Product), [{
+            "id": PRODUCT, "instructor_id": STORE, "title": "벤치마크 전자책", "price": 10000, "type": ProductType.EBOOK,
+        }])
+        await conn.execute(insert(EbookChapter), [{"id": "chapter", "product_id": PRODUCT, "title": "1장"}])
+        await conn.execute(insert(EbookSection), [
+            {"id": f"s{n:03d}", "chapter_id": "chapter", "title": f"섹션 {n}", "order_index": n}
+            for n in range(sections)
+        ])
+        for offset in range(0, learners, BATCH):
+            await conn.execute(insert(Customer), [{
+                "id": f"c{n:06d}", "instructor_id": STORE, "email": f"c{n}@class-on.kr", "full_name": "수강생",
+            } for n in range(offset, min(offset + BATCH, learners))])
+            await conn.execute(insert(Order), [{
+                "id": f"o{n:06d}", "customer_id": f"c{n:06d}", "product_id": PRODUCT, "instructor_id": STORE,
+                "order_number": f"ORD{n:010d}", "status": OrderStatus.PAID,
+                "original_price": 10000, "paid_price": 10000,
+            } for n in range(offset, min(offset + BATCH, learners))])
+
+        rows = []
+        for n in range(learners):
+            read = random.randint(1, sections)
+            for s in range(read):
+                rows.append({
+                    "id": f"c{n:06d}-{s:03d}", "customer_id": f"c{n:06d}", "section_id": f"s{s:03d}",
+                    "is_completed": s < read - 1, "reading_progress": 100 if s < read - 1 else 40,
+                })
+            if len(rows) >= BATCH:
+                await conn.execute(insert(UserEbookProgress), rows)
+                rows = []
+        if rows:
+            await conn.execute(insert(UserEbookProgress), rows)
+
+
+async def live_page() -> list:
+    """The report page grouped from the progress rows on every request"""
+    async with AsyncSessionLocal() as db:
+        counts = ebook_crud.completion_counts(EbookChapter.product_id == PRODUCT).subquery()
+        result = await db.execute(
+            select(counts.c.customer_id, counts.c.completed_sections, Customer.full_name, Customer.email)
+            .join(Customer, Customer.id == counts.c.customer_id)
+            .order_by(counts.c.completed_sections.desc(), counts.c.customer_id.desc())
+            .limit(PAGE)
+        )
+        return [(row.customer_id, row.completed_sections) for row in result.all()]
+
+
+async def report_page(after=None) -> list:
+    async with AsyncSessionLocal() as db:
+        report = await ebook_crud.get_completion_report(db, PRODUCT, PAGE, after)
+        return [(item["customer_id"], item["completed_sections"]) for item in report["items"]]
+
+
+async def timed(run) -> float:
+    timings = []
+    for _ in range(RUNS):
+        begin = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(timings)
+
+
+async def main(learners: int, sections: int):
+    await fill(learners, sections)
+
+    begin = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await ebook_crud.rebuild_completions(db, PRODUCT)
+        await db.commit()
+    rebuild_ms = (time.perf_counter() - begin) * 1000
+
+    assert await live_page() == await report_page()
+    async with AsyncSessionLocal() as db:
+        deep = (await db.execute(
+            select(EbookCompletion.completed_sections, EbookCompletion.customer_id)
+            .where(EbookCompletion.product_id == PRODUCT)
+            .order_by(EbookCompletion.completed_sections, EbookCompletion.customer_id)
+            .limit(1)
+            .offset(PAGE)
+        )).one()
+
+    print(f"{learners} learners, {sections} sections, median of {RUNS} runs")
+    print(f"  {'rebuild (structure change)':<34} {rebuild_ms:8.2f}ms")
+    for label, run in (
+        ("grouped from progress rows", live_page),
+        ("aggregate table, first page", report_page),
+        ("aggregate table, last pages", lambda: report_page(tuple(deep))),
+    ):
+        print(f"  {label:<34} {await timed(run):8.2f}ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--learners", type=int, default=50000)
+    parser.add_argument("--sections", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.learners, args.sections))
@@ -0,0 +1,132 @@
+"""
+Ebook table of contents benchmark
+
+Fills a throwaway SQLite database with one ebook (300 sections by default,
+each with a realistic Tiptap document and its HTML) and compares what the
+reader's sidebar used to load (chapters with selectinload(sections),
+serialized with the full section schema) against the TOC projection, cold
+and from the per-product cache.
+
+Usage:
+    python -m benchmarks.ebook_toc [--chapters 20] [--sections 300]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "ebook_toc.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+from typing import List  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.crud import ebook as ebook_crud  # noqa: E402
+from app.models import EbookChapter, EbookSection, Product, ProductType  # noqa: E402
+from app.schemas.ebook import EbookChapterWithSections, EbookTocChapter  # noqa: E402
+
+PRODUCT = "bench-ebook"
+RUNS = 20
+
+full_adapter = TypeAdapter(List[EbookChapterWithSections])
+toc_adapter = TypeAdapter(List[EbookTocChapter])
+
+
+def tiptap_document(n: int) -> dict:
+    paragraph = "전자책 본문 문단입니다. " * 20
+    return {
+        "type": "doc",
+        "content": [
+            {"type": "heading", "attrs": {"level": 2}, "content": [{"type": "text", "text": f"섹션 {n}"}]},
+            *(
+                {"type": "paragraph", "content": [{"type": "text", "text": paragraph}]}
+                for _ in range(30)
+            ),
+        ],
+    }
+
+
+async def fill(chapters: int, sections: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Product), [{
+            "id": PRODUCT, "instructor_id": "bench-store", "title": "벤치마크 전자책",
+            "price": 10000, "type": ProductType.EBOOK,
+        }])
+        await conn.execute(insert(EbookChapter), [
+            {"id": f"chapter-{c}", "product_id": PRODUCT, "title": f"{c + 1}장", "order_index": c}
+            for c in range(chapters)
+        ])
+        rows = []
+        for n in range(sections):
+            document = tiptap_document(n)
+            html = "".join(f"<p>{block['content'][0]['text']}</p>" for block in document["content"])
+            rows.append({
+                "id": f"section-{n}", "chapter_id": f"chapter-{n % chapters}", "title": f"섹션 {n}",
+                "content": document, "content_html": html, "order_index": n,
+                "reading_time": 5, "is_published": n % 10 != 0, "is_free": n < 3,
+            })
+        await conn.execute(insert(EbookSection), rows)
+
+
+async def full_structure() -> bytes:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(EbookChapter)
+            .where(EbookChapter.product_id == PRODUCT, EbookChapter.is_published == True)
+            .options(selectinload(EbookChapter.sections))
+            .order_by(EbookChapter.order_index)
+        )
+        chapters = result.scalars().all()
+        for chapter in chapters:
+            chapter.sections = [s for s in chapter.sections if s.is_published]
+        return full_adapter.dump_json(chapters)
+
+
+async def toc(cached: bool) -> bytes:
+    if not cached:
+        await ebook_crud.invalidate_toc(PRODUCT)
+    async with AsyncSessionLocal() as db:
+        return toc_adapter.dump_json(toc_adapter.validate_python(await ebook_crud.get_toc(db, PRODUCT)))
+
+
+async def timed(run) -> tuple:
+    timings = []
+    for _ in range(RUNS):
+        begin = time.perf_counter()
+        body = await run()
+        timings.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(timings), len(body)
+
+
+async def main(chapters: int, sections: int):
+    await fill(chapters, sections)
+
+    old = json.loads(await full_structure())
+    new = json.loads(await toc(cached=False))
+    assert [[s["id"] for s in c["sections"]] for c in old] == [[s["id"] for s in c["sections"]] for c in new]
+
+    print(f"{chapters} chapters, {sections} sections, median of {RUNS} runs")
+    for label, run in (
+        ("selectinload + full sections", full_structure),
+        ("TOC projection (cold)", lambda: toc(cached=False)),
+        ("TOC projection (cached)", lambda: toc(cached=True)),
+    ):
+        ms, size = await timed(run)
+        print(f"  {label:<30} {ms:8.2f}ms {size / 1024:10.1f}KB")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chapters", type=int, default=20)
+    parser.add_argument("--sections", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.chapters, args.sections))
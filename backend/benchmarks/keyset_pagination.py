@@ -0,0 +1,110 @@
+"""
+Offset vs cursor pagination benchmark
+
+Fills a throwaway SQLite database with one large store (1M orders by
+default, plus orders of other stores) and times
+get_orders_by_instructor at page 1 and page 1000 in offset mode and in
+cursor mode. OFFSET has to walk past every skipped row, so it slows down
+with the page number; the cursor seeks into the
+(instructor_id, created_at, id) index and stays flat.
+
+Usage:
+    python -m benchmarks.keyset_pagination [--orders 1000000] [--page-size 100]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+_db_file = os.path.join(tempfile.mkdtemp(), "keyset_pagination.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from sqlalchemy import insert, text  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.core.pagination import decode_cursor, encode_cursor  # noqa: E402
+from app.crud import order as order_crud  # noqa: E402
+from app.models.order import Order, OrderStatus  # noqa: E402
+
+STORE = "bench-store"
+OTHER_STORES = 9
+BATCH = 20000
+RUNS = 20
+
+
+async def fill(orders: int):
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Big store plus a tenth as many orders spread over other stores
+        total = orders + orders // 10
+        for offset in range(0, total, BATCH):
+            rows = []
+            for n in range(offset, min(offset + BATCH, total)):
+                instructor_id = STORE if n < orders else f"other-{n % OTHER_STORES}"
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "customer_id": "customer",
+                    "product_id": "product",
+                    "instructor_id": instructor_id,
+                    "order_number": f"ORD{n:010d}",
+                    "status": OrderStatus.PAID,
+                    "original_price": 10000,
+                    "paid_price": 10000,
+                    # Every tenth order shares its timestamp with the previous one
+                    "created_at": started + timedelta(seconds=n - n // 10),
+                })
+            await conn.execute(insert(Order), rows)
+        await conn.execute(text("ANALYZE"))
+
+
+async def timed(page_size: int, **kwargs) -> float:
+    timings = []
+    for _ in range(RUNS):
+        async with AsyncSessionLocal() as db:
+            begin = time.perf_counter()
+            rows = await order_crud.get_orders_by_instructor(
+                db, instructor_id=STORE, limit=page_size, **kwargs
+            )
+            timings.append((time.perf_counter() - begin) * 1000)
+            assert len(rows) == page_size
+    return statistics.median(timings)
+
+
+async def main(orders: int, page_size: int):
+    begin = time.perf_counter()
+    await fill(orders)
+    print(f"filled {orders:,} orders (+{orders // 10:,} in other stores) in {time.perf_counter() - begin:.1f}s")
+
+    deep_page = 1000
+    skip = (deep_page - 1) * page_size
+
+    # Cursor of page 1000 = the row just before it, i.e. what a client has
+    # after following X-Next-Cursor 999 times
+    async with AsyncSessionLocal() as db:
+        previous = await order_crud.get_orders_by_instructor(db, instructor_id=STORE, skip=skip - 1, limit=1)
+        cursor = decode_cursor(encode_cursor(previous[0]))
+        offset_page = await order_crud.get_orders_by_instructor(db, instructor_id=STORE, skip=skip, limit=page_size)
+        cursor_page = await order_crud.get_orders_by_instructor(
+            db, instructor_id=STORE, limit=page_size, cursor=cursor
+        )
+        assert [o.id for o in offset_page] == [o.id for o in cursor_page], "cursor page differs from offset page"
+
+    print(f"page size {page_size}, median of {RUNS} runs")
+    print(f"  page 1 (no cursor yet): {await timed(page_size):7.2f}ms")
+    print(f"  offset page {deep_page}:       {await timed(page_size, skip=skip):7.2f}ms")
+    print(f"  cursor page {deep_page}:       {await timed(page_size, cursor=cursor):7.2f}ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.page_size))
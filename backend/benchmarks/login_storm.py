@@ -0,0 +1,105 @@
+"""
+Login storm benchmark
+
+Fires concurrent instructor logins at the app while probing /health, and
+prints the probe latency percentiles. Runs twice: once with bcrypt called
+inline on the event loop (the previous behaviour) and once through the
+password executor, so the p99 of the unrelated endpoint can be compared.
+
+The ASGI app is driven in-process over httpx (no sockets), on a throwaway
+SQLite database.
+
+Usage:
+    python -m benchmarks.login_storm [--logins 200] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "login_storm.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+import httpx  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.database import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+API = "/api/v1"
+CREDENTIALS = {"email": "storm@class-on.kr", "password": "stormpass"}
+PROBE_INTERVAL = 0.005
+
+
+async def _inline_run(func, *args):
+    """Previous behaviour: bcrypt directly on the event loop"""
+    return func(*args)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def storm(client: httpx.AsyncClient, logins: int, concurrency: int):
+    done = asyncio.Event()
+    slots = asyncio.Semaphore(concurrency)
+    probes = []
+
+    async def login():
+        async with slots:
+            response = await client.post(f"{API}/auth/login/instructor", json=CREDENTIALS)
+            assert response.status_code == 200, response.text
+
+    async def probe():
+        # Latency includes time spent waiting for the event loop to wake the
+        # probe up, which is where a blocked loop shows
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            await client.get("/health")
+            probes.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    return elapsed, probes
+
+
+async def main(logins: int, concurrency: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post(f"{API}/auth/signup/instructor", json={
+            **CREDENTIALS, "full_name": "Storm", "subdomain": "storm", "store_name": "Storm Store",
+        })
+
+        executor_run = security.password_hasher.run
+        for label, run in (("inline bcrypt", _inline_run), ("executor bcrypt", executor_run)):
+            security.password_hasher.run = run
+            elapsed, probes = await storm(client, logins, concurrency)
+            print(
+                f"{label:16s} logins/s={logins / elapsed:7.1f}  /health probes={len(probes):5d}  "
+                f"p50={statistics.median(probes):7.2f}ms  p99={percentile(probes, 99):7.2f}ms  "
+                f"max={max(probes):7.2f}ms"
+            )
+        security.password_hasher.run = executor_run
+
+    print(f"bcrypt rounds={security.settings.BCRYPT_ROUNDS}  executor stats:")
+    print(security.password_hasher.snapshot())
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
@@ -0,0 +1,130 @@
+"""
+Presigned upload end-to-end check
+
+Runs the direct-to-storage flow against a local S3 stand-in (moto):
+presign -> upload straight to "S3" with requests -> complete, for a
+presigned POST, a presigned PUT and a presigned multipart video, and counts
+the bytes sent to the API (request JSON only, no file data). Also checks that
+oversized declarations and mismatched content types are rejected.
+
+Requires moto:
+    pip install "moto[s3]"
+
+Usage:
+    python -m benchmarks.presigned_upload [--video-mb 120]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "presigned_upload.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("S3_BUCKET_NAME", "classon-bench")
+
+import boto3  # noqa: E402
+import requests  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+try:
+    from moto import mock_aws  # moto >= 5
+except ImportError:
+    from moto import mock_s3 as mock_aws  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.storage import storage  # noqa: E402
+from app.main import app  # noqa: E402
+
+API = "/api/v1"
+MB = 1024 * 1024
+
+
+def main(video_mb: int):
+    with mock_aws(), TestClient(app) as client:
+        s3 = boto3.client("s3", region_name=settings.AWS_REGION)
+        s3.create_bucket(
+            Bucket=settings.S3_BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": settings.AWS_REGION},
+        )
+        storage.client = s3
+
+        client.post(f"{API}/auth/signup/instructor", json={
+            "email": "bench@class-on.kr", "password": "benchpass",
+            "full_name": "Bench", "subdomain": "bench", "store_name": "Bench Store",
+        })
+        token = client.post(f"{API}/auth/login/instructor", json={
+            "email": "bench@class-on.kr", "password": "benchpass",
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        api_bytes = 0
+
+        def api(method, path, **kwargs):
+            nonlocal api_bytes
+            response = client.request(method, f"{API}{path}", headers=headers, **kwargs)
+            api_bytes += len(response.request.content or b"")
+            return response
+
+        def run(label, filename, content_type, data, method=None):
+            started = time.perf_counter()
+            presign = api("POST", "/upload/presign", json={
+                "kind": label, "filename": filename, "content_type": content_type,
+                "size": len(data), "method": method,
+            }).json()
+
+            if presign["method"] == "POST":
+                upload = requests.post(
+                    presign["url"], data=presign["fields"], files={"file": (filename, data)}
+                )
+                assert upload.status_code in (200, 204), upload.text
+            elif presign["method"] == "PUT":
+                upload = requests.put(presign["url"], data=data, headers=presign["headers"])
+                assert upload.status_code == 200, upload.text
+            else:
+                size = presign["part_size"]
+                for part in presign["parts"]:
+                    offset = (part["part_number"] - 1) * size
+                    upload = requests.put(part["url"], data=data[offset:offset + size])
+                    assert upload.status_code == 200, upload.text
+
+            done = api("POST", f"/upload/presign/{presign['asset_id']}/complete")
+            stored = s3.head_object(Bucket=settings.S3_BUCKET_NAME, Key=presign["key"])
+            print(
+                f"{presign['method']:9s} {len(data) / MB:7.1f}MB  complete={done.status_code} "
+                f"status={done.json().get('status')}  stored={stored['ContentLength'] / MB:.1f}MB  "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+
+        run("image", "cover.png", "image/png", b"\x89PNG" + b"\0" * MB)
+        run("document", "book.pdf", "application/pdf", b"%PDF" + b"\0" * (3 * MB), method="PUT")
+        run("video", "lecture.mp4", "video/mp4", b"\0" * (video_mb * MB))
+        print(f"request bytes sent to the API: {api_bytes} (JSON only, no file data)")
+
+        too_big = api("POST", "/upload/presign", json={
+            "kind": "video", "filename": "huge.mp4", "content_type": "video/mp4", "size": 501 * MB,
+        })
+        wrong_type = api("POST", "/upload/presign", json={
+            "kind": "image", "filename": "cover.png", "content_type": "text/html", "size": 10,
+        })
+        print(f"501MB video presign: {too_big.status_code}  text/html image presign: {wrong_type.status_code}")
+
+        # PUT with a different Content-Type than declared is caught on completion
+        presign = api("POST", "/upload/presign", json={
+            "kind": "image", "filename": "cover.png", "content_type": "image/png", "size": 10, "method": "PUT",
+        }).json()
+        s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=presign["key"], Body=b"<html>", ContentType="text/html")
+        rejected = api("POST", f"/upload/presign/{presign['asset_id']}/complete")
+        print(f"mismatched content type on completion: {rejected.status_code} {rejected.json()['detail']}")
+
+    asyncio.run(engine.dispose())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video-mb", type=int, default=120)
+    args = parser.parse_args()
+    main(args.video_mb)
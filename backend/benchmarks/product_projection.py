@@ -0,0 +1,90 @@
+"""
+Product list payload benchmark
+
+Creates a content-heavy store (100 published products with long detail
+page HTML, curriculum, schedule and option JSON) in a throwaway SQLite
+database and compares the product list endpoints with all fields and with
+fields=card: response size and median render time. The storefront response
+cache is bumped before every request so each one renders from the database.
+
+Usage:
+    python -m benchmarks.product_projection [--products 100] [--detail-kb 40]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "product_projection.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.core.store_cache import store_cache  # noqa: E402
+from app.main import app  # noqa: E402
+
+API = "/api/v1"
+RUNS = 20
+
+
+def main(products: int, detail_kb: int):
+    with TestClient(app) as client:
+        client.post(f"{API}/auth/signup/instructor", json={
+            "email": "bench@class-on.kr", "password": "benchpass",
+            "full_name": "Bench", "subdomain": "bench", "store_name": "Bench Store",
+        })
+        token = client.post(f"{API}/auth/login/instructor", json={
+            "email": "bench@class-on.kr", "password": "benchpass",
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        paragraph = "<p>" + "강의 상세 설명입니다. " * 20 + "</p>"
+        detail = paragraph * (detail_kb * 1024 // len(paragraph.encode()))
+        for n in range(products):
+            response = client.post(f"{API}/products", headers=headers, json={
+                "title": f"상품 {n}", "description": "짧은 소개", "price": 49000,
+                "thumbnail": f"https://cdn.class-on.kr/thumb/{n}.jpg", "type": "video",
+                "is_published": True, "detailed_description": detail,
+            })
+            assert response.status_code == 201, response.text
+            # Detail page sections are set on edit
+            response = client.put(f"{API}/products/{response.json()['id']}", headers=headers, json={
+                "curriculum": detail[:len(detail) // 2],
+                "schedule_info": detail[:len(detail) // 4],
+                "product_options": [{"name": f"옵션 {i}", "price": 10000 * i, "description": "얼리버드"} for i in range(10)],
+                "additional_options": [{"name": "교재", "price": 20000}],
+            })
+            assert response.status_code == 200, response.text
+        instructor_id = response.json()["instructor_id"]
+
+        def measure(label, path, params, **kwargs):
+            timings = []
+            for _ in range(RUNS):
+                asyncio.run(store_cache.bump(instructor_id))
+                begin = time.perf_counter()
+                response = client.get(f"{API}{path}", params=params, **kwargs)
+                timings.append((time.perf_counter() - begin) * 1000)
+                assert response.status_code == 200, response.text
+            print(f"  {label:44s} {len(response.content) / 1024:9.1f}KB  {statistics.median(timings):8.2f}ms")
+
+        print(f"{products} products, ~{detail_kb}KB detail page each, median of {RUNS} requests")
+        measure("GET /products", "/products", {}, headers=headers)
+        measure("GET /products?fields=card", "/products", {"fields": "card"}, headers=headers)
+        measure("GET /public/.../products", "/public/store/bench/products", {})
+        measure("GET /public/.../products?fields=card", "/public/store/bench/products", {"fields": "card"})
+        measure("GET /public/.../products?fields=title,price", "/public/store/bench/products", {"fields": "title,price"})
+        measure("GET /public/.../bootstrap", "/public/store/bench/bootstrap", {})
+        measure("GET /public/.../bootstrap?fields=card", "/public/store/bench/bootstrap", {"fields": "card"})
+
+    asyncio.run(engine.dispose())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--detail-kb", type=int, default=40)
+    args = parser.parse_args()
+    main(args.products, args.detail_kb)
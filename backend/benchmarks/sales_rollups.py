@@ -0,0 +1,135 @@
+"""
+Sales rollups benchmark
+
+Fills a throwaway SQLite database with one store's orders spread over two
+years (paid, refunded, cancelled, pending), builds the daily rollups with
+the backfill job, checks a few incremental status changes against a
+rebuild, and times a one-year sales chart per day / week / month from the
+rollups against aggregating the orders table on the fly.
+
+Usage:
+    python -m benchmarks.sales_rollups [--orders 300000] [--products 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+_db_file = os.path.join(tempfile.mkdtemp(), "sales_rollups.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.crud import analytics as analytics_crud, order as order_crud  # noqa: E402
+from app.jobs.backfill_sales_rollups import backfill_sales_rollups  # noqa: E402
+from app.models import InstructorDailySales, Instructor, Order, OrderStatus, Product, ProductType  # noqa: E402
+from app.schemas.order import OrderUpdate  # noqa: E402
+
+STORE = "bench-store"
+BATCH = 20000
+RUNS = 10
+END = date(2026, 6, 30)
+
+
+async def fill(orders: int, products: int):
+    first = datetime(2024, 7, 1, tzinfo=timezone.utc)
+    span = (datetime(2026, 7, 1, tzinfo=timezone.utc) - first).total_seconds()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Instructor), [{
+            "id": STORE, "email": "bench@class-on.kr", "hashed_password": "x", "full_name": "Bench",
+            "subdomain": "bench", "store_name": "Bench Store",
+        }])
+        await conn.execute(insert(Product), [{
+            "id": f"p{n}", "instructor_id": STORE, "title": f"상품 {n}", "price": 10000, "type": ProductType.VIDEO,
+        } for n in range(products)])
+        for offset in range(0, orders, BATCH):
+            rows = []
+            for n in range(offset, min(offset + BATCH, orders)):
+                created = first + timedelta(seconds=random.random() * span)
+                status = random.choices(list(OrderStatus), weights=(1, 8, 1, 1))[0]
+                paid = created + timedelta(minutes=5) if status in (OrderStatus.PAID, OrderStatus.REFUNDED) else None
+                rows.append({
+                    "id": str(uuid.uuid4()), "customer_id": "customer", "product_id": f"p{n % products}",
+                    "instructor_id": STORE, "order_number": f"ORD{n:010d}", "status": status,
+                    "original_price": 50000, "paid_price": random.choice((29000, 49000, 99000)),
+                    "created_at": created, "paid_at": paid,
+                    "refunded_at": paid + timedelta(days=3) if status == OrderStatus.REFUNDED else None,
+                })
+            await conn.execute(insert(Order), rows)
+
+
+async def timed(call) -> float:
+    timings = []
+    for _ in range(RUNS):
+        async with AsyncSessionLocal() as db:
+            begin = time.perf_counter()
+            await call(db)
+            timings.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(timings)
+
+
+async def rollup_rows():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(InstructorDailySales).order_by(InstructorDailySales.day))
+        return [
+            (row.day, *(getattr(row, name) for name in analytics_crud.ROLLUP_COLUMNS))
+            for row in result.scalars() if any(getattr(row, name) for name in analytics_crud.ROLLUP_COLUMNS)
+        ]
+
+
+async def main(orders: int, products: int):
+    begin = time.perf_counter()
+    await fill(orders, products)
+    print(f"filled {orders:,} orders over two years in {time.perf_counter() - begin:.1f}s")
+
+    begin = time.perf_counter()
+    await backfill_sales_rollups([STORE])
+    print(f"backfill job: {time.perf_counter() - begin:.1f}s")
+
+    # Incremental updates must land where a rebuild puts them
+    async with AsyncSessionLocal() as db:
+        pending = (await db.execute(
+            select(Order.id).filter(Order.status == OrderStatus.PENDING).limit(50)
+        )).scalars().all()
+    for n, order_id in enumerate(pending):
+        async with AsyncSessionLocal() as db:
+            await order_crud.update_order(db, order_id, OrderUpdate(status="PAID"))
+        if n % 2:
+            async with AsyncSessionLocal() as db:
+                await order_crud.update_order(db, order_id, OrderUpdate(status="REFUNDED"))
+    incremental = await rollup_rows()
+    await backfill_sales_rollups([STORE])
+    print(f"incremental == rebuild after {len(pending)} payments: {incremental == await rollup_rows()}")
+
+    start = END - timedelta(days=364)
+    print(f"one-year chart, median of {RUNS} runs")
+    for granularity in ("day", "week", "month"):
+        async def from_rollups(db, granularity=granularity):
+            await analytics_crud.get_sales_series(db, STORE, start, END, granularity)
+        print(f"  rollups {granularity:5s}: {await timed(from_rollups):8.2f}ms")
+
+    async def on_the_fly(db):
+        # Daily totals straight from orders (UTC days, payments and refunds ignored)
+        await db.execute(
+            select(func.date(Order.created_at), func.count(), func.sum(Order.paid_price))
+            .filter(Order.instructor_id == STORE, Order.created_at >= start, Order.created_at < END + timedelta(days=1))
+            .group_by(func.date(Order.created_at))
+        )
+    print(f"  orders table GROUP BY day: {await timed(on_the_fly):8.2f}ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=300000)
+    parser.add_argument("--products", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.products))
@@ -0,0 +1,149 @@
+"""
+Upload memory high-water benchmark
+
+Streams a generated file through POST /upload/video into a local S3
+stand-in (moto) and reports the peak Python heap (tracemalloc) measured
+before the multipart upload is completed. The peak must not grow with the
+file size: the app holds at most S3_MULTIPART_PART_SIZE *
+(S3_MULTIPART_MAX_IN_FLIGHT + 1) of part buffers, plus the copies botocore
+and moto make of each part in flight.
+
+Also checks early rejection of oversized uploads, with and without a
+Content-Length header, and that rejected multipart uploads get aborted.
+
+The ASGI app is driven directly with a lazy request body, so the client
+side never holds the file either. Requires moto:
+    pip install "moto[s3]"
+
+Usage:
+    python -m benchmarks.upload_memory [--size-mb 200]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+
+_db_file = os.path.join(tempfile.mkdtemp(), "upload_memory.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("S3_BUCKET_NAME", "classon-bench")
+# Keep moto's stored parts on disk so they do not count as app memory
+os.environ.setdefault("MOTO_S3_DEFAULT_KEY_BUFFER_SIZE", str(1024 * 1024))
+
+import boto3  # noqa: E402
+
+try:
+    from moto import mock_aws  # moto >= 5
+except ImportError:
+    from moto import mock_s3 as mock_aws  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.dependencies import get_current_instructor  # noqa: E402
+from app.core.principal import InstructorPrincipal  # noqa: E402
+from app.core.storage import storage  # noqa: E402
+from app.main import app  # noqa: E402
+
+MB = 1024 * 1024
+CHUNK = 64 * 1024
+BOUNDARY = "classonbenchboundary"
+
+
+async def post_video(size: int, send_length: bool = True):
+    """POST a generated multipart body; returns (status, body bytes the app read)"""
+    head = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="lecture.mp4"\r\n'
+        "Content-Type: video/mp4\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    if send_length:
+        headers.append((b"content-length", str(len(head) + size + len(tail)).encode()))
+
+    def body():
+        yield head
+        block = b"\0" * CHUNK
+        for offset in range(0, size, CHUNK):
+            yield block[:min(CHUNK, size - offset)]
+        yield tail
+
+    chunks = body()
+    received = 0
+    response = {}
+
+    async def receive():
+        nonlocal received
+        chunk = next(chunks, None)
+        if chunk is None:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        received += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "path": f"{settings.API_V1_STR}/upload/video", "raw_path": b"", "root_path": "",
+        "query_string": b"", "headers": headers,
+    }
+    await app(scope, receive, send)
+    return response["status"], received
+
+
+async def main(size_mb: int):
+    app.dependency_overrides[get_current_instructor] = lambda: InstructorPrincipal(
+        id="bench-instructor", email="bench@class-on.kr", is_active=True
+    )
+
+    with mock_aws():
+        client = boto3.client("s3", region_name=settings.AWS_REGION)
+        client.create_bucket(
+            Bucket=settings.S3_BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": settings.AWS_REGION},
+        )
+        storage.client = client
+
+        # Peak heap up to the moment all parts are uploaded (moto's own
+        # complete_multipart_upload joins the parts in memory, not ours)
+        peaks = []
+        complete = client.complete_multipart_upload
+
+        def measured_complete(**kwargs):
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            return complete(**kwargs)
+
+        client.complete_multipart_upload = measured_complete
+
+        tracemalloc.start()
+        status, _ = await post_video(size_mb * MB)
+        tracemalloc.stop()
+        buffer_bound = settings.S3_MULTIPART_PART_SIZE * (settings.S3_MULTIPART_MAX_IN_FLIGHT + 1)
+        print(
+            f"{size_mb}MB video: status={status}  peak heap={peaks[0] / MB:.1f}MB  "
+            f"(app part buffers bound {buffer_bound / MB:.0f}MB)"
+        )
+
+        oversize = 501 * MB
+        status, received = await post_video(oversize)
+        print(f"501MB with Content-Length: status={status}  body read={received / MB:.2f}MB")
+        status, received = await post_video(oversize, send_length=False)
+        pending = client.list_multipart_uploads(Bucket=settings.S3_BUCKET_NAME).get("Uploads", [])
+        print(
+            f"501MB without Content-Length: status={status}  body read={received / MB:.0f}MB  "
+            f"unaborted multipart uploads={len(pending)}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb))
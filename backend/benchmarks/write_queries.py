@@ -0,0 +1,105 @@
+"""
+Write path round-trip counter
+
+Runs the main write endpoints against a throwaway SQLite database and
+prints the SQL statements each request issued, split into the lookups the
+route needs (auth, ownership checks) and the write itself.
+Every write should be a single INSERT/UPDATE/DELETE (with RETURNING),
+plus the instructor counters upsert for product and customer changes
+that move a counter, and no SELECT after it.
+
+Usage:
+    python -m benchmarks.write_queries
+"""
+import asyncio
+import os
+import tempfile
+from collections import Counter
+
+_db_file = os.path.join(tempfile.mkdtemp(), "write_queries.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+statements = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _record(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement.split(None, 1)[0].upper())
+
+
+def measure(label, call):
+    statements.clear()
+    response = call()
+    counts = Counter(statements)
+    writes = [s for s in statements if s in ("INSERT", "UPDATE", "DELETE")]
+    after_write = statements[statements.index(writes[0]) + 1:] if writes else []
+    print(
+        f"{label:32s} status={response.status_code}  total={len(statements)}  "
+        f"{dict(counts)}  selects_after_write={after_write.count('SELECT')}"
+    )
+    return response
+
+
+def main():
+    api = "/api/v1"
+    with TestClient(app) as client:
+        client.post(f"{api}/auth/signup/instructor", json={
+            "email": "bench@class-on.kr", "password": "benchpass",
+            "full_name": "Bench", "subdomain": "bench", "store_name": "Bench Store",
+        })
+        token = client.post(f"{api}/auth/login/instructor", json={
+            "email": "bench@class-on.kr", "password": "benchpass",
+        }).json()["access_token"]
+        instructor = {"Authorization": f"Bearer {token}"}
+
+        product = measure("POST /products", lambda: client.post(
+            f"{api}/products", headers=instructor,
+            json={"title": "Book", "price": 10000, "type": "ebook", "is_published": True},
+        )).json()
+        measure("PUT /products/{id}", lambda: client.put(
+            f"{api}/products/{product['id']}", headers=instructor, json={"price": 9000},
+        ))
+
+        customer = measure("POST /public/store/{s}/signup", lambda: client.post(
+            f"{api}/public/store/bench/signup",
+            json={"email": "reader@class-on.kr", "password": "readerpass", "full_name": "Reader"},
+        )).json()
+        measure("PUT /customers/{id}", lambda: client.put(
+            f"{api}/customers/{customer['id']}", headers=instructor, json={"tags": "vip"},
+        ))
+
+        chapter = measure("POST /ebook/instructor/chapters", lambda: client.post(
+            f"{api}/ebook/instructor/chapters", headers=instructor,
+            json={"product_id": product["id"], "title": "Chapter 1"},
+        )).json()
+        section = measure("POST /ebook/instructor/sections", lambda: client.post(
+            f"{api}/ebook/instructor/sections", headers=instructor,
+            json={"chapter_id": chapter["id"], "title": "Section 1", "is_free": True},
+        )).json()
+
+        token = client.post(f"{api}/public/store/bench/login", json={
+            "email": "reader@class-on.kr", "password": "readerpass",
+        }).json()["access_token"]
+        reader = {"Authorization": f"Bearer {token}"}
+
+        for _ in range(2):  # insert, then conflict update
+            measure("POST /ebook/customer/progress", lambda: client.post(
+                f"{api}/ebook/customer/progress", headers=reader,
+                json={"section_id": section["id"], "reading_progress": 40},
+            ))
+        measure("POST /ebook/customer/bookmarks", lambda: client.post(
+            f"{api}/ebook/customer/bookmarks", headers=reader,
+            json={"section_id": section["id"], "position": 120},
+        ))
+
+    asyncio.run(engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
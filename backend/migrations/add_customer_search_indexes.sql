@@ -0,0 +1,11 @@
+-- 고객 검색용 인덱스 (대시보드 고객 목록 검색)
+-- 3글자 이상: 트라이그램 GIN 인덱스로 이름/이메일/전화번호 부분 일치 검색
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_customers_full_name_trgm ON customers USING GIN (full_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_customers_email_trgm ON customers USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_customers_phone_trgm ON customers USING GIN (phone gin_trgm_ops);
+
+-- 1~2글자: 이름/이메일 접두어 검색 (트라이그램으로는 인덱스를 쓸 수 없음)
+CREATE INDEX IF NOT EXISTS ix_customers_instructor_name_prefix ON customers (instructor_id, lower(full_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_customers_instructor_email_prefix ON customers (instructor_id, lower(email) text_pattern_ops);
@@ -0,0 +1,4 @@
+-- 섹션 HTML 서버 렌더링: content_html을 만든 content(+렌더러 버전)의 해시
+-- 해시가 같으면 다시 렌더링하지 않음. 기존 섹션은 아래 명령으로 일괄 렌더링:
+--   python -m app.jobs.render_ebook_sections
+ALTER TABLE ebook_sections ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
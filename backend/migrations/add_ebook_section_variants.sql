@@ -0,0 +1,5 @@
+-- 학습자 뷰어 섹션 응답: 버전(ETag)과 사전 압축본 (저장 시 생성)
+-- 기존 섹션은 python -m app.jobs.render_ebook_sections 로 생성
+ALTER TABLE ebook_sections ADD COLUMN IF NOT EXISTS revision VARCHAR(32);
+ALTER TABLE ebook_sections ADD COLUMN IF NOT EXISTS body_gzip BYTEA;
+ALTER TABLE ebook_sections ADD COLUMN IF NOT EXISTS body_br BYTEA;
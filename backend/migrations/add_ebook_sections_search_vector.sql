@@ -0,0 +1,12 @@
+-- 전자책 본문 검색: 검색용 본문 텍스트와 tsvector (제목 A > 본문 B 가중치)
+-- content_text는 저장 시 content로부터 생성, 기존 섹션은 python -m app.jobs.render_ebook_sections 로 채우기
+ALTER TABLE ebook_sections ADD COLUMN IF NOT EXISTS content_text TEXT;
+
+ALTER TABLE ebook_sections ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content_text, '')), 'B')
+    ) STORED;
+
+-- 인덱스 생성
+CREATE INDEX IF NOT EXISTS ix_ebook_sections_search_vector ON ebook_sections USING GIN (search_vector);
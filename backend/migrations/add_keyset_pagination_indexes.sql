@@ -0,0 +1,5 @@
+-- 목록 커서(keyset) 페이지네이션용 복합 인덱스
+-- (instructor_id, created_at, id) 순서로 스캔하므로 페이지 깊이와 무관하게 일정한 속도
+CREATE INDEX IF NOT EXISTS ix_products_instructor_created ON products(instructor_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_orders_instructor_created ON orders(instructor_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_customers_instructor_created ON customers(instructor_id, created_at, id);
@@ -0,0 +1,2 @@
+-- 스토어별 상품 조회용 인덱스 (공개 스토어, 강사 대시보드)
+CREATE INDEX IF NOT EXISTS ix_products_instructor_id ON products(instructor_id);
@@ -0,0 +1,11 @@
+-- 스토어 상품 검색용 tsvector (제목 A > 카테고리 B > 간단 설명 C 가중치)
+-- 한국어 형태소 사전이 없으므로 'simple' 설정 + 접두어 검색(:*)으로 조사 붙은 단어도 매칭
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED;
+
+-- 인덱스 생성
+CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector);
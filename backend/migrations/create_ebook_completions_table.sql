@@ -0,0 +1,34 @@
+-- 고객별 전자책 완료 집계 (진행률 쓰기와 같은 트랜잭션에서 갱신)
+CREATE TABLE IF NOT EXISTS ebook_completions (
+    product_id VARCHAR NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    customer_id VARCHAR NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+    completed_sections INTEGER NOT NULL DEFAULT 0,  -- 완료한 공개 섹션 수
+    last_read_at TIMESTAMP WITH TIME ZONE,  -- 마지막 읽은 시간
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, customer_id)
+);
+
+-- 인덱스 생성 (상품별 학습자 목록, 완료 섹션 수 순)
+CREATE INDEX IF NOT EXISTS ix_ebook_completions_product_completed
+    ON ebook_completions(product_id, completed_sections, customer_id);
+
+-- 구매 확인 (전자책 열람 권한, 완료율 집계)
+CREATE INDEX IF NOT EXISTS ix_orders_customer_product ON orders(customer_id, product_id);
+
+-- 기존 진행률로 초기값 채우기
+INSERT INTO ebook_completions (product_id, customer_id, completed_sections, last_read_at)
+SELECT
+    c.product_id,
+    p.customer_id,
+    COUNT(*) FILTER (WHERE p.is_completed AND s.is_published AND c.is_published),
+    MAX(p.last_read_at)
+FROM user_ebook_progress p
+JOIN ebook_sections s ON s.id = p.section_id
+JOIN ebook_chapters c ON c.id = s.chapter_id
+WHERE EXISTS (
+    -- 구매한 고객만 학습자로 집계
+    SELECT 1 FROM orders o
+    WHERE o.customer_id = p.customer_id AND o.product_id = c.product_id AND o.status = 'PAID'
+)
+GROUP BY c.product_id, p.customer_id
+ON CONFLICT (product_id, customer_id) DO NOTHING;
@@ -0,0 +1,31 @@
+-- 강사별 대시보드 카운터 테이블 (상품/고객/주문 쓰기와 같은 트랜잭션에서 갱신)
+CREATE TABLE IF NOT EXISTS instructor_counters (
+    instructor_id VARCHAR PRIMARY KEY REFERENCES instructors(id) ON DELETE CASCADE,
+    products INTEGER NOT NULL DEFAULT 0,
+    published_products INTEGER NOT NULL DEFAULT 0,
+    customers INTEGER NOT NULL DEFAULT 0,
+    orders_pending INTEGER NOT NULL DEFAULT 0,
+    orders_paid INTEGER NOT NULL DEFAULT 0,
+    orders_cancelled INTEGER NOT NULL DEFAULT 0,
+    orders_refunded INTEGER NOT NULL DEFAULT 0,
+    revenue BIGINT NOT NULL DEFAULT 0,  -- PAID 주문 결제 금액 합계 (원)
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 기존 데이터로 초기값 채우기 (이후 드리프트는 python -m app.jobs.reconcile_counters 로 복구)
+INSERT INTO instructor_counters (
+    instructor_id, products, published_products, customers,
+    orders_pending, orders_paid, orders_cancelled, orders_refunded, revenue
+)
+SELECT
+    i.id,
+    (SELECT COUNT(*) FROM products p WHERE p.instructor_id = i.id),
+    (SELECT COUNT(*) FROM products p WHERE p.instructor_id = i.id AND p.is_published),
+    (SELECT COUNT(*) FROM customers c WHERE c.instructor_id = i.id),
+    (SELECT COUNT(*) FROM orders o WHERE o.instructor_id = i.id AND o.status = 'PENDING'),
+    (SELECT COUNT(*) FROM orders o WHERE o.instructor_id = i.id AND o.status = 'PAID'),
+    (SELECT COUNT(*) FROM orders o WHERE o.instructor_id = i.id AND o.status = 'CANCELLED'),
+    (SELECT COUNT(*) FROM orders o WHERE o.instructor_id = i.id AND o.status = 'REFUNDED'),
+    (SELECT COALESCE(SUM(o.paid_price), 0) FROM orders o WHERE o.instructor_id = i.id AND o.status = 'PAID')
+FROM instructors i
+ON CONFLICT (instructor_id) DO NOTHING;
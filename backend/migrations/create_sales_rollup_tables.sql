@@ -0,0 +1,28 @@
+-- 일별 매출 집계 테이블 (ANALYTICS_TIMEZONE 기준 날짜)
+-- 주문 쓰기와 같은 트랜잭션에서 갱신, 생성 후 python -m app.jobs.backfill_sales_rollups 로 채우기
+CREATE TABLE IF NOT EXISTS instructor_daily_sales (
+    instructor_id VARCHAR NOT NULL REFERENCES instructors(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    orders INTEGER NOT NULL DEFAULT 0,  -- 주문 생성 건수
+    paid_orders INTEGER NOT NULL DEFAULT 0,  -- 결제 완료 건수 (결제일 기준)
+    paid_revenue BIGINT NOT NULL DEFAULT 0,  -- 결제 금액 (원)
+    refunded_orders INTEGER NOT NULL DEFAULT 0,  -- 환불 건수 (환불일 기준)
+    refunded_revenue BIGINT NOT NULL DEFAULT 0,  -- 환불 금액 (원)
+    PRIMARY KEY (instructor_id, day)
+);
+
+-- 상품별 일별 매출 집계
+CREATE TABLE IF NOT EXISTS product_daily_sales (
+    product_id VARCHAR NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    instructor_id VARCHAR NOT NULL REFERENCES instructors(id) ON DELETE CASCADE,
+    orders INTEGER NOT NULL DEFAULT 0,
+    paid_orders INTEGER NOT NULL DEFAULT 0,
+    paid_revenue BIGINT NOT NULL DEFAULT 0,
+    refunded_orders INTEGER NOT NULL DEFAULT 0,
+    refunded_revenue BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, day)
+);
+
+-- 인덱스 생성 (기간 내 상품 순위)
+CREATE INDEX IF NOT EXISTS ix_product_daily_sales_instructor_day ON product_daily_sales(instructor_id, day);
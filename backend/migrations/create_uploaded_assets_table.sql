@@ -0,0 +1,23 @@
+-- 직접 업로드(presigned URL) 파일 테이블
+DO $$ BEGIN
+    CREATE TYPE upload_status AS ENUM ('PENDING', 'COMPLETED', 'ABORTED');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE TABLE IF NOT EXISTS uploaded_assets (
+    id VARCHAR PRIMARY KEY,
+    instructor_id VARCHAR NOT NULL REFERENCES instructors(id) ON DELETE CASCADE,
+    kind VARCHAR NOT NULL,  -- image, video, document
+    s3_key VARCHAR NOT NULL UNIQUE,
+    filename VARCHAR NOT NULL,  -- 원본 파일명
+    content_type VARCHAR NOT NULL,
+    size BIGINT NOT NULL,  -- 바이트
+    multipart_upload_id VARCHAR,  -- 멀티파트 업로드일 때만
+    status upload_status NOT NULL DEFAULT 'PENDING',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- 인덱스 생성
+CREATE INDEX IF NOT EXISTS idx_uploaded_assets_instructor_id ON uploaded_assets(instructor_id);
@@ -0,0 +1,161 @@
+"""
+Concurrent order status changes
+
+Two sessions load the same order (as the order routes do before calling
+the CRUD function) and then change it: both refund it, or one deletes it
+while the other refunds it. The dashboard counters and the daily sales
+rollups must come out exactly as a fresh recompute from the orders table.
+
+The sequential interleaving (second write after the first committed) runs
+on a throwaway SQLite database. The truly concurrent runs need row locks
+and only run against PostgreSQL:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://.../classon_test python -m pytest -q tests
+
+TEST_DATABASE_URL must point to a disposable database; its tables are
+dropped and recreated.
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+else:
+    _db_file = os.path.join(tempfile.mkdtemp(), "order_concurrency.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+
+from datetime import datetime, timezone  # noqa: E402
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.crud import analytics, counters, order as order_crud  # noqa: E402
+from app.models import (  # noqa: E402
+    Customer, Instructor, InstructorDailySales, Order, OrderStatus, Product, ProductDailySales, ProductType,
+)
+from app.schemas.order import OrderUpdate  # noqa: E402
+
+STORE = "concurrency-store"
+PRODUCT = "concurrency-product"
+CUSTOMER = "concurrency-customer"
+ORDERS = ("order-a", "order-b")
+
+requires_row_locks = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgresql"),
+    reason="concurrent writes need row locks (set TEST_DATABASE_URL to a PostgreSQL database)",
+)
+
+
+async def setup_store():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Instructor), [{
+            "id": STORE, "email": "concurrency@class-on.kr", "hashed_password": "x", "full_name": "Store",
+            "subdomain": "concurrency", "store_name": "Concurrency Store",
+        }])
+        await conn.execute(insert(Product), [{
+            "id": PRODUCT, "instructor_id": STORE, "title": "전자책", "price": 10000, "type": ProductType.EBOOK,
+        }])
+        await conn.execute(insert(Customer), [{
+            "id": CUSTOMER, "instructor_id": STORE, "email": "buyer@class-on.kr", "full_name": "구매자",
+        }])
+        await conn.execute(insert(Order), [{
+            "id": order_id, "customer_id": CUSTOMER, "product_id": PRODUCT, "instructor_id": STORE,
+            "order_number": f"ORD-{order_id}", "status": OrderStatus.PAID,
+            "original_price": 10000, "paid_price": 9000, "paid_at": datetime.now(timezone.utc),
+        } for order_id in ORDERS])
+
+    # Consistent starting point, as after the reconcile and rebuild jobs
+    async with AsyncSessionLocal() as db:
+        await counters.reconcile(db, STORE)
+    async with AsyncSessionLocal() as db:
+        await analytics.rebuild(db, STORE)
+
+
+async def rollups():
+    async with AsyncSessionLocal() as db:
+        rows = {}
+        for model in (InstructorDailySales, ProductDailySales):
+            result = await db.execute(select(model).filter(model.instructor_id == STORE))
+            for row in result.scalars():
+                key = (model.__tablename__, *(getattr(row, c.key) for c in model.__table__.primary_key.columns))
+                rows[key] = {c.key: getattr(row, c.key) for c in model.__table__.columns}
+        return rows
+
+
+async def assert_consistent():
+    async with AsyncSessionLocal() as db:
+        stored = await counters.get_counters(db, STORE)
+        actual = {name: getattr(stored, name) for name in counters.COUNTER_COLUMNS}
+        assert actual == await counters.compute_counters(db, STORE)
+
+    maintained = await rollups()
+    async with AsyncSessionLocal() as db:
+        await analytics.rebuild(db, STORE)
+    assert maintained == await rollups()
+
+
+async def loaded(order_id: str):
+    """Two sessions with the order already loaded and held, as the routes leave it"""
+    sessions, orders = (AsyncSessionLocal(), AsyncSessionLocal()), []
+    for db in sessions:
+        orders.append(await order_crud.get_order(db, order_id))
+        assert orders[-1].status == OrderStatus.PAID
+    return sessions, orders
+
+
+async def refund(db, order_id: str):
+    return await order_crud.update_order(db, order_id, OrderUpdate(status=OrderStatus.REFUNDED))
+
+
+def run(scenario):
+    async def main():
+        try:
+            await setup_store()
+            await scenario()
+            await assert_consistent()
+        finally:
+            await engine.dispose()
+    asyncio.run(main())
+
+
+def test_refund_after_stale_load():
+    async def scenario():
+        (first, second), _orders = await loaded("order-a")
+        async with first, second:
+            await refund(first, "order-a")
+            await refund(second, "order-a")
+    run(scenario)
+
+
+def test_delete_after_stale_load():
+    async def scenario():
+        (first, second), _orders = await loaded("order-b")
+        async with first, second:
+            await refund(first, "order-b")
+            assert await order_crud.delete_order(second, "order-b")
+    run(scenario)
+
+
+@requires_row_locks
+def test_concurrent_refunds():
+    async def scenario():
+        (first, second), _orders = await loaded("order-a")
+        async with first, second:
+            await asyncio.gather(refund(first, "order-a"), refund(second, "order-a"))
+    run(scenario)
+
+
+@requires_row_locks
+def test_delete_racing_refund():
+    async def scenario():
+        (first, second), _orders = await loaded("order-b")
+        async with first, second:
+            await asyncio.gather(refund(first, "order-b"), order_crud.delete_order(second, "order-b"))
+    run(scenario)